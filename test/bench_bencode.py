@@ -0,0 +1,67 @@
+"""
+Compare torrentlib.Bencode with bencodepy on peer wire message sizes.
+
+    python test/bench_bencode.py [--number 20000]
+
+Measures decoding and encoding of an extension handshake, a PEX message with
+50 peers and a ut_metadata data message (header plus a 16 KiB piece). The
+metadata case compares the old find(b'ee') + bencodepy split with
+Bencode.decode_from().
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import bencodepy
+from torrentlib import Bencode
+
+MESSAGES = {
+    "ext handshake": {b"m": {b"ut_pex": 1, b"ut_metadata": 2, b"lt_donthave": 7}, b"v": b"qBittorrent/4.5.2",
+                      b"metadata_size": 31235, b"reqq": 500, b"yourip": b"\x7f\x00\x00\x01", b"p": 6881},
+    "pex 50 peers": {b"added": os.urandom(6 * 50), b"added.f": os.urandom(50), b"dropped": os.urandom(6 * 10)},
+    "metadata req": {b"msg_type": 0, b"piece": 3},
+}
+
+
+def per_call(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20000, help="calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'message':<16}{'bytes':>7}{'bencodepy':>12}{'Bencode':>10}   (us per call)")
+    buffer = bytearray()
+    for name, message in MESSAGES.items():
+        encoded = Bencode.encode(message)
+
+        def encode_into():
+            buffer.clear()
+            Bencode.encode_into(message, buffer)
+
+        print(f"{name + ' dec':<16}{len(encoded):>7}{per_call(lambda: bencodepy.decode(encoded), args.number):>12.2f}"
+              f"{per_call(lambda: Bencode.decode(encoded), args.number):>10.2f}")
+        print(f"{name + ' enc':<16}{len(encoded):>7}{per_call(lambda: bencodepy.encode(message), args.number):>12.2f}"
+              f"{per_call(encode_into, args.number):>10.2f}")
+
+    payload = Bencode.encode({b"msg_type": 1, b"piece": 0, b"total_size": 31235}) + os.urandom(16384)
+
+    def split_find():
+        end = payload.find(b"ee") + 2
+        return bencodepy.decode(payload[:end]), payload[end:]
+
+    def split_offset():
+        header, end = Bencode.decode_from(payload)
+        return header, payload[end:]
+
+    print(f"{'metadata data':<16}{len(payload):>7}{per_call(split_find, args.number):>12.2f}"
+          f"{per_call(split_offset, args.number):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
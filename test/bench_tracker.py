@@ -0,0 +1,185 @@
+"""
+Offline load benchmark for the tracker client.
+
+Runs Query.single, Query.multi and Check.multiple against the local fake
+trackers at several tracker counts and writes the results as JSON, so runs
+of different versions can be compared:
+
+    python test/bench_tracker.py --out before.json
+    python test/bench_tracker.py --out after.json --compare before.json
+
+Every tracker gets its own loopback address (127.0.x.y), so the client
+sees N distinct trackers. Latencies are read back from the Metrics
+histograms. Memory is the tracemalloc peak of a second, untimed pass.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from torrentlib import Torrent
+from torrentlib.Tracker import Check, Metrics, Query, UDPTrackerClient
+from fake_tracker import FakeUDPTracker, FakeHTTPTracker
+
+PEER_ID = "-robots-testing12345"
+LATENCY_BUCKETS = tuple(1e-4 * 1.25 ** i for i in range(52))  # 0.1 ms to ~10 s
+METRICS = {"Query.single": "tracker_announce", "Query.multi": "tracker_announce",
+           "Check.multiple": "tracker_check"}
+
+
+def percentile(histograms: list[dict], q: float) -> float|None:
+    """Interpolated q-quantile of the merged cumulative histograms."""
+    merged: dict[float, int] = {}
+    for series in histograms:
+        for bound, count in series["buckets"].items():
+            merged[bound] = merged.get(bound, 0) + count
+    bounds = sorted(merged)
+    total = merged[bounds[-1]] if bounds else 0
+    if total == 0:
+        return None
+
+    rank, lower, below = q * total, 0.0, 0
+    for bound in bounds:
+        if merged[bound] >= rank:
+            if bound == float("inf"):
+                return lower
+            return lower + (bound - lower) * (rank - below) / max(merged[bound] - below, 1)
+        lower, below = bound, merged[bound]
+    return lower
+
+
+def forget_connections(urls: list[str]):
+    """Drop cached UDP connection IDs so every run starts cold."""
+    client = UDPTrackerClient.shared()
+    for url in urls:
+        parsed = urlparse(url)
+        client.invalidate(parsed.hostname, parsed.port)
+
+
+def run(benchmark: str, urls: list[str], args) -> tuple[int, int]:
+    """Run one benchmark. Returns (operations, errors)."""
+    torrent = Torrent(os.urandom(20).hex(), 0)
+    if benchmark == "Query.single":
+        errors = 0
+        for i in range(args.single_calls):
+            try:
+                Query.single(torrent, urls[i % len(urls)], PEER_ID, timeout=args.timeout)
+            except Exception:
+                errors += 1
+        return args.single_calls, errors
+    if benchmark == "Query.multi":
+        results = Query.multi(torrent, urls, PEER_ID, timeout=args.timeout, max_threads=args.threads)
+        return len(results), sum("error" in r for r in results.values())
+    results = Check.multiple(urls, timeout=args.timeout, max_threads=args.threads)
+    return len(results), sum(not status for status in results.values())
+
+
+def measure(benchmark: str, urls: list[str], args) -> dict:
+    metrics = Metrics.shared()
+    metrics.buckets = LATENCY_BUCKETS
+    metrics.reset()
+    metrics.enable()
+    forget_connections(urls)
+    start = time.perf_counter()
+    ops, errors = run(benchmark, urls, args)
+    seconds = time.perf_counter() - start
+    metrics.disable()
+    histograms = metrics.snapshot()["histograms"].get(f"{METRICS[benchmark]}_duration_seconds", [])
+
+    result = {
+        "benchmark": benchmark,
+        "scheme": urlparse(urls[0]).scheme,
+        "urls": len(urls),
+        "operations": ops,
+        "errors": errors,
+        "seconds": seconds,
+        "ops_per_sec": ops / seconds,
+        "p50_latency": percentile(histograms, 0.5),
+        "p99_latency": percentile(histograms, 0.99),
+        "peak_memory_mb": None,
+    }
+    if args.memory:
+        forget_connections(urls)
+        tracemalloc.start()
+        run(benchmark, urls, args)
+        result["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result
+
+
+def version() -> str:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list[dict], baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["scheme"], r["urls"]): r for r in json.load(f)["results"]}
+    print(f"\n{'benchmark':<16}{'scheme':<7}{'urls':>7}{'ops/s':>12}{'change':>9}{'p99':>10}{'change':>9}")
+    for r in results:
+        old = baseline.get((r["benchmark"], r["scheme"], r["urls"]))
+        if old is None:
+            continue
+        ops_change = r["ops_per_sec"] / old["ops_per_sec"] - 1
+        p99_change = r["p99_latency"] / old["p99_latency"] - 1 if r["p99_latency"] and old["p99_latency"] else 0
+        print(f"{r['benchmark']:<16}{r['scheme']:<7}{r['urls']:>7}{r['ops_per_sec']:>12.1f}{ops_change:>+9.1%}"
+              f"{(r['p99_latency'] or 0) * 1000:>8.2f}ms{p99_change:>+9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="tracker counts")
+    parser.add_argument("--schemes", nargs="+", default=["udp", "http"], choices=["udp", "http"])
+    parser.add_argument("--benchmarks", nargs="+", default=list(METRICS), choices=list(METRICS))
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake trackers delay each reply")
+    parser.add_argument("--loss", type=float, default=0.0, help="fraction of requests the fake trackers drop")
+    parser.add_argument("--peers", type=int, default=50, help="peers in each announce reply")
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--threads", type=int, default=50, help="max_threads of Query.multi and Check.multiple")
+    parser.add_argument("--single-calls", type=int, default=200, help="sequential Query.single calls per size")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument("--out", default="bench_tracker.json")
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    results = []
+    options = dict(num_peers=args.peers, latency=args.latency, loss=args.loss, host="0.0.0.0", seed=0)
+    with FakeUDPTracker(**options) as udp, FakeHTTPTracker(**options) as http:
+        trackers = {"udp": udp, "http": http}
+        for scheme in args.schemes:
+            for size in args.sizes:
+                urls = trackers[scheme].urls(size)
+                for benchmark in args.benchmarks:
+                    result = measure(benchmark, urls, args)
+                    results.append(result)
+                    print(f"{benchmark:<16}{scheme:<6}{size:>7} urls  {result['ops_per_sec']:>10.1f} ops/s  "
+                          f"p50 {(result['p50_latency'] or 0) * 1000:.2f}ms  p99 {(result['p99_latency'] or 0) * 1000:.2f}ms  "
+                          f"errors {result['errors']}"
+                          + (f"  peak {result['peak_memory_mb']:.1f}MB" if result["peak_memory_mb"] is not None else ""))
+
+    with open(args.out, "w") as f:
+        json.dump({
+            "version": version(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "results": results,
+        }, f, indent=2)
+    print(f"\nWrote {args.out}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Local stand-in BitTorrent peer used by the offline peer tests."""
+import asyncio
+import hashlib
+import os
+import struct
+import threading
+
+from torrentlib import Bencode
+
+PIECE_SIZE = 16384
+UT_PEX = 1       # our extension IDs, announced in our extension handshake
+UT_METADATA = 3
+
+
+def make_metadata(num_pieces: int = 2) -> tuple[str, bytes]:
+    """A random info dict spanning num_pieces metadata pieces. Returns (info_hash, metadata)."""
+    info = {b"name": b"file.bin", b"piece length": 16384, b"length": 1 << 20,
+            b"pieces": os.urandom(20 * (PIECE_SIZE * (num_pieces - 1) // 20 + 1))}
+    metadata = Bencode.encode(info)
+    return hashlib.sha1(metadata).hexdigest(), metadata
+
+
+def compact(peers: list[tuple[str, int]]) -> bytes:
+    return b"".join(bytes(int(part) for part in ip.split(".")) + struct.pack("!H", port) for ip, port in peers)
+
+
+class FakePeer:
+    """
+    Minimal extension-protocol peer on 127.0.0.1, served from its own event loop thread.
+
+    After the handshake it sends its extension handshake (with metadata_size)
+    and a bitfield. Once the client's extension handshake arrives it sends
+    one PEX message with pex_peers, after pex_delay seconds. Metadata
+    requests are answered with the piece, rejected for pieces in reject and
+    ignored for pieces in drop.
+    Every framed message the client sends is recorded in received.
+    """
+    def __init__(self, info_hash: str, metadata: bytes|None = None,
+                 pex_peers: list[tuple[str, int]]|None = None, pex_delay: float = 0,
+                 bitfield: bytes = b"\xff\x80", reject: set[int]|None = None, drop: set[int]|None = None,
+                 burst_haves: int = 0):
+        self.info_hash = bytes.fromhex(info_hash)
+        self.metadata = metadata
+        self.pex_peers = pex_peers or []
+        self.pex_delay = pex_delay
+        self.bitfield = bitfield
+        self.reject = reject or set()
+        self.drop = drop or set()
+        self.burst_haves = burst_haves
+        self.received: list[tuple[int, bytes]] = []
+        self.connections = 0
+        self._writers: set[asyncio.StreamWriter] = set()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._server: asyncio.AbstractServer|None = None
+        self.port = 0
+
+    def __enter__(self):
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._serve, "127.0.0.1", 0, backlog=4096), self._loop).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        async def shutdown():
+            self._server.close()  # type: ignore[union-attr]
+            for writer in list(self._writers):
+                writer.close()
+            tasks = asyncio.all_tasks() - {asyncio.current_task()}
+            if tasks:
+                await asyncio.wait(tasks, timeout=1)
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        return False
+
+    @property
+    def addr(self) -> tuple[str, int]:
+        return "127.0.0.1", self.port
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            handshake = await reader.readexactly(68)
+            if handshake[28:48] != self.info_hash:
+                return
+            reserved = bytearray(8)
+            reserved[5] |= 0x10
+            writer.write(b"\x13BitTorrent protocol" + bytes(reserved) + self.info_hash + b"-FAKE-00000000000000")
+            extended = {b"m": {b"ut_pex": UT_PEX, b"ut_metadata": UT_METADATA}}
+            if self.metadata is not None:
+                extended[b"metadata_size"] = len(self.metadata)
+            self._send(writer, 20, bytes([0]) + Bencode.encode(extended))
+            self._send(writer, 5, self.bitfield)
+            for i in range(self.burst_haves):
+                self._send(writer, 4, struct.pack("!I", i))
+
+            client_ids: dict[bytes, int] = {}
+            while True:
+                length, = struct.unpack("!I", await reader.readexactly(4))
+                if length == 0:
+                    continue
+                message = await reader.readexactly(length)
+                self.received.append((message[0], message[1:]))
+                if message[0] != 20:
+                    continue
+                if message[1] == 0:
+                    client_ids = Bencode.decode(message[2:]).get(b"m", {})
+                    if b"ut_pex" in client_ids and self.pex_peers:
+                        asyncio.get_running_loop().call_later(
+                            self.pex_delay, self._send, writer, 20,
+                            bytes([client_ids[b"ut_pex"]]) + Bencode.encode({b"added": compact(self.pex_peers)}))
+                elif message[1] == UT_METADATA and b"ut_metadata" in client_ids:
+                    self._answer_metadata(writer, client_ids[b"ut_metadata"], Bencode.decode(message[2:]))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _answer_metadata(self, writer: asyncio.StreamWriter, ext_id: int, request: dict):
+        piece = request[b"piece"]
+        if piece in self.drop:
+            return
+        start = piece * PIECE_SIZE
+        if self.metadata is None or piece in self.reject or start >= len(self.metadata):
+            self._send(writer, 20, bytes([ext_id]) + Bencode.encode({b"msg_type": 2, b"piece": piece}))
+            return
+        header = Bencode.encode({b"msg_type": 1, b"piece": piece, b"total_size": len(self.metadata)})
+        self._send(writer, 20, bytes([ext_id]) + header + self.metadata[start:start + PIECE_SIZE])
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, msg_id: int, payload: bytes):
+        if not writer.is_closing():
+            writer.write(struct.pack("!IB", len(payload) + 1, msg_id) + payload)
@@ -0,0 +1,230 @@
+"""Local stand-in tracker used by the offline tests and benchmarks."""
+import heapq
+import itertools
+import socket
+import struct
+import threading
+import time
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import bencodepy
+
+PROTOCOL_ID = 0x41727101980
+
+
+def _compact_peers(num_peers: int) -> bytes:
+    return b"".join(struct.pack("!4sH", bytes([10, 0, i >> 8 & 0xFF, i & 0xFF]), 6881)
+                    for i in range(1, num_peers + 1))
+
+
+def loopback_urls(scheme: str, port: int, n: int) -> list[str]:
+    """n tracker URLs on distinct loopback addresses (127.0.0.1, 127.0.0.2, ...) sharing one port."""
+    return [f"{scheme}://127.0.{i >> 8}.{i & 0xFF}:{port}/announce" for i in range(1, n + 1)]
+
+
+def scrape_stats(info_hash: bytes) -> tuple[int, int, int]:
+    """Deterministic (seeders, completed, leechers) for an info hash."""
+    return info_hash[0], info_hash[1], info_hash[2]
+
+
+class FakeUDPTracker:
+    """
+    Minimal BEP 15 tracker on 127.0.0.1 answering connect, announce and scrape.
+
+    Counts requests per action so tests can check round-trips. Replies can
+    be delayed by latency seconds, and a loss fraction of requests is
+    dropped unanswered. Bound to host "0.0.0.0", the tracker answers on
+    every loopback address, so urls(n) gives n distinct trackers.
+    """
+    def __init__(self, num_peers: int = 5, interval: int = 1800, latency: float = 0,
+                 loss: float = 0, host: str = "127.0.0.1", seed: int|None = None):
+        self.num_peers = num_peers
+        self.interval = interval
+        self.latency = latency
+        self.loss = loss
+        self.counts = {"connect": 0, "announce": 0, "scrape": 0, "lost": 0}
+        self.connection_ids: set[int] = set()
+        self._random = random.Random(seed)
+        self._peers = (-1, b"")  # (num_peers, compact peers) of the last announce
+
+        self.s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 << 20)  # sweeps send 1000s of probes at once
+        self.s.bind((host, 0))
+        self.s.settimeout(0.2)
+        self.port = self.s.getsockname()[1]
+        self.url = f"udp://127.0.0.1:{self.port}/announce"
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._delayed: list[tuple[float, int, bytes, tuple]] = []  # heap of (send_at, seq, reply, addr)
+        self._delayed_cond = threading.Condition()
+        self._seq = itertools.count()
+        self._sender = threading.Thread(target=self._send_delayed, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        self._sender.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        with self._delayed_cond:
+            self._delayed_cond.notify()
+        self._thread.join()
+        self._sender.join()
+        self.s.close()
+        return False
+
+    def urls(self, n: int) -> list[str]:
+        """n URLs of this tracker on distinct loopback addresses (needs host "0.0.0.0")."""
+        return loopback_urls("udp", self.port, n)
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                packet, addr = self.s.recvfrom(2048)
+            except socket.timeout:
+                continue
+            if self.loss and self._random.random() < self.loss:
+                self.counts["lost"] += 1
+                continue
+            reply = self.handle(packet)
+            if reply is None:
+                continue
+            if self.latency:
+                with self._delayed_cond:
+                    heapq.heappush(self._delayed, (time.monotonic() + self.latency, next(self._seq), reply, addr))
+                    self._delayed_cond.notify()
+            else:
+                self._send(reply, addr)
+
+    def _send_delayed(self):
+        with self._delayed_cond:
+            while not self._stop.is_set():
+                now = time.monotonic()
+                while self._delayed and self._delayed[0][0] <= now:
+                    _, _, reply, addr = heapq.heappop(self._delayed)
+                    self._send(reply, addr)
+                self._delayed_cond.wait(self._delayed[0][0] - now if self._delayed else None)
+
+    def _send(self, reply: bytes, addr):
+        try:
+            self.s.sendto(reply, addr)
+        except OSError:
+            pass  # closed while a delayed reply was pending
+
+    def handle(self, packet: bytes) -> bytes|None:
+        connection_id, action, transaction_id = struct.unpack("!qiI", packet[:16])
+        if action == 0:
+            if connection_id != PROTOCOL_ID:
+                return None
+            self.counts["connect"] += 1
+            new_id = random.getrandbits(63)
+            self.connection_ids.add(new_id)
+            return struct.pack("!iIq", 0, transaction_id, new_id)
+        if connection_id not in self.connection_ids:
+            return struct.pack("!iI", 3, transaction_id) + b"unknown connection id"
+        if action == 1:
+            self.counts["announce"] += 1
+            return struct.pack("!iIiii", 1, transaction_id, self.interval, 0, self.num_peers) + self._compact_peers()
+        if action == 2:
+            self.counts["scrape"] += 1
+            hashes = [packet[i:i + 20] for i in range(16, len(packet), 20)]
+            return struct.pack("!iI", 2, transaction_id) + b"".join(
+                struct.pack("!iii", *scrape_stats(h)) for h in hashes)
+        return None
+
+    def _compact_peers(self) -> bytes:
+        if self._peers[0] != self.num_peers:
+            self._peers = (self.num_peers, _compact_peers(self.num_peers))
+        return self._peers[1]
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # sweeps open many connections at once
+
+
+class FakeHTTPTracker:
+    """
+    Minimal HTTP tracker on 127.0.0.1 answering compact announces and scrapes.
+
+    Query values are decoded as latin-1 so binary info hashes survive.
+    Scrapes answer at most max_scrape_hashes torrents and, if known_hashes
+    is given, leave out the others as unknown. latency, loss and host work as in FakeUDPTracker; a lost request has
+    its connection closed without a reply.
+    """
+    def __init__(self, num_peers: int = 5, interval: int = 1800, max_scrape_hashes: int|None = None,
+                 known_hashes: set[bytes]|None = None, latency: float = 0, loss: float = 0, host: str = "127.0.0.1", seed: int|None = None):
+        self.num_peers = num_peers
+        self.interval = interval
+        self.max_scrape_hashes = max_scrape_hashes
+        self.known_hashes = known_hashes
+        self.latency = latency
+        self.loss = loss
+        self._random = random.Random(seed)
+        self.requests: list[dict[str, list[str]]] = []
+        self.clients: set[tuple[str, int]] = set()  # distinct client (ip, port) = TCP connections
+
+        tracker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if tracker.loss and tracker._random.random() < tracker.loss:
+                    self.close_connection = True
+                    return
+                if tracker.latency:
+                    time.sleep(tracker.latency)
+                parsed = urlparse(self.path)
+                query = parse_qs(parsed.query, keep_blank_values=True, encoding="latin-1")
+                tracker.requests.append(query)
+                tracker.clients.add(self.client_address)
+                body = tracker.respond(parsed.path, query)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = _Server((host, 0), Handler)
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}/announce"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.server.shutdown()
+        self.server.server_close()
+        self._thread.join()
+        return False
+
+    def urls(self, n: int) -> list[str]:
+        """n URLs of this tracker on distinct loopback addresses (needs host "0.0.0.0")."""
+        return loopback_urls("http", self.port, n)
+
+    def respond(self, path: str, query: dict[str, list[str]]) -> bytes:
+        if path.rpartition("/")[2].startswith("scrape"):
+            hashes = [h.encode("latin-1") for h in query.get("info_hash", [])][:self.max_scrape_hashes]
+            if self.known_hashes is not None:
+                hashes = [h for h in hashes if h in self.known_hashes]
+            return bencodepy.encode({b"files": {
+                h: dict(zip((b"complete", b"downloaded", b"incomplete"), scrape_stats(h)))
+                for h in hashes
+            }})
+        return bencodepy.encode({
+            b"interval": self.interval,
+            b"min interval": self.interval // 2,
+            b"complete": self.num_peers,
+            b"incomplete": 0,
+            b"peers": _compact_peers(self.num_peers),
+        })
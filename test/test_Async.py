@@ -0,0 +1,72 @@
+import asyncio
+import pytest
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, Check, AsyncHTTP
+from torrentlib.Tracker.TrackerQueryException import TrackerQueryException
+from fake_tracker import FakeUDPTracker, FakeHTTPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_single_async_matches_sync():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeHTTPTracker(num_peers=4) as http, FakeUDPTracker(num_peers=4) as udp:
+        for url in (http.url, udp.url):
+            expected = Query.single(torrent, url, self_peer_id, timeout=2)
+            result = asyncio.run(Query.single_async(torrent, url, self_peer_id, timeout=2))
+            assert result == expected
+
+
+def test_multi_async_and_check():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeHTTPTracker() as http, FakeUDPTracker() as udp:
+        urls = [http.url, udp.url, "udp://127.0.0.1:1/announce", "wss://example.com/announce"]
+        result = asyncio.run(Query.multi_async(torrent, urls, self_peer_id, timeout=1))
+        assert result[http.url]["seeders"] == 5
+        assert result[udp.url]["seeders"] == 5
+        assert "error" in result[urls[2]]
+        assert "error" in result[urls[3]]
+
+        status = asyncio.run(Check.multiple_async(urls, timeout=1))
+        assert status == {http.url: True, udp.url: True, urls[2]: False, urls[3]: False}
+
+
+def test_async_get_waits_for_close(monkeypatch):
+    writers = []
+    open_connection = asyncio.open_connection
+
+    async def recording_open_connection(*args, **kwargs):
+        reader, writer = await open_connection(*args, **kwargs)
+        writers.append(writer)
+        return reader, writer
+
+    monkeypatch.setattr(asyncio, "open_connection", recording_open_connection)
+    with FakeHTTPTracker() as http:
+        async def main():
+            for _ in range(3):
+                assert (await AsyncHTTP.get(http.url)).status_code == 200
+            return [writer.get_extra_info("socket").fileno() for writer in writers]
+
+        assert asyncio.run(main()) == [-1, -1, -1]  # closed before get() returned
+    assert AsyncHTTP._default_ssl_context() is AsyncHTTP._default_ssl_context()
+
+
+def test_truncated_body_is_a_tracker_error():
+    async def main():
+        async def serve(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\nd8:interval")  # 12 of 100 bytes
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(serve, "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/announce"
+        async with server:
+            torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+            with pytest.raises(TrackerQueryException):
+                await Query.single_async(torrent, url, self_peer_id, timeout=2)
+            assert await Check.http_async(url, timeout=2) is False
+            return url, await Check.multiple_async([url, "udp://127.0.0.1:1/announce"], timeout=1)
+
+    url, status = asyncio.run(main())
+    assert status == {url: False, "udp://127.0.0.1:1/announce": False}
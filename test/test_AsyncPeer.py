@@ -0,0 +1,72 @@
+import asyncio
+import struct
+import pytest
+from torrentlib import AsyncPeer, Torrent
+from torrentlib.Peer import InvalidResponseException
+from fake_peer import FakePeer, make_metadata
+
+self_peer_id = "-robots-testing12345"
+PEX_PEERS = [("10.0.0.1", 6881), ("10.0.0.2", 51413)]
+
+
+def test_handshake_pex_and_metadata():
+    info_hash, metadata = make_metadata(num_pieces=2)
+    torrent = Torrent(info_hash, 0)
+
+    async def main():
+        async with AsyncPeer(fake.addr, torrent, self_peer_id) as peer:
+            assert peer.peer_supports_extensions
+            assert peer.peer_extension_ids == {"ut_pex": 1, "ut_metadata": 3}
+            assert peer.metadata_size == len(metadata)
+            assert await peer.run_until(lambda: peer.bitfield is not None, 5)
+            assert peer.bitfield == b"\xff\x80"
+            peer.request_all_metadata()
+            await peer.drain()
+            await peer.read_all()
+
+    with FakePeer(info_hash, metadata, pex_peers=PEX_PEERS) as fake:
+        asyncio.run(main())
+    assert set(torrent.peers) == set(PEX_PEERS)
+    assert torrent.metadata == metadata
+
+
+def test_one_loop_holds_many_connections():
+    info_hash, metadata = make_metadata(num_pieces=1)
+    torrent = Torrent(info_hash, 0)
+
+    async def main():
+        peers = [AsyncPeer(fake.addr, torrent, self_peer_id) for _ in range(500)]
+        await asyncio.gather(*(peer.connect() for peer in peers))
+        connected = sum(peer._is_connected() for peer in peers)
+        await asyncio.gather(*(peer.aclose() for peer in peers))
+        return connected
+
+    with FakePeer(info_hash, metadata) as fake:
+        assert asyncio.run(main()) == 500
+        assert fake.connections == 500
+
+
+def test_oversized_length_closes_connection():
+    async def main():
+        peer = AsyncPeer(("127.0.0.1", 1), Torrent("ab" * 20, 0), self_peer_id)
+        peer._reader = asyncio.StreamReader()
+        peer._reader.feed_data(struct.pack("!I", 1 << 30))
+        with pytest.raises(InvalidResponseException):
+            await peer.receive_msg(1)
+        assert peer._reader is None
+
+    asyncio.run(main())
+
+
+def test_run_until_lets_a_started_message_finish():
+    async def main():
+        peer = AsyncPeer(("127.0.0.1", 1), Torrent("ab" * 20, 0), self_peer_id)
+        peer.TIMEOUT = 2
+        peer._reader = asyncio.StreamReader()
+        peer._reader.feed_data(struct.pack("!IB", 3, 5))  # bitfield, body still on its way
+        asyncio.get_running_loop().call_later(0.3, peer._reader.feed_data, b"\xff\x80")
+        assert await peer.run_until(lambda: peer.bitfield is not None, 0.1)
+        assert peer.bitfield == b"\xff\x80"
+        assert not await peer.run_until(lambda: False, 0.1)  # nothing consumed out of sync
+
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+import bencodepy
+import pytest
+from torrentlib import Bencode, Torrent
+from torrentlib.Peer import Peer
+
+VALUES = [0, -42, b"", b"spam", [1, [b"a", {}]], {b"m": {b"ut_pex": 1}, b"v": b"x", b"metadata_size": 31235}]
+
+
+@pytest.mark.parametrize("value", VALUES)
+def test_round_trip_matches_bencodepy(value):
+    encoded = Bencode.encode(value)
+    assert bencodepy.decode(Bencode.encode([value])) == [value]  # bencodepy returns bare scalars as tuples
+    assert Bencode.decode(encoded) == value
+    assert Bencode.decode(memoryview(bytearray(encoded))) == value
+
+
+def test_decode_from_reports_offset():
+    header = Bencode.encode({b"msg_type": 1, b"piece": 0, b"total_size": 5, b"x": {b"a": 1}})  # 'ee' inside the dict
+    payload = b"junk" + header + b"piece"
+    value, end = Bencode.decode_from(memoryview(payload), 4)
+    assert value[b"x"] == {b"a": 1}
+    assert payload[end:] == b"piece"
+
+
+@pytest.mark.parametrize("data", [b"i03e", b"i-0e", b"ie", b"i1x2e", b"02:ab", b"-1:a", b"di1ei2ee", b"x"])
+def test_malformed(data):
+    with pytest.raises(Bencode.BencodeError):
+        Bencode.decode(data)
+
+
+def test_incomplete_and_trailing():
+    with pytest.raises(Bencode.IncompleteError):
+        Bencode.decode(b"d3:fooli1e")
+    with pytest.raises(Bencode.IncompleteError):
+        Bencode.decode(b"5:abc")
+    with pytest.raises(Bencode.BencodeError, match="Trailing"):
+        Bencode.decode(b"i1ei2e")
+
+
+def test_incremental_decoder():
+    stream = b"".join(Bencode.encode(v) for v in VALUES)
+    decoder = Bencode.Decoder()
+    values = []
+    for i in range(0, len(stream), 3):
+        decoder.feed(stream[i:i + 3])
+        values.extend(decoder)
+    assert values == VALUES
+    assert decoder.pending == 0
+
+
+def test_encode_into_appends():
+    buffer = bytearray(b"head")
+    written = Bencode.encode_into({"b": 1, b"a": [b"x", "y"]}, buffer)
+    assert buffer == b"head" + b"d1:al1:x1:ye1:bi1ee"
+    assert written == len(buffer) - 4
+    with pytest.raises(TypeError):
+        Bencode.encode(1.5)
+
+
+def test_metadata_piece_split_at_exact_offset():
+    peer = Peer(("127.0.0.1", 1), Torrent("ab" * 20, 0), "-robots-testing12345")
+    peer.metadata_size = 2 * 16384  # two pieces: stays incomplete after one
+    header = Bencode.encode({b"msg_type": 1, b"piece": 0, b"total_size": 2 * 16384, b"x": {b"a": 1}})
+    peer._handle_metadata_message(header + b"e" * 16384)
+    assert peer.metadata_pieces[0] == b"e" * 16384
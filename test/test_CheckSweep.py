@@ -0,0 +1,54 @@
+import socket
+import time
+from torrentlib import Resolver
+from torrentlib.Tracker import Check, UDPTrackerClient
+from fake_tracker import FakeUDPTracker, FakeHTTPTracker
+
+
+def test_sweep_takes_one_timeout_window():
+    with FakeUDPTracker() as udp, FakeHTTPTracker() as http:
+        alive = [f"{udp.url}{i}" for i in range(1000)] + [http.url, f"{http.url}?x=1"]
+        dead = [f"udp://127.0.0.1:1/announce{i}" for i in range(1000)] + ["udp://invalid.invalid:80", "wss://x"]
+        start = time.monotonic()
+        results = Check.multiple(dead + alive, timeout=1)
+        elapsed = time.monotonic() - start
+
+        assert list(results) == dead + alive
+        assert all(results[url] for url in alive)
+        assert not any(results[url] for url in dead)
+        assert elapsed < 4  # one timeout window, not one per URL
+        assert udp.counts["connect"] == 1  # one probe per (address, port), not per URL
+
+
+def test_cached_connection_skips_probe():
+    with FakeUDPTracker() as udp:
+        assert Check.multiple([udp.url], timeout=1) == {udp.url: True}
+        assert UDPTrackerClient.shared()._cached_connection_id(("127.0.0.1", udp.port)) is not None
+        assert Check.multiple([udp.url], timeout=1) == {udp.url: True}
+        assert udp.counts["connect"] == 1
+
+
+def test_sweep_of_distinct_addresses_with_loss():
+    with FakeUDPTracker(host="0.0.0.0", loss=0.1, seed=1) as udp:
+        urls = udp.urls(300)
+        assert len({url.split("/")[2] for url in urls}) == 300  # one address per tracker
+        results = Check.multiple(urls, timeout=1)
+        assert udp.counts["connect"] + udp.counts["lost"] == 300
+        assert 0 < list(results.values()).count(False) == udp.counts["lost"]
+
+
+def test_slow_dns_does_not_stretch_sweep(monkeypatch):
+    monkeypatch.setattr(Resolver, "_shared", Resolver())
+    real = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        if host == "slow.example":
+            time.sleep(3)
+        return real("127.0.0.1", *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    with FakeUDPTracker() as udp:
+        slow = f"udp://slow.example:{udp.port}/announce"
+        start = time.monotonic()
+        assert Check.multiple([slow, udp.url], timeout=1) == {slow: False, udp.url: True}
+        assert time.monotonic() - start < 2
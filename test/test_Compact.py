@@ -0,0 +1,53 @@
+import socket
+import struct
+import bencodepy
+from torrentlib import Torrent
+from torrentlib.Compact import (
+    decode_peers,
+    decode_peers6,
+    decode_peers_packed,
+    decode_peers6_packed,
+    packed_to_peers,
+    packed6_to_peers
+)
+from torrentlib.Peer.Peer import parse_pex_message
+from torrentlib.Tracker import Query
+from fake_tracker import FakeUDPTracker, FakeHTTPTracker
+
+self_peer_id = "-robots-testing12345"
+peers = [("10.0.0.1", 6881), ("192.168.255.254", 1), ("1.2.3.4", 65535)]
+peers6 = [("2001:db8::1", 6881), ("fe80::abcd:1234", 51413)]
+blob = b"".join(socket.inet_aton(ip) + struct.pack("!H", port) for ip, port in peers)
+blob6 = b"".join(socket.inet_pton(socket.AF_INET6, ip) + struct.pack("!H", port) for ip, port in peers6)
+
+
+def test_decoders_agree():
+    assert decode_peers(blob + b"\x01\x02") == peers  # trailing partial entry ignored
+    assert decode_peers6(blob6) == peers6
+
+    ips, ports = decode_peers_packed(blob)
+    assert list(ips) == [int.from_bytes(socket.inet_aton(ip), "big") for ip, _ in peers]
+    assert list(ports) == [port for _, port in peers]
+    assert packed_to_peers(ips, ports) == peers
+    assert packed6_to_peers(*decode_peers6_packed(blob6)) == peers6
+    assert decode_peers(b"") == [] and len(decode_peers_packed(b"")[0]) == 0
+
+
+def test_pex_message():
+    payload = bencodepy.encode({b"added": blob, b"added.f": b"\x02\x00\x00",
+                                b"added6": blob6, b"dropped": blob[:6], b"dropped6": blob6[18:]})
+    result = parse_pex_message(payload)
+    assert [(p["ip"], p["port"]) for p in result["added"]] == peers
+    assert result["added"][0]["seed"] and "seed" not in result["added"][1]
+    assert [(p["ip"], p["port"]) for p in result["added6"]] == peers6
+    assert result["dropped"] == [{"ip": "10.0.0.1", "port": 6881}]
+    assert result["dropped6"] == [{"ip": "fe80::abcd:1234", "port": 51413}]
+
+
+def test_compact_query_results():
+    with FakeUDPTracker(num_peers=50) as udp, FakeHTTPTracker(num_peers=50) as http:
+        for url in (udp.url, http.url):
+            torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+            ips, ports = Query.single(torrent, url, self_peer_id, timeout=2, compact=True)["peers"]
+            assert len(ips) == len(ports) == 50
+            assert set(torrent.peers) == set(packed_to_peers(ips, ports))
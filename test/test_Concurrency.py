@@ -0,0 +1,61 @@
+import random
+import time
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, Check, AdaptiveLimiter
+from fake_tracker import FakeUDPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_aimd_grows_and_backs_off():
+    # A steady share of dead trackers is not a spike
+    limiter = AdaptiveLimiter(initial=4, max_limit=64)
+    for i in range(200):
+        assert limiter.acquire(timeout=0)
+        limiter.release(i % 4 != 0, 0.05)
+    steady = limiter.limit
+    assert steady == 64 and limiter.stats()["slow_start"]  # slow start: +1 per success
+
+    # ...but a burst of timeouts is
+    for _ in range(steady):
+        limiter.acquire()
+        limiter.release(False)
+    assert limiter.limit <= steady // 2 + 1
+    assert not limiter.stats()["slow_start"]
+
+    # Rising latency holds the limit
+    held = limiter.limit
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(True, 1.0)
+    assert limiter.limit == held
+
+
+def test_limit_caps_in_flight():
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    assert limiter.try_acquire() and limiter.try_acquire()
+    assert not limiter.try_acquire() and not limiter.acquire(timeout=0.05)
+    limiter.release(None)
+    assert limiter.try_acquire() and limiter.stats()["in_flight"] == 2
+
+
+def test_sweeps_use_limiter():
+    limiter = AdaptiveLimiter(initial=2, max_limit=8)
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeUDPTracker(latency=0.05) as tracker:
+        urls = [f"{tracker.url}{i}" for i in range(30)]
+        assert all(Check.multiple(urls, timeout=2, limiter=limiter).values())
+        results = Query.multi(torrent, urls, self_peer_id, timeout=2, limiter=limiter)
+        assert all("seeders" in r for r in results.values())
+    stats = limiter.stats()
+    assert stats["successes"] >= 31 and stats["in_flight"] == 0 and stats["limit"] == 8
+
+
+def test_mixed_tracker_latencies_do_not_stall_growth():
+    # Trackers in one sweep differ widely in latency; that alone is not congestion
+    rng = random.Random(1)
+    limiter = AdaptiveLimiter(initial=16, max_limit=1000)
+    for _ in range(5000):
+        limiter.acquire()
+        limiter.release(True, rng.uniform(0.02, 0.5))
+    assert limiter.limit >= 500
@@ -0,0 +1,35 @@
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, Check, HTTPSessionPool
+from fake_tracker import FakeHTTPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_pool_reuses_connections():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    pool = HTTPSessionPool(pool_size=2)
+    try:
+        with FakeHTTPTracker() as tracker:
+            for _ in range(5):
+                result = Query.single(torrent, tracker.url, self_peer_id, timeout=2, session_pool=pool)
+                assert result["seeders"] == 5
+            assert Check.http(tracker.url, timeout=2, session_pool=pool)
+            assert len(tracker.clients) == 1
+
+            Query.http(torrent, tracker.url, self_peer_id, timeout=2)
+            assert len(tracker.clients) == 2  # unpooled request opens its own connection
+    finally:
+        pool.close()
+
+
+def test_pool_evicts_idle_sessions():
+    pool = HTTPSessionPool(idle_timeout=0, max_hosts=2)
+    first = pool.session("https://a.example.com/announce")
+    assert pool.session("https://a.example.com/announce") is not first  # idle_timeout=0 evicts at once
+
+    pool = HTTPSessionPool(max_hosts=2)
+    a = pool.session("https://a.example.com/announce")
+    assert pool.session("https://a.example.com:443/scrape") is a  # same host, same session
+    pool.session("https://b.example.com/announce")
+    pool.session("https://c.example.com/announce")
+    assert len(pool) == 2
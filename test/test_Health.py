@@ -0,0 +1,39 @@
+import time
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, Check, TrackerHealth
+from fake_tracker import FakeUDPTracker
+
+self_peer_id = "-robots-testing12345"
+dead_url = "udp://127.0.0.1:1/announce"
+
+
+def test_adaptive_timeout_and_skip():
+    health = TrackerHealth(margin=0.5, skip_after=2, cooldown=60)
+    for latency in [0.1] * 19 + [1.0]:
+        health.record_success("udp://a", latency)
+    assert health.timeout_for("udp://a", 5) == 0.6  # p95 of mostly-0.1s samples + margin
+    assert health.timeout_for("udp://unknown", 5) == 5
+
+    health.record_failure("udp://b")
+    assert not health.should_skip("udp://b")
+    assert health.timeout_for("udp://a", 5) == 0.6
+    health.record_failure("udp://b")
+    assert health.should_skip("udp://b")
+    assert health.order(["udp://b", "udp://c", "udp://a"]) == ["udp://a", "udp://c", "udp://b"]
+
+
+def test_multi_skips_dead_trackers():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    health = TrackerHealth(skip_after=1)
+    with FakeUDPTracker() as tracker:
+        Query.multi(torrent, [tracker.url, dead_url], self_peer_id, timeout=1, health=health)
+        assert health.stats(tracker.url)["failure_streak"] == 0
+        assert health.stats(dead_url)["failure_streak"] == 1
+
+        start = time.monotonic()
+        result = Query.multi(torrent, [tracker.url, dead_url], self_peer_id, timeout=1, health=health)
+        assert time.monotonic() - start < 0.5  # dead tracker no longer costs its timeout
+        assert "Skipped" in result[dead_url]["error"]
+        assert result[tracker.url]["seeders"] == 5
+
+        assert Check.multiple([tracker.url, dead_url], timeout=1, health=health) == {tracker.url: True, dead_url: False}
@@ -0,0 +1,68 @@
+import time
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, Check, TrackerHealth, TrackerHealthStore
+from fake_tracker import FakeUDPTracker
+
+self_peer_id = "-robots-testing12345"
+dead_url = "udp://127.0.0.1:1/announce"
+
+
+def test_store_persists_and_warm_starts(tmp_path):
+    path = str(tmp_path / "health.db")
+    with TrackerHealthStore(path) as store:
+        store.record("udp://a", True, 0.2)
+        store.record_many([("udp://b", False, None), ("udp://b", False, None), ("udp://c", True, 0.05)])
+
+    with TrackerHealthStore(path, ttl=60) as store:
+        assert len(store) == 3
+        assert store.get("udp://b")["failure_streak"] == 2
+        assert store.order(["udp://b", "udp://new", "udp://a", "udp://c"]) == ["udp://c", "udp://a", "udp://new", "udp://b"]
+        assert store.fresh(["udp://a", "udp://b", "udp://new"]) == {"udp://a": True, "udp://b": False}
+        assert store.fresh(["udp://a"], now=time.time() + 120) == {}
+
+        health = TrackerHealth()
+        assert store.load_into(health) == 3
+        assert health.stats("udp://a")["latency"] == 0.2
+        assert health.stats("udp://b")["failure_streak"] == 2
+
+
+def test_check_and_query_consult_store():
+    store = TrackerHealthStore(":memory:", ttl=60)
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeUDPTracker() as tracker:
+        urls = [dead_url, f"{tracker.url}?a"]
+        assert Check.multiple(urls, timeout=1, store=store) == {dead_url: False, f"{tracker.url}?a": True}
+        assert store.get(f"{tracker.url}?a")["latency"] is not None
+
+        # Fresh results are reused: no probe, no timeout wait
+        start = time.monotonic()
+        assert Check.multiple(urls, timeout=1, store=store) == {dead_url: False, f"{tracker.url}?a": True}
+        assert time.monotonic() - start < 0.5
+
+        results = Query.multi(torrent, [dead_url, tracker.url], self_peer_id, timeout=1, store=store)
+        assert "Skipped" in results[dead_url]["error"]
+        assert results[tracker.url]["seeders"] == 5
+        assert store.get(tracker.url)["alive"]
+    store.close()
+
+
+def test_lookups_and_query_outcomes_are_batched():
+    store = TrackerHealthStore(":memory:", ttl=60)
+    store.record_many([(f"udp://t{i}", i % 2 == 0, 0.1) for i in range(1200)])
+    statements = []
+    store._db.set_trace_callback(statements.append)
+    urls = [f"udp://t{i}" for i in range(1200)] + ["udp://new"]
+    assert len(store.fresh(urls)) == 1200
+    assert store.order(urls)[-1] == "udp://t1199"
+    assert len(statements) == 6  # 1201 URLs in batches of 500, per lookup
+
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeUDPTracker() as tracker:
+        statements.clear()
+        urls = [f"{tracker.url}?n={i}" for i in range(20)]
+        results = Query.multi(torrent, urls, self_peer_id, timeout=1, store=store)
+        assert all(result["seeders"] == 5 for result in results.values())
+    assert sum(statement.lstrip().startswith("INSERT") for statement in statements) == 20
+    assert statements.count("COMMIT") == 1  # one transaction for the whole sweep
+    assert all(store.get(url)["alive"] for url in urls)
+    store.close()
@@ -0,0 +1,63 @@
+import socket
+import struct
+import pytest
+from torrentlib import Peer, Torrent
+from torrentlib.Peer.MessageBuffer import MessageBuffer
+from fake_peer import FakePeer, make_metadata
+
+self_peer_id = "-robots-testing12345"
+
+
+def frame(msg_id: int, payload: bytes = b"") -> bytes:
+    return struct.pack("!IB", len(payload) + 1, msg_id) + payload
+
+
+def test_one_fill_yields_every_complete_message():
+    a, b = socket.socketpair()
+    with a, b:
+        a.sendall(b"".join(frame(4, struct.pack("!I", i)) for i in range(100)) + b"\x00\x00\x00\x00")
+        buffer = MessageBuffer()
+        assert buffer.fill(b) == 100 * 9 + 4
+        messages = [(msg_id, bytes(payload)) for msg_id, payload in buffer]
+    assert messages == [(4, struct.pack("!I", i)) for i in range(100)] + [(None, b"")]
+    assert buffer.pending == 0
+
+
+def test_message_split_across_fills():
+    data = frame(20, b"\x00" + b"x" * 50) + frame(1)
+    buffer = MessageBuffer(size=8)
+    completed = []
+    for i in range(len(data)):
+        buffer.feed(data[i:i + 1])
+        completed += [(i, msg_id, bytes(payload)) for msg_id, payload in buffer]
+    assert completed == [(55, 20, b"\x00" + b"x" * 50), (60, 1, b"")]
+
+
+def test_growing_keeps_earlier_views_valid():
+    buffer = MessageBuffer(size=16)
+    buffer.feed(frame(5, b"\xaa\xbb"))
+    msg_id, payload = buffer.next_message()  # type: ignore[misc]
+    buffer.feed(frame(7, b"y" * 100_000))  # grows while payload is still exported
+    assert bytes(payload) == b"\xaa\xbb"
+    msg_id, payload = buffer.next_message()  # type: ignore[misc]
+    assert msg_id == 7 and len(payload) == 100_000
+
+
+def test_oversized_length_is_rejected():
+    buffer = MessageBuffer(max_length=1024)
+    buffer.feed(struct.pack("!I", 1025))
+    with pytest.raises(ValueError):
+        buffer.next_message()
+
+
+def test_peer_handles_have_burst_pex_and_metadata():
+    info_hash, metadata = make_metadata(num_pieces=2)
+    torrent = Torrent(info_hash, 0)
+    pex_peers = [("10.0.0.1", 6881), ("10.0.0.2", 51413)]
+    with FakePeer(info_hash, metadata, pex_peers=pex_peers, bitfield=bytes(250), burst_haves=2000) as fake:
+        with Peer(fake.addr, torrent, self_peer_id) as peer:
+            peer.request_all_metadata()
+            peer.read_all()
+            assert peer.bitfield == b"\xff" * 250
+    assert set(torrent.peers) == set(pex_peers)
+    assert torrent.metadata == metadata
@@ -0,0 +1,79 @@
+import asyncio
+import gc
+import time
+from contextlib import ExitStack
+from torrentlib import MetadataFetcher, Torrent
+from fake_peer import FakePeer, make_metadata, UT_METADATA
+
+self_peer_id = "-robots-testing12345"
+
+
+def requested(fake: FakePeer) -> int:
+    return sum(1 for msg_id, payload in fake.received if msg_id == 20 and payload[0] == UT_METADATA)
+
+
+def test_stripes_pieces_across_peers():
+    info_hash, metadata = make_metadata(num_pieces=8)
+    torrent = Torrent(info_hash, 0)
+    with ExitStack() as stack:
+        fakes = [stack.enter_context(FakePeer(info_hash, metadata)) for _ in range(4)]
+        result = MetadataFetcher(torrent, self_peer_id, max_connections=4).fetch([f.addr for f in fakes], timeout=10)
+        counts = [requested(f) for f in fakes]
+    assert result == metadata == torrent.metadata
+    assert torrent.name == "file.bin"
+    assert sum(counts) >= 8 and sum(1 for c in counts if c) >= 2
+
+
+def test_reject_and_timeout_move_to_other_peers():
+    info_hash, metadata = make_metadata(num_pieces=4)
+    torrent = Torrent(info_hash, 0)
+    with FakePeer(info_hash, metadata, reject={0, 1}) as rejecting, \
+         FakePeer(info_hash, metadata, drop={2, 3}) as silent:
+        start = time.monotonic()
+        fetcher = MetadataFetcher(torrent, self_peer_id, request_timeout=0.3)
+        assert fetcher.fetch([rejecting.addr, silent.addr], timeout=10) == metadata
+        assert time.monotonic() - start < 3
+
+
+def test_peer_serving_bad_data_is_worked_around():
+    info_hash, metadata = make_metadata(num_pieces=3)
+    _, other = make_metadata(num_pieces=3)
+    bad_metadata = other[:len(metadata)].ljust(len(metadata), b"x")
+    torrent = Torrent(info_hash, 0)
+    with FakePeer(info_hash, bad_metadata) as bad, FakePeer(info_hash, metadata) as good:
+        assert MetadataFetcher(torrent, self_peer_id).fetch([bad.addr, good.addr], timeout=10) == metadata
+
+
+def test_gives_up_without_metadata():
+    info_hash, metadata = make_metadata(num_pieces=2)
+    torrent = Torrent(info_hash, 0)
+    with FakePeer(info_hash, metadata, reject={1}) as fake:
+        assert MetadataFetcher(torrent, self_peer_id).fetch([fake.addr], timeout=10) is None
+    assert MetadataFetcher(torrent, self_peer_id).fetch([], timeout=1) is None
+
+
+def test_peer_announcing_wrong_size_is_worked_around():
+    info_hash, metadata = make_metadata(num_pieces=2)
+    for max_connections in (1, 4):
+        torrent = Torrent(info_hash, 0)
+        with FakePeer(info_hash, metadata + b"junk") as liar, FakePeer(info_hash, metadata) as honest:
+            fetcher = MetadataFetcher(torrent, self_peer_id, max_connections=max_connections)
+            assert fetcher.fetch([liar.addr, honest.addr], timeout=10) == metadata
+
+
+def test_failed_workers_leave_no_unretrieved_exceptions(monkeypatch):
+    async def failing_worker(self, candidates, done):
+        raise RuntimeError("worker failed")
+
+    monkeypatch.setattr(MetadataFetcher, "_worker", failing_worker)
+    errors = []
+
+    async def main():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        fetcher = MetadataFetcher(Torrent("ab" * 20, 0), self_peer_id)
+        result = await fetcher.fetch_async([("127.0.0.1", 1)], timeout=1)
+        gc.collect()
+        return result
+
+    assert asyncio.run(main()) is None
+    assert errors == []
@@ -0,0 +1,66 @@
+import pytest
+from torrentlib import Torrent
+from torrentlib.Tracker import Check, Metrics, Query
+from torrentlib.Tracker.TrackerQueryException import TimeoutError
+from fake_tracker import FakeUDPTracker, FakeHTTPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+@pytest.fixture
+def metrics():
+    metrics = Metrics.shared()
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+def counter(snapshot, name, **labels):
+    return sum(s["value"] for s in snapshot["counters"].get(name, [])
+               if all(s["labels"].get(k) == v for k, v in labels.items()))
+
+
+def test_disabled_records_nothing():
+    metrics = Metrics()
+    metrics.inc("x_total")
+    metrics.observe("y_seconds", 0.1)
+    metrics.record("tracker_check", "udp://a:1", "up", 0.1)
+    assert metrics.snapshot()["counters"] == {} and metrics.snapshot()["histograms"] == {}
+
+
+def test_histogram_and_prometheus_text():
+    metrics = Metrics(enabled=True, buckets=(0.1, 1.0))
+    for latency in (0.05, 0.1, 0.5, 3):
+        metrics.observe("lat_seconds", latency, tracker='udp://"q"')
+    metrics.inc("hits_total", 2, scheme="udp")
+
+    [series] = metrics.snapshot()["histograms"]["lat_seconds"]
+    assert series["buckets"] == {0.1: 2, 1.0: 3, float("inf"): 4}
+    assert series["count"] == 4 and series["sum"] == pytest.approx(3.65)
+
+    text = metrics.prometheus()
+    assert '# TYPE hits_total counter\nhits_total{scheme="udp"} 2\n' in text
+    assert 'lat_seconds_bucket{tracker="udp://\\"q\\"",le="+Inf"} 4' in text
+    assert 'lat_seconds_count{tracker="udp://\\"q\\""} 4' in text
+
+
+def test_query_and_check_report(metrics):
+    torrent = Torrent("ab" * 20, 0)
+    with FakeUDPTracker() as udp, FakeHTTPTracker() as http:
+        Query.single(torrent, udp.url, self_peer_id, timeout=2)
+        Query.single(torrent, http.url, self_peer_id, timeout=2)
+        with pytest.raises(TimeoutError):
+            Query.single(torrent, "udp://127.0.0.1:1/announce", self_peer_id, timeout=0.3)
+        Check.multiple([http.url, f"{udp.url}?x", "udp://127.0.0.1:1/announce?y"], timeout=0.5)
+
+    snapshot = metrics.snapshot()
+    assert counter(snapshot, "tracker_announces_total", scheme="udp", result="ok") == 1
+    assert counter(snapshot, "tracker_announces_total", scheme="http", result="ok") == 1
+    assert counter(snapshot, "tracker_announces_total", result="TimeoutError") == 1
+    assert counter(snapshot, "tracker_checks_total", result="up") == 2
+    assert counter(snapshot, "tracker_checks_total", result="down") == 1
+    assert counter(snapshot, "tracker_received_bytes_total") > 0
+    trackers = {s["labels"]["tracker"] for s in snapshot["histograms"]["tracker_announce_duration_seconds"]}
+    assert trackers == {udp.url, http.url}
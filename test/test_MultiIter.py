@@ -0,0 +1,29 @@
+import time
+from torrentlib import Torrent
+from torrentlib.Tracker import Query
+from fake_tracker import FakeUDPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_results_stream_and_stop_early():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeUDPTracker() as fast, FakeUDPTracker(latency=3) as slow:
+        start = time.monotonic()
+        first = next(Query.multi_iter(torrent, [slow.url, fast.url], self_peer_id, timeout=5))
+        assert first[0] == fast.url
+        assert time.monotonic() - start < 1
+
+        start = time.monotonic()
+        result = Query.multi(torrent, [slow.url, fast.url], self_peer_id, timeout=5, first_k=1)
+        assert list(result) == [fast.url]
+        assert time.monotonic() - start < 1
+
+        seen = []
+        result = Query.multi(torrent, [slow.url, fast.url], self_peer_id, timeout=5, deadline=0.5,
+                             on_result=lambda url, r: seen.append(url))
+        assert seen == [fast.url] and list(result) == [fast.url]
+
+        result = Query.multi(torrent, [slow.url, fast.url], self_peer_id, timeout=5,
+                             stop_when=lambda url, r: len(torrent.peers) >= 5)
+        assert list(result) == [fast.url]
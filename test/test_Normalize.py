@@ -0,0 +1,51 @@
+import threading
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, UDPTrackerClient
+from torrentlib.Tracker.Normalize import normalize_url, url_key, group_urls
+from fake_tracker import FakeUDPTracker, FakeHTTPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_normalize_and_group():
+    assert normalize_url("HTTP://Tracker.Example.com:80/announce/") == "http://tracker.example.com/announce"
+    assert normalize_url("https://t.example:443/a?passkey=X#frag") == "https://t.example/a?passkey=X"
+    assert normalize_url("udp://[::1]:6969/") == "udp://[::1]:6969"
+    assert normalize_url("udp:///announce") is None and normalize_url("http://x:bad/") is None
+    assert url_key("http://x/announce") == url_key("https://X:443/announce/")
+    assert url_key("http://x:8080/announce") != url_key("https://x:8080/announce/x")
+
+    groups = group_urls(["udp://a:1/announce", "http://b/announce", "UDP://A:1/announce/", "https://b/announce", "junk"])
+    assert groups == {"udp://a:1/announce": ["udp://a:1/announce", "UDP://A:1/announce/"],
+                      "http://b/announce": ["http://b/announce", "https://b/announce"],
+                      "junk": ["junk"]}
+
+
+def test_multi_announces_once_per_tracker():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeUDPTracker() as udp, FakeHTTPTracker() as http:
+        urls = [udp.url, udp.url + "/", udp.url.replace("udp:", "UDP:"), http.url, http.url + "/"]
+        results = Query.multi(torrent, urls, self_peer_id, timeout=2)
+        assert set(results) == set(urls)
+        assert all(r["seeders"] == 5 for r in results.values())
+        assert udp.counts["announce"] == 1
+        assert len(http.requests) == 1
+
+
+def test_concurrent_announces_are_coalesced():
+    client = UDPTrackerClient()
+    try:
+        with FakeUDPTracker(latency=0.2) as tracker:
+            replies = []
+            threads = [threading.Thread(target=lambda: replies.append(
+                           client.announce("127.0.0.1", tracker.port, bytes(82), timeout=2)))
+                       for _ in range(10)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert len(replies) == 10 and len(set(replies)) == 1
+            assert tracker.counts["connect"] == 1
+            assert tracker.counts["announce"] == 1
+    finally:
+        client.close()
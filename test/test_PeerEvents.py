@@ -0,0 +1,76 @@
+import asyncio
+import time
+from torrentlib import AsyncPeer, Peer, Torrent
+from fake_peer import FakePeer, make_metadata
+
+self_peer_id = "-robots-testing12345"
+PEX_PEERS = [("10.0.0.1", 6881), ("10.0.0.2", 51413)]
+
+
+def record(peer: Peer) -> list[tuple]:
+    events: list[tuple] = []
+    peer.on_extended_handshake(lambda p, handshake: events.append(("extended_handshake", handshake[b"metadata_size"])))
+    peer.on_bitfield(lambda p, bitfield: events.append(("bitfield", bitfield)))
+    peer.on_have(lambda p, index: events.append(("have", index)))
+    peer.on_pex(lambda p, pex: events.append(("pex", tuple((x["ip"], x["port"]) for x in pex["added"]))))
+    peer.on_metadata_piece(lambda p, piece, data: events.append(("metadata_piece", piece, len(data))))
+    peer.on_metadata_reject(lambda p, piece: events.append(("metadata_reject", piece)))
+    return events
+
+
+def test_handlers_fire_as_messages_arrive():
+    info_hash, metadata = make_metadata(num_pieces=2)
+    torrent = Torrent(info_hash, 0)
+    with FakePeer(info_hash, metadata, pex_peers=PEX_PEERS, burst_haves=3, reject={1}) as fake:
+        peer = Peer(fake.addr, torrent, self_peer_id)
+        events = record(peer)
+        with peer:
+            assert peer.peer_extension_handshake is not None
+            peer.request_all_metadata()
+            assert peer.run_until(lambda: any(e[0] == "metadata_reject" for e in events)
+                                  and any(e[0] == "pex" for e in events), timeout=5)
+    assert events[:5] == [("extended_handshake", len(metadata)), ("bitfield", b"\xff\x80"),
+                          ("have", 0), ("have", 1), ("have", 2)]
+    assert set(events[5:]) == {("pex", tuple(PEX_PEERS)), ("metadata_piece", 0, 16384), ("metadata_reject", 1)}
+    assert torrent.metadata is None
+
+
+def test_run_until_returns_when_pex_arrives():
+    info_hash, metadata = make_metadata(num_pieces=1)
+    torrent = Torrent(info_hash, 0)
+    with FakePeer(info_hash, metadata, pex_peers=PEX_PEERS, pex_delay=0.3) as fake:
+        with Peer(fake.addr, torrent, self_peer_id) as peer:
+            start = time.monotonic()
+            assert peer.run_until(lambda: len(torrent.peers) > 0, timeout=5)
+            assert 0.2 < time.monotonic() - start < 1
+            assert set(torrent.peers) == set(PEX_PEERS)
+
+            peer.request_all_metadata()
+            assert peer.run_until(lambda: torrent.metadata is not None, timeout=5)
+            assert torrent.metadata == metadata
+
+            start = time.monotonic()
+            assert not peer.run_until(lambda: False, timeout=0.2)
+            assert time.monotonic() - start < 0.5
+
+
+def test_async_run_until_returns_when_pex_arrives():
+    info_hash, metadata = make_metadata(num_pieces=1)
+    torrent = Torrent(info_hash, 0)
+
+    async def main():
+        peer = AsyncPeer(fake.addr, torrent, self_peer_id)
+        pieces = []
+        peer.on_metadata_piece(lambda p, piece, data: pieces.append(piece))
+        async with peer:
+            start = time.monotonic()
+            assert await peer.run_until(lambda: len(torrent.peers) > 0, timeout=5)
+            assert 0.2 < time.monotonic() - start < 1
+            peer.request_all_metadata()
+            assert await peer.run_until(lambda: torrent.metadata is not None, timeout=5)
+            assert not await peer.run_until(lambda: False, timeout=0.2)
+        assert pieces == [0]
+
+    with FakePeer(info_hash, metadata, pex_peers=PEX_PEERS, pex_delay=0.3) as fake:
+        asyncio.run(main())
+    assert torrent.metadata == metadata
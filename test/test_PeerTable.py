@@ -0,0 +1,40 @@
+from torrentlib import Torrent, PeerTable
+from torrentlib.Compact import decode_peers_packed, decode_peers6_packed
+from test_Compact import peers, peers6, blob, blob6
+
+
+def test_dict_view():
+    table = PeerTable()
+    table |= {peer: {} for peer in peers}
+    table[("10.0.0.1", 6881)] = {"seed": True}
+    assert len(table) == 3 and list(table) == peers
+    assert table[("10.0.0.1", 6881)]["seed"] and table[("1.2.3.4", 65535)] == {}
+    assert ("1.2.3.4", 65535) in table and ("1.2.3.4", 1) not in table and "junk" not in table
+
+    del table[("10.0.0.1", 6881)]
+    assert set(table) == set(peers[1:])
+    assert dict(table) == {peer: {} for peer in peers[1:]}
+
+
+def test_merge_remove_and_evict():
+    table = PeerTable()
+    assert table.merge_packed(decode_peers_packed(blob), flags=[2, 0, 0]) == 3
+    assert table.merge(peers) == 0                      # refresh keeps flags
+    assert table[peers[0]]["seed"]
+    assert table.remove([peers[0], ("8.8.8.8", 1)]) == 1
+    assert set(table) == set(peers[1:])
+
+    table._last_seen[0] = 0                             # first slot was last seen long ago
+    stale = next(iter(table))
+    assert table.evict_older_than(3600) == 1
+    assert stale not in table and len(table) == 1
+    assert list(table) == [peer for peer in peers[1:] if peer != stale]
+
+
+def test_ipv6_and_torrent():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    assert torrent.peers6.merge_packed(decode_peers6_packed(blob6)) == 2
+    assert list(torrent.peers6) == peers6
+    with torrent._peers_lock:                           # reentrant with the table's own locking
+        torrent.peers[("10.0.0.1", 6881)] = {}
+    assert len(torrent.peers) == 1 and "peers=1" in str(torrent)
@@ -0,0 +1,65 @@
+import threading
+import time
+import pytest
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, RateLimiter, AdaptiveLimiter
+from fake_tracker import FakeUDPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_token_bucket_spaces_requests():
+    limiter = RateLimiter()
+    assert limiter.reserve("udp://a.example:1/announce") == 0  # unlimited by default
+
+    limiter.set_rate("A.example", rate=10, burst=2)
+    waits = [limiter.reserve("udp://a.example:1/announce") for _ in range(5)]
+    assert waits[:2] == [0, 0]
+    assert [round(w, 2) for w in waits[2:]] == [0.1, 0.2, 0.3]  # queued, evenly spaced
+    assert limiter.reserve("http://b.example/announce") == 0    # other hosts unaffected
+
+    limiter.set_default(rate=100, burst=1)
+    assert limiter.reserve("b.example") == 0 and limiter.reserve("b.example") > 0
+
+
+@pytest.mark.parametrize("rate, burst", [(0, 1), (-1, 1), (1, 0)])
+def test_invalid_rates_are_rejected(rate, burst):
+    limiter = RateLimiter()
+    with pytest.raises(ValueError):
+        limiter.set_rate("a.example", rate, burst)
+    with pytest.raises(ValueError):
+        limiter.set_default(rate, burst)
+    with pytest.raises(ValueError):
+        RateLimiter(rate, burst)
+
+
+def test_query_respects_limit_across_threads():
+    limiter = RateLimiter()
+    limiter.set_rate("127.0.0.1", rate=20, burst=1)
+    with FakeUDPTracker() as tracker:
+        def announce(i):
+            torrent = Torrent(f"{i:02x}" * 20, 0)
+            Query.single(torrent, tracker.url, self_peer_id, timeout=2, rate_limiter=limiter)
+
+        start = time.monotonic()
+        threads = [threading.Thread(target=announce, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert time.monotonic() - start >= 0.25  # 6 announces at 20/s with no burst
+        assert tracker.counts["announce"] == 6
+
+
+def test_multi_waits_for_tokens_outside_slots():
+    limiter = RateLimiter()
+    limiter.set_rate("127.0.0.1", rate=20, burst=1)
+    adaptive = AdaptiveLimiter(initial=2)
+    with FakeUDPTracker() as tracker:
+        urls = [f"{tracker.url}?n={i}" for i in range(6)]
+        start = time.monotonic()
+        results = Query.multi(Torrent("ab" * 20, 0), urls, self_peer_id, timeout=2,
+                              limiter=adaptive, rate_limiter=limiter)
+        assert time.monotonic() - start >= 0.25
+        assert all("error" not in r for r in results.values()) and len(results) == 6
+    assert adaptive.stats()["latency"] < 0.04  # the 50 ms token waits are not counted
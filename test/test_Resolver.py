@@ -0,0 +1,86 @@
+import asyncio
+import socket
+import threading
+import time
+from torrentlib import Resolver, Torrent
+from torrentlib.Tracker import Query
+from torrentlib.Tracker.TrackerQueryException import TrackerQueryException
+from fake_tracker import FakeHTTPTracker
+
+
+def counting_getaddrinfo(monkeypatch, delay=0.0):
+    calls = []
+    real = socket.getaddrinfo
+
+    def getaddrinfo(host, *args, **kwargs):
+        calls.append(host)
+        time.sleep(delay)
+        if host.endswith(".invalid"):
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return real("127.0.0.1", *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return calls
+
+
+def test_cache_and_negative_cache(monkeypatch):
+    calls = counting_getaddrinfo(monkeypatch)
+    resolver = Resolver(ttl=60, negative_ttl=60)
+    assert resolver.resolve("tracker.example") == "127.0.0.1"
+    assert resolver.resolve("tracker.example") == "127.0.0.1"
+    assert resolver.resolve("10.1.2.3") == "10.1.2.3"  # literals skip the lookup
+    for _ in range(2):
+        try:
+            resolver.resolve("gone.invalid")
+            assert False, "expected gaierror"
+        except socket.gaierror:
+            pass
+    assert calls == ["tracker.example", "gone.invalid"]
+
+    resolver.clear()
+    assert asyncio.run(resolver.resolve_async("tracker.example")) == "127.0.0.1"
+    assert resolver.resolve_many(["tracker.example", "gone.invalid"]) == {"tracker.example": "127.0.0.1", "gone.invalid": None}
+    assert calls == ["tracker.example", "gone.invalid", "tracker.example", "gone.invalid"]
+
+
+def test_concurrent_lookups_share_one_call(monkeypatch):
+    calls = counting_getaddrinfo(monkeypatch, delay=0.2)
+    resolver = Resolver()
+    threads = [threading.Thread(target=resolver.resolve, args=("slow.example",)) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert calls == ["slow.example"]
+
+
+def test_http_announce_uses_resolver(monkeypatch):
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    monkeypatch.setattr(Resolver, "_shared", Resolver())
+    with FakeHTTPTracker() as tracker:
+        url = tracker.url.replace("127.0.0.1", "tracker.example")
+        calls = counting_getaddrinfo(monkeypatch)
+        for _ in range(3):
+            assert Query.http(torrent, url, "-robots-testing12345", timeout=2)["seeders"] == 5
+        assert [host for host in calls if host != "127.0.0.1"] == ["tracker.example"]  # literals need no DNS
+
+
+def test_invalid_host_fails_instead_of_hanging(monkeypatch):
+    monkeypatch.setattr(Resolver, "_shared", Resolver())
+    host = "a" * 70 + ".com"  # label over 63 characters: getaddrinfo raises UnicodeError
+    for _ in range(2):  # second time from the negative cache
+        try:
+            Resolver.shared().resolve(host, timeout=2)
+            assert False, "expected gaierror"
+        except socket.gaierror:
+            pass
+    assert not Resolver.shared()._pending
+
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    start = time.monotonic()
+    try:
+        Query.single(torrent, f"udp://{host}:80/announce", "-robots-testing12345", timeout=2)
+        assert False, "expected a tracker error"
+    except TrackerQueryException:
+        pass
+    assert time.monotonic() - start < 2
@@ -0,0 +1,70 @@
+import os
+import bencodepy
+import pytest
+from torrentlib import Torrent
+from torrentlib.Compact import packed_to_peers
+from torrentlib.Tracker.Query import _parse_http_tracker_response, _handle_http_response
+from torrentlib.Tracker.TrackerQueryException import InvalidResponseError
+from torrentlib.Tracker.Response import decode_announce
+
+
+def generic(body, compact=False):
+    return _parse_http_tracker_response(dict(bencodepy.decode(body)), compact)
+
+
+@pytest.mark.parametrize("reply", [
+    {b"interval": 1800, b"min interval": 900, b"complete": 12, b"incomplete": -1,
+     b"peers": os.urandom(6 * 300), b"peers6": os.urandom(18 * 7)},
+    {b"failure reason": b"unregistered torrent"},
+    {b"interval": 60, b"external ip": bytes([1, 2, 3, 4]), b"tracker id": b"\xff\xfe", b"peers": b""},
+    {},
+])
+@pytest.mark.parametrize("compact", [False, True])
+def test_matches_generic_path(reply, compact):
+    body = bencodepy.encode(reply)
+    assert decode_announce(body, compact) == generic(body, compact)
+
+
+@pytest.mark.parametrize("body", [
+    bencodepy.encode({b"peers": [{b"ip": b"1.2.3.4", b"port": 1}]}),  # non-compact peer list
+    bencodepy.encode({b"files": {b"x": 1}}),
+    b"d8:intervali1800e",         # truncated
+    b"d8:intervali1800ee5:extra",  # trailing data
+    b"d8:intervali18_00ee",       # not bencode digits
+    b"d5:peers99:abce",
+    b"",
+])
+def test_unusual_replies_fall_back(body):
+    assert decode_announce(body) is None
+
+
+def test_non_compact_peers():
+    body = bencodepy.encode({b"interval": 1800, b"peers": [
+        {b"peer id": b"x" * 20, b"ip": b"1.2.3.4", b"port": 6881},
+        {b"ip": b"2001:db8::1", b"port": 51413},
+        {b"ip": b"peer.example.org", b"port": 6881},  # DNS names are dropped
+        {b"ip": b"5.6.7.8"},                          # no port
+    ]})
+    assert decode_announce(body) is None
+    reply = generic(body)
+    assert reply["peers"] == [("1.2.3.4", 6881)]
+    assert reply["peers6"] == [("2001:db8::1", 51413)]
+    assert packed_to_peers(*generic(body, compact=True)["peers"]) == [("1.2.3.4", 6881)]
+
+    torrent = Torrent("ab" * 20, 0)
+    result = _handle_http_response(torrent, "http://t.example/announce", 200, body)
+    assert result["interval"] == 1800
+    assert set(torrent.peers) == {("1.2.3.4", 6881)}
+    assert set(torrent.peers6) == {("2001:db8::1", 51413)}
+
+
+def test_invalid_peers_value_is_rejected():
+    with pytest.raises(InvalidResponseError):
+        generic(bencodepy.encode({b"peers": 5}))
+
+
+@pytest.mark.parametrize("body", [b"d8:intervali1800e5:peersi3ee", b"d6:peers6i3ee"])
+def test_scalar_peers_are_rejected(body):
+    assert decode_announce(body) is None
+    with pytest.raises(InvalidResponseError):
+        _handle_http_response(Torrent("ab" * 20, 0), "http://t.example/announce", 200, body)
@@ -0,0 +1,81 @@
+import time
+from torrentlib import Torrent, TorrentStatus
+from torrentlib.Tracker import AnnounceScheduler
+from fake_tracker import FakeHTTPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_scheduler_sends_events_and_honors_interval():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 100)
+    results = []
+
+    def on_result(torrent, url, result):
+        results.append(result)
+
+    with FakeHTTPTracker(interval=1) as tracker:
+        scheduler = AnnounceScheduler(self_peer_id, timeout=2, on_result=on_result)
+        scheduler.start()
+        scheduler.add(torrent, [tracker.url])
+
+        assert wait_for(lambda: len(tracker.requests) >= 2, timeout=4)
+        first, second = tracker.requests[:2]
+        assert first["event"] == ["started"]
+        assert "event" not in second  # regular re-announce after 'interval'
+
+        torrent.set_event(TorrentStatus.COMPLETED)
+        scheduler.announce_now(torrent)
+        assert wait_for(lambda: any(r.get("event") == ["completed"] for r in tracker.requests))
+
+        scheduler.remove(torrent)
+        assert wait_for(lambda: tracker.requests[-1].get("event") == ["stopped"])
+        assert wait_for(lambda: len(scheduler) == 0)
+        scheduler.stop()
+
+    assert all(r["seeders"] == 5 for r in results)
+
+
+def test_scheduler_backs_off_on_failure():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    url = "udp://127.0.0.1:1/announce"
+    failures = []
+    with AnnounceScheduler(self_peer_id, timeout=1, retry_interval=60,
+                           on_result=lambda t, u, r: failures.append(r)) as scheduler:
+        scheduler.add(torrent, [url])
+        assert wait_for(lambda: failures)
+        assert 55 < scheduler.next_due(torrent, url) <= 60
+
+
+def test_announce_now_during_announce_runs_after_it():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    url = "udp://127.0.0.1:1/announce"
+    failures = []
+    with AnnounceScheduler(self_peer_id, timeout=1, retry_interval=60,
+                           on_result=lambda t, u, r: failures.append(r)) as scheduler:
+        scheduler.add(torrent, [url])
+        assert wait_for(lambda: any(entry.in_flight for entry in scheduler._entries.values()))
+        scheduler.announce_now(torrent)
+        assert wait_for(lambda: len(failures) >= 2, timeout=4)  # not after the 60 s backoff
+
+
+def test_scheduler_restarts_after_stop():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 100)
+    with FakeHTTPTracker() as tracker:
+        scheduler = AnnounceScheduler(self_peer_id, timeout=2)
+        scheduler.start()
+        scheduler.add(torrent, [tracker.url])
+        assert wait_for(lambda: len(tracker.requests) == 1)
+        scheduler.stop()
+        assert wait_for(lambda: tracker.requests[-1].get("event") == ["stopped"])
+
+        scheduler.add(torrent, [tracker.url])
+        scheduler.start()
+        assert wait_for(lambda: tracker.requests[-1].get("event") == ["started"])
+        scheduler.stop()
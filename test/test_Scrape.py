@@ -0,0 +1,37 @@
+from torrentlib.Tracker import Query
+from torrentlib.Tracker.Query import _announce_to_scrape_url
+from fake_tracker import FakeHTTPTracker
+
+info_hashes = [f"{i:02x}{i:02x}{i:02x}" + "0" * 34 for i in range(120)]
+
+
+def test_announce_to_scrape_url():
+    assert _announce_to_scrape_url("http://t.example.com/announce") == "http://t.example.com/scrape"
+    assert _announce_to_scrape_url("http://t.example.com/x/announce.php?k=1") == "http://t.example.com/x/scrape.php?k=1"
+    assert _announce_to_scrape_url("http://t.example.com/a") is None
+
+
+def test_http_scrape_chunks_by_url_length():
+    with FakeHTTPTracker() as tracker:
+        result = Query.scrape_http(tracker.url, info_hashes, timeout=2)
+        assert len(result) == 120
+        assert result[info_hashes[100]] == {"seeders": 100, "completed": 100, "leechers": 100}
+        assert len(tracker.requests) > 1  # 120 hashes do not fit in one URL
+        assert sum(len(q["info_hash"]) for q in tracker.requests) == 120
+
+
+def test_http_scrape_falls_back_when_tracker_caps_hashes():
+    with FakeHTTPTracker(max_scrape_hashes=10) as tracker:
+        result = Query.scrape(tracker.url, info_hashes[:25], timeout=2)
+        assert len(result) == 25
+        assert [len(q["info_hash"]) for q in tracker.requests] == [25, 12, 5]  # halve, then confirm the cap
+
+
+def test_http_scrape_does_not_shrink_for_unknown_torrents():
+    with FakeHTTPTracker() as tracker:
+        Query.scrape_http(tracker.url, info_hashes, timeout=2)
+        full_requests = len(tracker.requests)
+    with FakeHTTPTracker(known_hashes={bytes.fromhex(info_hashes[0])}) as tracker:
+        result = Query.scrape_http(tracker.url, info_hashes, timeout=2)
+        assert list(result) == [info_hashes[0]]
+        assert len(tracker.requests) <= 2 * full_requests
@@ -0,0 +1,58 @@
+import socket
+from contextlib import ExitStack
+from torrentlib import SwarmCrawler, Torrent
+from fake_peer import FakePeer, make_metadata
+
+self_peer_id = "-robots-testing12345"
+
+
+def closed_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_follows_pex_until_frontier_is_exhausted():
+    info_hash, metadata = make_metadata(num_pieces=1)
+    torrent = Torrent(info_hash, 0)
+    dead = ("127.0.0.1", closed_port())
+    with ExitStack() as stack:
+        a, b, c = (stack.enter_context(FakePeer(info_hash, metadata)) for _ in range(3))
+        a.pex_peers = [b.addr, dead]
+        b.pex_peers = [c.addr, a.addr]
+        c.pex_peers = [a.addr, b.addr]
+        torrent.peers.merge([a.addr])
+
+        result = SwarmCrawler(torrent, self_peer_id, max_connections=2).crawl(duration=10)
+        assert (a.connections, b.connections, c.connections) == (1, 1, 1)
+
+    assert result["reason"] == "exhausted"
+    assert (result["visited"], result["connected"], result["failed"]) == (4, 3, 1)
+    assert result["pex_messages"] == 3 and result["discovered"] == 4 and result["frontier"] == 0
+    assert set(torrent.peers) == {a.addr, b.addr, c.addr, dead}
+
+
+def test_visits_most_reported_peers_first():
+    crawler = SwarmCrawler(Torrent("00" * 20, 0), self_peer_id)
+    crawler.add([("10.0.0.1", 1), ("10.0.0.2", 2)])
+    crawler.add([("10.0.0.2", 2)])
+    crawler.add([("10.0.0.3", 3), ("10.0.0.4", 0)], score=5)
+    assert [crawler._pop() for _ in range(4)] == [("10.0.0.3", 3), ("10.0.0.2", 2), ("10.0.0.1", 1), None]
+
+
+def test_stops_at_max_peers_and_duration():
+    info_hash, metadata = make_metadata(num_pieces=1)
+    torrent = Torrent(info_hash, 0)
+    with FakePeer(info_hash, metadata, pex_peers=[("10.0.%d.%d" % divmod(i, 256), 6881) for i in range(1, 100)]) as fake:
+        crawler = SwarmCrawler(torrent, self_peer_id, connect_timeout=0.5)
+        crawler.add([fake.addr])
+        result = crawler.crawl(max_peers=50, duration=10)
+    assert result["reason"] == "max_peers" and result["discovered"] == 100
+    assert result["elapsed"] < 2
+
+    with FakePeer(info_hash, metadata) as quiet:  # never sends PEX
+        crawler = SwarmCrawler(Torrent(info_hash, 0), self_peer_id, visit_time=30)
+        crawler.add([quiet.addr])
+        result = crawler.crawl(duration=0.5)
+    assert result["reason"] == "duration" and result["connected"] == 1
+    assert 0.5 <= result["elapsed"] < 2
@@ -0,0 +1,74 @@
+from torrentlib import Torrent
+from torrentlib.Tracker import Query, Check, UDPTrackerClient
+from torrentlib.Tracker.TrackerQueryException import TimeoutError, InvalidResponseError
+from fake_tracker import FakeUDPTracker
+
+self_peer_id = "-robots-testing12345"
+
+
+def test_connection_id_is_cached():
+    torrent = Torrent("95eac181669f6e2e26a2513f9b2c9f6d3d4e0ec1", 0)
+    with FakeUDPTracker(num_peers=3) as tracker:
+        for _ in range(3):
+            result = Query.udp(torrent, tracker.url, self_peer_id, timeout=2)
+            assert result["seeders"] == 3
+            assert len(result["peers"]) == 3
+
+        assert tracker.counts["connect"] == 1
+        assert tracker.counts["announce"] == 3
+    assert ("10.0.0.1", 6881) in torrent.peers
+
+
+def test_concurrent_requests_share_socket():
+    client = UDPTrackerClient(num_sockets=2)
+    try:
+        with FakeUDPTracker() as tracker:
+            futures = [client.submit(("127.0.0.1", tracker.port), 0x41727101980, 0)[1]
+                       for _ in range(50)]
+            replies = [f.result(2) for f in futures]
+            assert len(set(replies)) == 50  # each reply carries its own transaction ID
+    finally:
+        client.close()
+
+
+def test_stale_connection_id_is_dropped():
+    client = UDPTrackerClient()
+    try:
+        with FakeUDPTracker() as tracker:
+            client.connection_id("127.0.0.1", tracker.port, timeout=2)
+            tracker.connection_ids.clear()  # tracker forgets us
+            try:
+                client.announce("127.0.0.1", tracker.port, bytes(78), timeout=2)
+                assert False, "expected InvalidResponseError"
+            except InvalidResponseError:
+                pass
+            assert ("127.0.0.1", tracker.port) not in client._connections
+    finally:
+        client.close()
+
+
+def test_timeout_and_check():
+    with FakeUDPTracker() as tracker:
+        assert Check.udp(tracker.url, timeout=2)
+    client = UDPTrackerClient()
+    try:
+        client.transact(("127.0.0.1", tracker.port), 0x41727101980, 0, timeout=0.3)
+        assert False, "expected TimeoutError"
+    except TimeoutError:
+        pass
+    finally:
+        client.close()
+
+
+def test_scrape_packs_many_hashes():
+    info_hashes = [f"{i:02x}{i:02x}{i:02x}" + "0" * 34 for i in range(200)]
+    with FakeUDPTracker() as tracker:
+        result = Query.scrape_udp(tracker.url, info_hashes, timeout=2)
+        assert tracker.counts["scrape"] == 3  # 74 + 74 + 52
+        assert tracker.counts["connect"] == 1
+        assert result[info_hashes[150]] == {"seeders": 150, "completed": 150, "leechers": 150}
+        assert len(result) == 200
+
+        multi = Query.scrape_multi([tracker.url, "udp://127.0.0.1:1/announce"], info_hashes[:5], timeout=1)
+        assert multi[tracker.url][info_hashes[3]]["seeders"] == 3
+        assert "error" in multi["udp://127.0.0.1:1/announce"]
@@ -0,0 +1,190 @@
+"""
+Bencode codec for peer wire messages.
+
+Extension handshakes, PEX and ut_metadata messages are small bencoded
+dictionaries, and a ut_metadata data message has the raw metadata piece
+appended right after its dictionary. decode_from() decodes one value from
+any buffer (bytes, bytearray or memoryview) at an offset and returns the
+offset where it ended, so the bytes that follow can be sliced off exactly.
+Decoder accepts input in chunks, and encode_into() appends to a reusable
+bytearray.
+"""
+from typing import Any, Iterator
+
+
+class BencodeError(ValueError):
+    """Malformed bencoded data."""
+
+
+class IncompleteError(BencodeError):
+    """The data ends in the middle of a value."""
+
+
+def decode(data: bytes|bytearray|memoryview) -> Any:
+    """
+    Decode a buffer holding exactly one bencoded value.
+
+    Raises:
+        BencodeError: The data is malformed, incomplete or has trailing bytes.
+    """
+    value, end = decode_from(data)
+    if end != len(data):
+        raise BencodeError(f"Trailing data at offset {end}")
+    return value
+
+
+def decode_from(data: bytes|bytearray|memoryview, offset: int = 0) -> tuple[Any, int]:
+    """
+    Decode the bencoded value starting at offset.
+
+    Strings decode to bytes, dictionary keys included.
+
+    Returns:
+        (value, end) with end the offset just past the value.
+
+    Raises:
+        IncompleteError: The data ends before the value does.
+        BencodeError: The data is malformed.
+    """
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    try:
+        return _decode(view, offset)
+    except IndexError as e:
+        raise IncompleteError(f"Data ends inside the value at offset {offset}") from e
+    except RecursionError as e:
+        raise BencodeError("Value nested too deeply") from e
+
+
+def _decode(view: memoryview, pos: int) -> tuple[Any, int]:
+    c = view[pos]
+    if c == 0x69:  # i
+        return _decode_int(view, pos + 1, 0x65)
+    if 0x30 <= c <= 0x39:
+        return _decode_string(view, pos)
+    if c == 0x6C:  # l
+        items = []
+        pos += 1
+        while view[pos] != 0x65:
+            item, pos = _decode(view, pos)
+            items.append(item)
+        return items, pos + 1
+    if c == 0x64:  # d
+        result = {}
+        pos += 1
+        while view[pos] != 0x65:
+            if not 0x30 <= view[pos] <= 0x39:
+                raise BencodeError(f"Dictionary key is not a string at offset {pos}")
+            key, pos = _decode_string(view, pos)
+            result[key], pos = _decode(view, pos)
+        return result, pos + 1
+    raise BencodeError(f"Unexpected byte {bytes([c])!r} at offset {pos}")
+
+
+def _decode_int(view: memoryview, pos: int, terminator: int) -> tuple[int, int]:
+    """Parse digits up to terminator. Returns (value, offset past the terminator)."""
+    start = pos
+    negative = view[pos] == 0x2D  # -
+    if negative:
+        pos += 1
+    value = 0
+    digits = pos
+    while (c := view[pos]) != terminator:
+        if not 0x30 <= c <= 0x39:
+            raise BencodeError(f"Invalid digit {bytes([c])!r} at offset {pos}")
+        value = value * 10 + c - 0x30
+        pos += 1
+    if pos == digits or (view[digits] == 0x30 and pos - digits > 1) or (negative and value == 0):
+        raise BencodeError(f"Invalid number at offset {start}")
+    return (-value if negative else value), pos + 1
+
+
+def _decode_string(view: memoryview, pos: int) -> tuple[bytes, int]:
+    length, start = _decode_int(view, pos, 0x3A)  # :
+    if length < 0:
+        raise BencodeError(f"Negative string length at offset {pos}")
+    end = start + length
+    if end > len(view):
+        raise IndexError(end)
+    return bytes(view[start:end]), end
+
+
+class Decoder:
+    """
+    Incremental decoder for a stream of bencoded values.
+
+    feed() chunks as they arrive and iterate to get every value completed
+    so far. A value split across chunks is returned once its last byte
+    has been fed.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._pos = 0
+
+    def feed(self, data: bytes|bytearray|memoryview):
+        """Append received bytes."""
+        if self._pos:
+            del self._buffer[:self._pos]  # drop consumed input before growing
+            self._pos = 0
+        self._buffer += data
+
+    def __iter__(self) -> Iterator[Any]:
+        while self._pos < len(self._buffer):
+            with memoryview(self._buffer) as view:
+                try:
+                    value, self._pos = decode_from(view, self._pos)
+                except IncompleteError:
+                    return
+            yield value
+
+    @property
+    def pending(self) -> int:
+        """Bytes fed but not yet decoded."""
+        return len(self._buffer) - self._pos
+
+
+def encode(value: Any) -> bytes:
+    """Bencode a value (see encode_into())."""
+    buffer = bytearray()
+    encode_into(value, buffer)
+    return bytes(buffer)
+
+
+def encode_into(value: Any, buffer: bytearray) -> int:
+    """
+    Append the bencoding of value to buffer.
+
+    Accepts int, bytes-like, str (as UTF-8), list/tuple and dict with bytes
+    or str keys (written in sorted order).
+
+    Returns:
+        Number of bytes appended.
+    """
+    start = len(buffer)
+    _encode(value, buffer)
+    return len(buffer) - start
+
+
+def _encode(value: Any, buffer: bytearray):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        buffer += b"%d:" % len(value)
+        buffer += value
+    elif isinstance(value, str):
+        _encode(value.encode(), buffer)
+    elif isinstance(value, bool):
+        raise TypeError("Cannot bencode a bool")
+    elif isinstance(value, int):
+        buffer += b"i%de" % value
+    elif isinstance(value, (list, tuple)):
+        buffer += b"l"
+        for item in value:
+            _encode(item, buffer)
+        buffer += b"e"
+    elif isinstance(value, dict):
+        buffer += b"d"
+        items = ((k.encode() if isinstance(k, str) else bytes(k), v) for k, v in value.items())
+        for key, item in sorted(items, key=lambda kv: kv[0]):
+            _encode(key, buffer)
+            _encode(item, buffer)
+        buffer += b"e"
+    else:
+        raise TypeError(f"Cannot bencode {type(value).__name__}")
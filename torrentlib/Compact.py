@@ -0,0 +1,104 @@
+"""
+Bulk decoders for compact peer lists (BEP 23 / BEP 7 / BEP 11).
+
+A compact IPv4 peer is 6 bytes (4-byte address, 2-byte port) and an IPv6 peer
+is 18 bytes, both big-endian. Trackers and PEX messages send thousands of
+them back to back, so these helpers decode a whole blob in one pass instead
+of slicing and unpacking one peer at a time.
+"""
+import socket
+import struct
+import sys
+from array import array
+
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+_NATIVE_IS_LITTLE = sys.byteorder == 'little'
+
+
+def decode_peers(blob: bytes|memoryview) -> list[tuple[str, int]]:
+    """
+    Decode compact IPv4 peers into [(ip, port)]. A trailing partial entry is ignored.
+    """
+    view = memoryview(blob)[:len(blob) // 6 * 6]
+    ntoa = socket.inet_ntoa
+    return [(ntoa(ip), port) for ip, port in struct.iter_unpack("!4sH", view)]
+
+
+def decode_peers6(blob: bytes|memoryview) -> list[tuple[str, int]]:
+    """
+    Decode compact IPv6 peers into [(ip, port)]. A trailing partial entry is ignored.
+    """
+    view = memoryview(blob)[:len(blob) // 18 * 18]
+    ntop = socket.inet_ntop
+    AF_INET6 = socket.AF_INET6
+    return [(ntop(AF_INET6, ip), port) for ip, port in struct.iter_unpack("!16sH", view)]
+
+
+def decode_peers_packed(blob: bytes|memoryview) -> tuple[array, array]:
+    """
+    Decode compact IPv4 peers into parallel arrays without creating per-peer objects.
+
+    Returns:
+        (ips, ports) - ips as unsigned 32-bit ints, ports as unsigned 16-bit ints.
+    """
+    data = bytes(memoryview(blob)[:len(blob) // 6 * 6])
+    count = len(data) // 6
+
+    # Gather the byte columns with strided slices, then reinterpret them as integers
+    ip_bytes = bytearray(4 * count)
+    for i in range(4):
+        ip_bytes[i::4] = data[i::6]
+    port_bytes = bytearray(2 * count)
+    port_bytes[0::2] = data[4::6]
+    port_bytes[1::2] = data[5::6]
+
+    ips = array(_UINT32, ip_bytes)
+    ports = array('H', port_bytes)
+    if _NATIVE_IS_LITTLE:
+        ips.byteswap()
+        ports.byteswap()
+    return ips, ports
+
+
+def decode_peers6_packed(blob: bytes|memoryview) -> tuple[array, array, array]:
+    """
+    Decode compact IPv6 peers into parallel arrays without creating per-peer objects.
+
+    Returns:
+        (ips_high, ips_low, ports) - each address split into two unsigned
+        64-bit halves, ports as unsigned 16-bit ints.
+    """
+    data = bytes(memoryview(blob)[:len(blob) // 18 * 18])
+    count = len(data) // 18
+
+    high_bytes = bytearray(8 * count)
+    low_bytes = bytearray(8 * count)
+    for i in range(8):
+        high_bytes[i::8] = data[i::18]
+        low_bytes[i::8] = data[8 + i::18]
+    port_bytes = bytearray(2 * count)
+    port_bytes[0::2] = data[16::18]
+    port_bytes[1::2] = data[17::18]
+
+    ips_high = array('Q', high_bytes)
+    ips_low = array('Q', low_bytes)
+    ports = array('H', port_bytes)
+    if _NATIVE_IS_LITTLE:
+        ips_high.byteswap()
+        ips_low.byteswap()
+        ports.byteswap()
+    return ips_high, ips_low, ports
+
+
+def packed_to_peers(ips: array, ports: array) -> list[tuple[str, int]]:
+    """Turn decode_peers_packed() output back into [(ip, port)]."""
+    ntoa = socket.inet_ntoa
+    return [(ntoa(ip.to_bytes(4, 'big')), port) for ip, port in zip(ips, ports)]
+
+
+def packed6_to_peers(ips_high: array, ips_low: array, ports: array) -> list[tuple[str, int]]:
+    """Turn decode_peers6_packed() output back into [(ip, port)]."""
+    ntop = socket.inet_ntop
+    AF_INET6 = socket.AF_INET6
+    return [(ntop(AF_INET6, high.to_bytes(8, 'big') + low.to_bytes(8, 'big')), port)
+            for high, low, port in zip(ips_high, ips_low, ports)]
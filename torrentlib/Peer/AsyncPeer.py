@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime
+from typing import Callable, Optional
+from ..Torrent import Torrent
+from ..Resolver import Resolver
+from .Peer import Peer
+from .MessageBuffer import MAX_MESSAGE_LENGTH
+from .PeerCommunicationException import *
+
+
+class AsyncPeer(Peer):
+    """
+    Peer connection on the running asyncio event loop.
+
+    Same handshake, extension handshake, PEX and ut_metadata handling as Peer,
+    but over asyncio streams, so a single event loop can hold thousands of
+    peer connections without a thread each. The send methods inherited from
+    Peer (request_metadata(), send_keep_alive(), ...) queue data on the
+    transport without blocking; await drain() to wait for it to go out.
+    """
+    def __init__(self, peer: tuple[str, int], torrent: Torrent, self_peer_id: str):
+        super().__init__(peer, torrent, self_peer_id)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+        return False
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' for AsyncPeer")
+
+    def _is_connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    # region - connect and disconnect
+    async def connect(self):  # type: ignore[override]
+        """
+        Connect to the peer and perform the handshake, then the extension
+        handshake if the peer supports it.
+        """
+        if self._is_connected():
+            return
+
+        try:
+            address = await asyncio.wait_for(Resolver.shared().resolve_async(self.peer[0]), self.TIMEOUT)
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(address, self.peer[1]), self.TIMEOUT)
+
+            self.sendall(self._handshake_msg())
+            self._check_handshake(await asyncio.wait_for(self._reader.readexactly(68), self.TIMEOUT))
+
+            if self.peer_supports_extensions:
+                self.send_extension_handshake()
+                await self.run_until(lambda: self.peer_extension_handshake is not None, self.TIMEOUT)
+
+        except asyncio.TimeoutError as e:
+            self.close()
+            raise ConnectionError(f"Connection to {self.peer} timed out") from e
+        except asyncio.IncompleteReadError as e:
+            self.close()
+            raise InvalidResponseException(self.peer, "Incomplete handshake response") from e
+        except OSError as e:
+            self.close()
+            raise ConnectionError(f"Socket error connecting to {self.peer}:  {e}") from e
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        """Close the connection without waiting for it to shut down."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def aclose(self):
+        """Close the connection and wait until the transport is closed."""
+        writer = self._writer
+        self.close()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+    # endregion
+
+    # region - send and receive
+    def sendall(self, data: bytes):
+        """Queue data on the transport. It is sent as soon as the socket allows."""
+        if self._writer is None:
+            raise SocketClosedException(self.peer)
+        self.last_keep_alive_sent = datetime.now().timestamp()
+        self._writer.write(bytes(data))  # callers may reuse their buffer
+
+    async def drain(self):
+        """Wait until the transport's write buffer is below its high-water mark."""
+        if self._writer is None:
+            raise SocketClosedException(self.peer)
+        await self._writer.drain()
+
+    async def receive_msg(self, timeout: float|None = None) -> dict:
+        """
+        Receive and handle exactly one message.
+
+        Args:
+            timeout: Seconds to wait for the message to start. Once its
+                length prefix has arrived, the rest must follow within TIMEOUT.
+
+        Returns:
+            A dictionary describing the message, as Peer._receive_msg().
+
+        Raises:
+            asyncio.TimeoutError: No message started within timeout; nothing was consumed.
+            SocketClosedException: The connection closed or stalled mid-message.
+            InvalidResponseException: The length prefix exceeds MAX_MESSAGE_LENGTH.
+        """
+        if self._reader is None:
+            raise SocketClosedException(self.peer)
+        try:
+            header = await asyncio.wait_for(self._reader.readexactly(4), timeout)
+        except asyncio.IncompleteReadError as e:
+            self.close()
+            raise SocketClosedException(self.peer) from e
+
+        length = int.from_bytes(header, 'big')
+        if length == 0:
+            return {'type': 'keep-alive'}
+        if length > MAX_MESSAGE_LENGTH:
+            self.close()  # can't skip a message we won't buffer: the stream is lost
+            raise InvalidResponseException(self.peer, f"Message length {length} exceeds {MAX_MESSAGE_LENGTH}")
+        try:
+            message = await asyncio.wait_for(self._reader.readexactly(length), self.TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            self.close()  # closed or stalled mid-message: the stream can't be resynchronized
+            raise SocketClosedException(self.peer) from e
+        return self._dispatch(message[0], memoryview(message)[1:])
+
+    async def run_until(self, condition: Callable[[], bool], timeout: float) -> bool:  # type: ignore[override]
+        """
+        Handle messages as they arrive until condition() is true, checking it
+        after every message. Registered handlers run as messages are handled.
+        The timeout bounds the wait for each next message to start; a message
+        already arriving gets TIMEOUT to finish, so the stream stays in sync.
+
+        Returns:
+            True if condition() became true, False on timeout.
+
+        Raises:
+            SocketClosedException: The connection closed or stalled mid-message.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while not condition():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await self.receive_msg(remaining)
+            except asyncio.TimeoutError:
+                return condition()
+        return True
+
+    async def read_all(self, idle: float = 0.1):  # type: ignore[override]
+        """
+        Handle messages until none arrives for idle seconds. The first
+        message may take up to TIMEOUT.
+        """
+        timeout = self.TIMEOUT
+        try:
+            while True:
+                await self.receive_msg(timeout)
+                timeout = idle
+        except asyncio.TimeoutError:
+            pass
+    # endregion
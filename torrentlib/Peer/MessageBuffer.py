@@ -0,0 +1,101 @@
+import socket
+from typing import Iterator, Optional
+
+MAX_MESSAGE_LENGTH = 1 << 22  # 4 MiB; a 16 KiB block or a bitfield for ~32M pieces fits easily
+
+
+class MessageBuffer:
+    """
+    Receive buffer and framer for length-prefixed peer wire messages.
+
+    fill() reads straight into a per-connection bytearray with recv_into(),
+    and next_message() / iteration pull every complete message out of what
+    has been received, however many arrived in one recv. Payloads are
+    memoryviews into the buffer: they are only valid until the next fill(),
+    so copy whatever has to be kept.
+    """
+    def __init__(self, size: int = 1 << 16, max_length: int = MAX_MESSAGE_LENGTH):
+        self._buffer = bytearray(size)
+        self._start = 0  # first unconsumed byte
+        self._end = 0    # end of received data
+        self.max_length = max_length
+
+    @property
+    def pending(self) -> int:
+        """Bytes received but not yet returned as a message."""
+        return self._end - self._start
+
+    def fill(self, sock: socket.socket) -> int:
+        """
+        Receive once from sock into the buffer.
+
+        Returns:
+            Number of bytes received, 0 if the peer closed the connection.
+
+        Raises:
+            socket.timeout: As sock.recv_into().
+        """
+        self._make_room()
+        with memoryview(self._buffer) as view, view[self._end:] as free:
+            received = sock.recv_into(free)
+        self._end += received
+        return received
+
+    def feed(self, data: bytes|bytearray|memoryview):
+        """Append data received elsewhere (e.g. from a stream reader)."""
+        self._make_room(len(data))
+        self._buffer[self._end:self._end + len(data)] = data
+        self._end += len(data)
+
+    def next_message(self) -> Optional[tuple[Optional[int], memoryview]]:
+        """
+        Take the next complete message off the buffer.
+
+        Returns:
+            (msg_id, payload) with the length prefix and ID removed, msg_id
+            None for a keep-alive, or None if no complete message is buffered.
+
+        Raises:
+            ValueError: The length prefix exceeds max_length.
+        """
+        start = self._start
+        if self._end - start < 4:
+            return None
+        length = int.from_bytes(self._buffer[start:start + 4], 'big')
+        if length > self.max_length:
+            raise ValueError(f"Message length {length} exceeds {self.max_length}")
+        if self._end - start - 4 < length:
+            return None
+        self._start = start + 4 + length
+        if length == 0:
+            return None, memoryview(b'')
+        return self._buffer[start + 4], memoryview(self._buffer)[start + 5:self._start]
+
+    def __iter__(self) -> Iterator[tuple[Optional[int], memoryview]]:
+        while (message := self.next_message()) is not None:
+            yield message
+
+    def _make_room(self, needed: int = 1):
+        """
+        Make sure at least needed bytes (and the rest of a partially received
+        message) fit after the buffered data.
+        """
+        pending = self._end - self._start
+        if pending == 0:
+            self._start = self._end = 0
+        elif pending >= 4:
+            length = int.from_bytes(self._buffer[self._start:self._start + 4], 'big')
+            if length <= self.max_length:
+                needed = max(needed, 4 + length - pending)
+        if self._end + needed <= len(self._buffer):
+            return
+        if pending + needed <= len(self._buffer):
+            # Compact in place. Same-size slice assignment is allowed while
+            # payload views are still exported; they are invalid from here on.
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+        else:
+            # Grow into a new buffer: a bytearray can't be resized while views exist
+            grown = bytearray(max(2 * len(self._buffer), pending + needed))
+            grown[:pending] = self._buffer[self._start:self._end]
+            self._buffer = grown
+        self._start, self._end = 0, pending
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Iterable, Optional
+
+from ..Torrent import Torrent
+from .AsyncPeer import AsyncPeer
+from .Peer import METADATA_PIECE_SIZE
+
+MAX_METADATA_SIZE = 1 << 26  # 64 MiB; larger announced sizes are not believed
+
+
+class MetadataFetcher:
+    """
+    BEP 9 metadata download from several peers at once.
+
+    Up to max_connections peers are connected concurrently and metadata
+    piece requests are striped across them, least-requested piece first,
+    with up to pipeline requests outstanding per peer. A rejected or timed
+    out request goes to another peer; once every piece is requested, idle
+    peers duplicate outstanding ones. The assembled metadata is verified
+    against the info hash by Torrent.update_from_metadata() and the fetch
+    returns as soon as it matches.
+
+    Pieces are pooled for the metadata size most peers announce. Peers
+    announcing another size fetch every piece themselves, and Peer
+    verifies what each one sends. If the pooled metadata does not match,
+    the pool is discarded and every peer fetches on its own from then on,
+    so a peer serving bad data or a wrong size only fails its own attempt.
+    """
+    def __init__(self, torrent: Torrent, self_peer_id: str,
+                 max_connections: int = 8,
+                 pipeline: int = 2,
+                 request_timeout: float = 5,
+                 connect_timeout: float = 5):
+        """
+        Args:
+            torrent: Torrent to fetch metadata for (only the info hash is needed).
+            self_peer_id: Our 20-character peer ID.
+            max_connections: Most peers connected at once.
+            pipeline: Most piece requests outstanding per peer.
+            request_timeout: Seconds before a piece request is given to another peer.
+            connect_timeout: Seconds allowed for connecting and both handshakes.
+        """
+        assert max_connections >= 1 and pipeline >= 1, "max_connections and pipeline must be at least 1"
+        self.torrent = torrent
+        self.self_peer_id = self_peer_id
+        self.max_connections = max_connections
+        self.pipeline = pipeline
+        self.request_timeout = request_timeout
+        self.connect_timeout = connect_timeout
+
+        self._size: Optional[int] = None  # size the pooled pieces are for
+        self._num_pieces = 0
+        self._votes: dict[int, int] = {}  # {announced size: peers announcing it}
+        self._pieces: dict[int, bytes] = {}
+        self._requested: dict[int, int] = {}  # {piece: requests outstanding}
+        self._striping = True
+
+    def fetch(self, peers: Iterable[tuple[str, int]]|None = None, timeout: float = 60) -> Optional[bytes]:
+        """Blocking wrapper around fetch_async()."""
+        return asyncio.run(self.fetch_async(peers, timeout))
+
+    async def fetch_async(self, peers: Iterable[tuple[str, int]]|None = None, timeout: float = 60) -> Optional[bytes]:
+        """
+        Fetch the metadata.
+
+        Args:
+            peers: Peers to try, in order. Defaults to torrent.peers and torrent.peers6.
+            timeout: Seconds until giving up.
+
+        Returns:
+            The verified metadata (also stored in torrent.metadata), or None
+            if no peer supplied it in time.
+        """
+        if self.torrent.metadata is not None:
+            return self.torrent.metadata
+        candidates = deque(peers if peers is not None else list(self.torrent.peers) + list(self.torrent.peers6))
+
+        done = asyncio.Event()
+        workers = [asyncio.create_task(self._worker(candidates, done))
+                   for _ in range(min(self.max_connections, len(candidates)))]
+        waiter = asyncio.create_task(done.wait())
+        finished = asyncio.gather(*workers)
+        try:
+            if workers:
+                await asyncio.wait([waiter, finished], timeout=timeout,
+                                   return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+            finished.cancel()  # cancels the workers too
+            await asyncio.gather(waiter, finished, return_exceptions=True)
+        return self.torrent.metadata
+
+    async def _worker(self, candidates: deque, done: asyncio.Event):
+        while candidates and not done.is_set():
+            addr = candidates.popleft()
+            try:
+                await self._fetch_from(addr, done)
+            except Exception as e:  # any misbehaving peer only ends its own attempt
+                logging.debug(f"❌ {addr[0]}:{addr[1]}: {e}")
+
+    async def _fetch_from(self, addr: tuple[str, int], done: asyncio.Event):
+        """Request pieces from one peer until the metadata is done or the peer can't help."""
+        peer = AsyncPeer(addr, self.torrent, self.self_peer_id)
+        peer.TIMEOUT = self.connect_timeout
+        outstanding: dict[int, float] = {}  # {piece: deadline}
+        excluded: set[int] = set()          # rejected or timed out by this peer
+        answers: list[int] = []
+
+        def on_piece(p: AsyncPeer, piece: int, data: bytes):
+            answers.append(piece)
+            if outstanding.pop(piece, None) is not None:
+                self._release(piece)
+            if self._pooled(p):
+                self._store(piece, data)
+            if self.torrent.metadata is not None:
+                done.set()
+
+        def on_reject(p: AsyncPeer, piece: int):
+            answers.append(piece)
+            if outstanding.pop(piece, None) is not None:
+                self._release(piece)
+            excluded.add(piece)
+
+        peer.on_metadata_piece(on_piece)
+        peer.on_metadata_reject(on_reject)
+        loop = asyncio.get_running_loop()
+        try:
+            await peer.connect()
+            if 'ut_metadata' not in peer.peer_extension_ids or not self._vote(peer.metadata_size):
+                return
+            while not done.is_set():
+                now = loop.time()
+                for piece, deadline in list(outstanding.items()):
+                    if deadline <= now:
+                        del outstanding[piece]
+                        self._release(piece)
+                        excluded.add(piece)
+                while len(outstanding) < self.pipeline:
+                    piece = self._next_piece(peer, excluded | outstanding.keys())
+                    if piece is None:
+                        break
+                    outstanding[piece] = now + self.request_timeout
+                    self._requested[piece] = self._requested.get(piece, 0) + 1
+                    peer.request_metadata(piece)
+                if not outstanding:
+                    return  # everything still missing was rejected or timed out here
+                await peer.drain()
+                seen = len(answers)
+                await peer.run_until(lambda: len(answers) > seen or done.is_set(),
+                                     max(min(outstanding.values()) - loop.time(), 0))
+        finally:
+            for piece in outstanding:
+                self._release(piece)
+            peer.close()
+
+    def _vote(self, size: Optional[int]) -> bool:
+        """
+        Count a peer's announced metadata size. Pieces are pooled for the
+        size most peers announce; when another size takes the lead, the pool
+        restarts for it. Returns False for sizes not worth fetching.
+        """
+        if not size or not 0 < size <= MAX_METADATA_SIZE:
+            return False
+        self._votes[size] = self._votes.get(size, 0) + 1
+        if self._size is None or self._votes[size] > self._votes.get(self._size, 0):
+            self._reset_pool(size)
+        return True
+
+    def _reset_pool(self, size: Optional[int]):
+        self._size = size
+        self._num_pieces = (size + METADATA_PIECE_SIZE - 1) // METADATA_PIECE_SIZE if size else 0
+        self._pieces.clear()
+
+    def _pooled(self, peer: AsyncPeer) -> bool:
+        """Whether peer's pieces go to the shared pool rather than only to the peer itself."""
+        return self._striping and peer.metadata_size == self._size
+
+    def _next_piece(self, peer: AsyncPeer, exclude: set[int]) -> Optional[int]:
+        """The least requested piece still missing that this peer may be asked for."""
+        if self._pooled(peer):
+            have, num_pieces = self._pieces, self._num_pieces
+        else:
+            have = peer.metadata_pieces
+            num_pieces = (peer.metadata_size + METADATA_PIECE_SIZE - 1) // METADATA_PIECE_SIZE  # type: ignore[operator]
+        missing = [i for i in range(num_pieces) if i not in have and i not in exclude]
+        if not missing:
+            return None
+        return min(missing, key=lambda i: self._requested.get(i, 0))
+
+    def _release(self, piece: int):
+        self._requested[piece] -= 1
+
+    def _store(self, piece: int, data: bytes):
+        """Keep a piece of the right length, and verify once all pieces are in."""
+        assert self._size is not None
+        if piece in self._pieces or not 0 <= piece < self._num_pieces:
+            return
+        if len(data) != min(METADATA_PIECE_SIZE, self._size - piece * METADATA_PIECE_SIZE):
+            return
+        self._pieces[piece] = data
+        if len(self._pieces) < self._num_pieces or self.torrent.metadata is not None:
+            return
+        try:
+            self.torrent.update_from_metadata(b''.join(self._pieces[i] for i in range(self._num_pieces)))
+        except ValueError as e:
+            logging.debug(f"❌ Striped metadata rejected, fetching per peer: {e}")
+            self._reset_pool(None)
+            self._striping = False
@@ -1,9 +1,14 @@
+import selectors
 import socket
-import bencodepy
-import struct
+import time
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, Callable
+from .. import Bencode
 from ..Torrent import Torrent
+from ..Resolver import Resolver
+from ..Compact import decode_peers, decode_peers6
+from ..PeerTable import flags_to_dict, dict_to_flags
+from .MessageBuffer import MessageBuffer
 from .PeerCommunicationException import *
 
 METADATA_PIECE_SIZE = 16384  # 16KB per piece (BEP 9 standard)
@@ -21,83 +26,24 @@ def parse_pex_message(payload: bytes, peer_addr: Optional[tuple[str, int]] = Non
         Each peer is a dict with 'ip', 'port', and optionally flags.
     """
     try:
-        pex_data: dict[bytes, Any] = bencodepy.decode(payload) #type: ignore
+        pex_data: dict[bytes, Any] = Bencode.decode(payload)
         result = {'added': [], 'added6': [], 'dropped': [], 'dropped6': []}
         
-        # Parse added peers (IPv4)
-        if b'added' in pex_data:
-            added_bytes = pex_data[b'added']
-            flags_bytes = pex_data.get(b'added.f', b'')
-            
-            # Each peer is 6 bytes
-            for offset in range(0, len(added_bytes), 6):
-                if not(offset + 6 <= len(added_bytes)):
-                    break
-                peer_bytes = added_bytes[offset:offset + 6]
-                flags = flags_bytes[offset//6] if offset//6 < len(flags_bytes) else 0 # Extract flags if available
-                
-                ip_packed, port = struct.unpack("!4sH", peer_bytes)
-                # Extract IP (4 bytes)
-                ip = socket.inet_ntoa(ip_packed)
-                
-                # build up peer info
-                peer_info = {
-                    'ip':  ip,
-                    'port':  port,
-                }
-                
+        # Peers are decoded in bulk (6 bytes per IPv4 peer, 18 per IPv6 peer)
+        for key, decode in (('added', decode_peers), ('added6', decode_peers6)):
+            if key.encode() not in pex_data:
+                continue
+            flags_bytes = pex_data.get(key.encode() + b'.f', b'')
+            for i, (ip, port) in enumerate(decode(pex_data[key.encode()])):
+                peer_info = {'ip': ip, 'port': port}
+                flags = flags_bytes[i] if i < len(flags_bytes) else 0 # Extract flags if available
                 if flags:
-                    peer_info |= {
-                        'encrypted': bool(flags & 0x01),
-                        'seed': bool(flags & 0x02),
-                        'utp': bool(flags & 0x04),
-                        'holepunch': bool(flags & 0x08),
-                        'outgoing': bool(flags & 0x10),
-                    }
-                
-                result['added'].append(peer_info)
-        
-        # Parse IPv6 peers (18 bytes each) if present
-        if b'added6' in pex_data:
-            added6_bytes = pex_data[b'added6']
-            flags6_bytes = pex_data.get(b'added6.f', b'')
-            for offset in range(0, len(added6_bytes), 18):
-                if (offset + 18 <= len(added6_bytes)):
-                    break
-                peer_bytes = added6_bytes[offset:offset + 18]
-                flags = flags6_bytes[offset//18] if offset//18 < len(flags6_bytes) else 0 # Extract flags if available
-                
-                ip_packed, port = struct.unpack("!16sH", peer_bytes)
-                # Extract IPv6 address (16 bytes)
-                ip = socket.inet_ntop(socket.AF_INET6, ip_packed)
-                
-                
-                result['added6']. append({'ip': ip, 'port': port})
+                    peer_info |= flags_to_dict(flags)
+                result[key].append(peer_info)
         
-        # Parse dropped peers (IPv4)
-        if b'dropped' in pex_data: 
-            dropped_bytes = pex_data[b'dropped']
-            
-            for i in range(0, len(dropped_bytes), 6):
-                if i + 6 <= len(dropped_bytes):
-                    peer_data = dropped_bytes[i:i+6]
-                    ip = '.'.join(str(b) for b in peer_data[0:4])
-                    port = int.from_bytes(peer_data[4:6], 'big')
-                    
-                    result['dropped'].append({'ip': ip, 'port':  port})
-        
-        # Parse dropped IPv6 peers (18 bytes each)
-        if b'dropped6' in pex_data:
-            dropped6_bytes = pex_data[b'dropped6']
-            for i in range(0, len(dropped6_bytes), 18):
-                if i + 18 <= len(dropped6_bytes):
-                    peer_data = dropped6_bytes[i:i+18]
-                    # IPv6 address (16 bytes)
-                    ipv6_bytes = peer_data[0:16]
-                    ipv6 = ':'.join(f'{b:02x}' for b in ipv6_bytes)
-                    port = int.from_bytes(peer_data[16:18], 'big')
-                    
-                    result['dropped6'].append({'ip': ipv6, 'port': port})
+        for key, decode in (('dropped', decode_peers), ('dropped6', decode_peers6)):
+            if key.encode() in pex_data:
+                result[key] = [{'ip': ip, 'port': port} for ip, port in decode(pex_data[key.encode()])]
         
         return result
         
@@ -114,9 +60,10 @@ class Peer():
         
         # peer status
         self.peer_id: Optional[bytes] = None
-        self.bitfield: Optional[bytes] = None
+        self.bitfield: Optional[bytearray] = None
         self.peer_supports_extensions: Optional[bool] = None
         self.peer_extension_ids: dict[str, int] = {}
+        self.peer_extension_handshake: Optional[dict[bytes, Any]] = None
         
         # metadata tracking for multi-piece downloads
         self.metadata_size: Optional[int] = None  # Total metadata size in bytes
@@ -130,6 +77,9 @@ class Peer():
         }
         
         self.s: Optional[socket.socket] = None
+        self._send_buffer = bytearray()  # reused for every extended message we send
+        self._recv_buffer = MessageBuffer()
+        self._handlers: dict[str, list[Callable[..., Any]]] = {}
         
     def __enter__(self):
         self.connect()
@@ -157,39 +107,19 @@ class Peer():
         try:
             # Create and connect socket
             self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._recv_buffer = MessageBuffer()
             self.s.settimeout(5)
-            self.s.connect(self.peer)
+            self.s.connect((Resolver.shared().resolve(self.peer[0], timeout=5), self.peer[1]))
             
             # Send handshake
-            msg = b'\x13BitTorrent protocol'
-            reserved = bytearray(8)
-            reserved[5] |= 0x10
-            msg += bytes(reserved)
-            msg += bytes.fromhex(self.torrent.info_hash)
-            msg += self.self_peer_id.encode('utf-8')
-            self.sendall(msg)
-            
-            # Receive handshake response
-            response = self.s.recv(68)
-            
-            # Validate response
-            if len(response) < 68:
-                raise InvalidResponseException(self.peer, "Incomplete handshake response")
-            
-            if response[0:20] != b'\x13BitTorrent protocol':
-                raise InvalidResponseException(self.peer, "Invalid protocol")
+            self.sendall(self._handshake_msg())
             
-            if response[28:48] != bytes. fromhex(self.torrent.info_hash):
-                raise InvalidResponseException(self.peer, "Info hash mismatch")
-            
-            self.peer_id = response[48:68]
-            reserved_bytes = response[20:28]
-            self.peer_supports_extensions = bool(reserved_bytes[5] & 0x10)
-            self.last_keep_alive = datetime.now().timestamp()
+            # Receive and validate handshake response
+            self._check_handshake(self.s.recv(68))
             
             if self.peer_supports_extensions:
                 self.send_extension_handshake()
-                self.read_all()
+                self.run_until(lambda: self.peer_extension_handshake is not None, self.TIMEOUT)
 
         except socket.timeout as e:
             self.close()
@@ -201,6 +131,32 @@ class Peer():
             self.close()
             raise
        
+    def _handshake_msg(self) -> bytes:
+        """Our handshake, announcing extension protocol support (BEP 10)."""
+        msg = b'\x13BitTorrent protocol'
+        reserved = bytearray(8)
+        reserved[5] |= 0x10
+        msg += bytes(reserved)
+        msg += bytes.fromhex(self.torrent.info_hash)
+        msg += self.self_peer_id.encode('utf-8')
+        return msg
+    
+    def _check_handshake(self, response: bytes):
+        """Validate the peer's handshake and record its peer ID and extension support."""
+        if len(response) < 68:
+            raise InvalidResponseException(self.peer, "Incomplete handshake response")
+        
+        if response[0:20] != b'\x13BitTorrent protocol':
+            raise InvalidResponseException(self.peer, "Invalid protocol")
+        
+        if response[28:48] != bytes.fromhex(self.torrent.info_hash):
+            raise InvalidResponseException(self.peer, "Info hash mismatch")
+        
+        self.peer_id = response[48:68]
+        reserved_bytes = response[20:28]
+        self.peer_supports_extensions = bool(reserved_bytes[5] & 0x10)
+        self.last_keep_alive = datetime.now().timestamp()
+       
     def close(self):
         """Close connection to peer."""
         if self.s:
@@ -222,7 +178,6 @@ class Peer():
         """Send extension handshake with PEX support."""
         if not self._is_connected():
             raise SocketClosedException(self.peer)
-        assert self.s is not None, "Socket is not connected" # just for type checker
         
         if not self.peer_supports_extensions:
             raise Exception("Peer doesn't support extensions")
@@ -233,10 +188,7 @@ class Peer():
             b'v': b'MyTorrentLib 1.0',
         }
         
-        # Bencode it
-        payload = bencodepy.encode(handshake_dict)
-        
-        self.send_extended_msg(payload, 0)  # Extended ID 0 for handshake
+        self._send_extended(handshake_dict, 0)  # Extended ID 0 for handshake
         
     def request_metadata(self, piece: int = 0):
         """
@@ -247,7 +199,6 @@ class Peer():
         """
         if not self._is_connected():
             raise SocketClosedException(self.peer)
-        assert self.s is not None, "Socket is not connected" # just for type checker
         
         if 'ut_metadata' not in self.peer_extension_ids:
             print(self.peer_extension_ids)
@@ -259,11 +210,9 @@ class Peer():
             b'piece': piece,
         }
         
-        payload = bencodepy.encode(request_dict)
-        
         # Send as Extended message (ID 20, extended ID for ut_metadata)
         extended_id = self.peer_extension_ids['ut_metadata']
-        self.send_extended_msg(payload, extended_id)
+        self._send_extended(request_dict, extended_id)
     
     def request_all_metadata(self):
         """
@@ -282,8 +231,6 @@ class Peer():
         
     
     def send_extended_msg(self, payload: bytes, extended_id):
-        assert self.s is not None, "Socket is not connected"
-        
         # Send as Extended message (ID 20, with specified extended ID)
         length = 1 + 1 + len(payload)
         message = length.to_bytes(4, 'big')
@@ -292,6 +239,21 @@ class Peer():
         message += payload
         
         self.sendall(message)
+
+    def _send_extended(self, value: dict, extended_id: int, trailer: bytes = b''):
+        """
+        Send value, bencoded, as an Extended message with trailer (e.g. a
+        metadata piece) appended. The message is built in place in a buffer
+        reused across sends.
+        """
+        buffer = self._send_buffer
+        buffer.clear()
+        buffer += b'\x00\x00\x00\x00\x14'  # length, patched below, and message ID 20
+        buffer.append(extended_id)
+        Bencode.encode_into(value, buffer)
+        buffer += trailer
+        buffer[0:4] = (len(buffer) - 4).to_bytes(4, 'big')
+        self.sendall(buffer)
         
     def send_keep_alive(self):
         """
@@ -299,7 +261,6 @@ class Peer():
         """
         if not self._is_connected():
             raise SocketClosedException(self.peer)
-        assert self.s is not None, "Socket is not connected"
         
         # Keep-alive message: <len=0000>
         message = (0).to_bytes(4, 'big')
@@ -314,8 +275,6 @@ class Peer():
             begin: Byte offset within the piece (where this block starts)
             block: The actual data block to send
         """
-        assert self.s is not None, "Socket is not connected"
-        
         # Message format: <len=0009+X><id=7><index><begin><block>
         length = 1 + 4 + 4 + len(block)  # id + index + begin + block
         message = length.to_bytes(4, 'big')
@@ -328,80 +287,162 @@ class Peer():
     # endregion
     
 
+    # region - message handlers
+    def on_bitfield(self, handler: Callable[['Peer', bytes], Any]):
+        """Call handler(peer, bitfield) for every BITFIELD message. Returns handler, so it works as a decorator."""
+        return self._add_handler('bitfield', handler)
+    
+    def on_have(self, handler: Callable[['Peer', int], Any]):
+        """Call handler(peer, piece_index) for every HAVE message."""
+        return self._add_handler('have', handler)
+    
+    def on_extended_handshake(self, handler: Callable[['Peer', dict[bytes, Any]], Any]):
+        """Call handler(peer, handshake) with the decoded extension handshake."""
+        return self._add_handler('extended_handshake', handler)
+    
+    def on_pex(self, handler: Callable[['Peer', dict], Any]):
+        """Call handler(peer, pex) for every PEX message, pex as parse_pex_message() returns it."""
+        return self._add_handler('pex', handler)
+    
+    def on_metadata_piece(self, handler: Callable[['Peer', int, bytes], Any]):
+        """Call handler(peer, piece, data) for every ut_metadata data message."""
+        return self._add_handler('metadata_piece', handler)
+    
+    def on_metadata_reject(self, handler: Callable[['Peer', int], Any]):
+        """Call handler(peer, piece) when the peer rejects a metadata request."""
+        return self._add_handler('metadata_reject', handler)
+    
+    def _add_handler(self, event: str, handler: Callable[..., Any]):
+        self._handlers.setdefault(event, []).append(handler)
+        return handler
+    
+    def _emit(self, event: str, *args):
+        for handler in self._handlers.get(event, ()):
+            handler(self, *args)
+    # endregion
+    
     # region - receive and parse messages
+    def run_until(self, condition: Callable[[], bool], timeout: float) -> bool:
+        """
+        Handle messages as they arrive until condition() is true.
+        
+        Waits for the socket to become readable rather than polling, and
+        checks condition() after each batch of messages, so it returns as
+        soon as the data it waits for has been handled. Registered handlers
+        (on_pex(), on_metadata_piece(), ...) run as messages are handled.
+        
+        Args:
+            condition: Checked before the first read and after every batch.
+            timeout: Seconds until giving up.
+        
+        Returns:
+            True if condition() became true, False on timeout.
+        
+        Raises:
+            SocketClosedException: The peer closed the connection.
+            InvalidResponseException: The peer sent a malformed message.
+        """
+        if not self._is_connected():
+            raise SocketClosedException(self.peer)
+        assert self.s is not None, "Socket is not connected"
+        
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.s, selectors.EVENT_READ)
+            while True:
+                while (message := self._next_buffered_msg()) is not None:
+                    self._handle_msg(message)
+                if condition():
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    return False
+                if not self._recv_buffer.fill(self.s):
+                    raise SocketClosedException(self.peer) # connection closed by peer
+    
     def _receive_msg(self):
         """
         Receive exactly one message from the peer.
         
+        Messages that arrived together with an earlier one are already
+        buffered and are returned without touching the socket.
+        
         Returns:
             A dictionary representing the message received.
             the change to status will be reflected on the Peer object.
+        
+        Raises:
+            socket.timeout: No complete message arrived in time. A partial
+                message stays buffered, so the stream stays in sync.
         """
-        def _recv_exact(num_bytes:  int) -> bytes:
-            nonlocal self
-            """
-            Receive exactly num_bytes from the socket.
-            
-            Returns:
-                Bytes received, or None if connection closed
-                
-            Raises:
-                socket.timeout: If timeout expires
-            """
-            data = b''
-            while len(data) < num_bytes:
-                chunk = self.s.recv(num_bytes - len(data)) # type: ignore
-                if not chunk:
-                    # Connection closed by peer
-                    raise SocketClosedException(self.peer)
-                data += chunk
-            return data
         if not self._is_connected():
             raise SocketClosedException(self.peer)
         assert self.s is not None, "Socket is not connected" # just for type checker
         
-        length_data = _recv_exact(4)
-        self.s.settimeout(self.TIMEOUT) # reset timeout due to <def _read_all()>
-        length = int.from_bytes(length_data, byteorder='big')
-        
-        if length == 0:
+        while (message := self._next_buffered_msg()) is None:
+            if self._recv_buffer.pending:
+                self.s.settimeout(self.TIMEOUT) # mid-message: reset timeout due to <def _read_all()>
+            if not self._recv_buffer.fill(self.s):
+                raise SocketClosedException(self.peer) # connection closed by peer
+        return self._handle_msg(message)
+    
+    def _next_buffered_msg(self) -> Optional[tuple[Optional[int], memoryview]]:
+        """The next complete message in the receive buffer, or None."""
+        try:
+            return self._recv_buffer.next_message()
+        except ValueError as e:
+            self.close()  # can't skip a message we won't buffer: the stream is lost
+            raise InvalidResponseException(self.peer, str(e)) from e
+    
+    def _handle_msg(self, message: tuple[Optional[int], bytes|memoryview]) -> dict:
+        msg_id, payload = message
+        if msg_id is None:
             return {'type': 'keep-alive'}
+        return self._dispatch(msg_id, payload)
+    
+    def _dispatch(self, msg_id: int, payload: bytes|memoryview) -> dict:
+        """
+        Apply one framed message (ID and payload, length prefix removed) to the peer state.
         
-        msg_id = _recv_exact(1)
-        payload = _recv_exact(length - 1)
+        The payload may be a view into the receive buffer; anything kept is copied.
         
-        if msg_id == b'\x00':
+        Returns:
+            A dictionary describing the message.
+        """
+        if msg_id == 0:
             return {'type': 'choke'}
-        elif msg_id == b'\x01':
+        elif msg_id == 1:
             return {'type': 'unchoke'}
-        elif msg_id == b'\x02':
+        elif msg_id == 2:
             return {'type': 'interested'}
-        elif msg_id == b'\x03':
+        elif msg_id == 3:
             return {'type': 'not_interested'}
-        elif msg_id == b'\x04' and length == 5:
+        elif msg_id == 4 and len(payload) == 4:
             index = int.from_bytes(payload[0:4], byteorder='big')
             self._update_bitfield(have_index=index)
+            self._emit('have', index)
             return {'type': 'have', 'index': index}
-        elif msg_id == b'\x05':
-            bitfield = payload
+        elif msg_id == 5:
+            bitfield = bytes(payload)
             self._update_bitfield(bitfield=bitfield)
+            self._emit('bitfield', bitfield)
             return {'type': 'bitfield', 'bitfield': bitfield}
         # this library is not serving as a full client, msg_id 6-8 will not be implemented
-        elif msg_id == b'\x06':
+        elif msg_id == 6:
             return { 'type': 'request'} 
-        elif msg_id == b'\x07':
+        elif msg_id == 7:
             return { 'type': 'piece'}
-        elif msg_id == b'\x08':
+        elif msg_id == 8:
             return { 'type': 'cancel'}
-        elif msg_id == b'\x09':
+        elif msg_id == 9:
             return { 'type': 'port'}   # TODO: Implement DHT port messages
-        elif msg_id == b'\x14':  # 20 decimal = 0x14 hex (Extended message)
+        elif msg_id == 20:  # Extended message
             self._handle_extended_message(payload=payload)
             return { 'type': 'extend'}
         
-        raise InvalidResponseException(self.peer, f"Unknown message ID: {msg_id.hex()}")
+        raise InvalidResponseException(self.peer, f"Unknown message ID: {msg_id:02x}")
     
-    def _handle_extended_message(self, payload: bytes):
+    def _handle_extended_message(self, payload: bytes|memoryview):
         """Handle extended messages (PEX, metadata, etc.)."""
         print("_handle_extended_message called")
         extended_id = payload[0]
@@ -410,7 +451,7 @@ class Peer():
         # Check if this is extension handshake
         if extended_id == 0:
             # Parse extension handshake
-            ext_handshake: dict[bytes, Any] = bencodepy.decode(payload) #type: ignore
+            ext_handshake: dict[bytes, Any] = Bencode.decode(payload)
             
             # Check for supported extensions
             if b'm' in ext_handshake:
@@ -424,32 +465,23 @@ class Peer():
             if b'metadata_size' in ext_handshake:
                 self.metadata_size = ext_handshake[b'metadata_size']
                 print(f"Peer has metadata: {self.metadata_size} bytes")
+            
+            self.peer_extension_handshake = ext_handshake
+            self._emit('extended_handshake', ext_handshake)
         
         # Check if this is PEX
         elif extended_id == self.LOCAL_EXTENSIONS_IDS.get('ut_pex'):
             pex_result = parse_pex_message(payload, self.peer)
             
-            # Thread-safe peer dict modifications
-            with self.torrent._peers_lock:
-                for peer_info in pex_result['added']:
-                    meta_data = {k: v for k, v in peer_info.items() if k not in ('ip', 'port')}
-                    self.torrent.peers[(peer_info['ip'], peer_info['port'])] = meta_data
-                    
-                for peer_info in pex_result['added6']:
-                    meta_data = {k: v for k, v in peer_info.items() if k not in ('ip', 'port')}
-                    self.torrent.peers6[(peer_info['ip'], peer_info['port'])] = meta_data
-                
-                for peer_info in pex_result['dropped']:
-                    ip = peer_info['ip']
-                    port = peer_info['port']
-                    if (ip, port) in self.torrent.peers:
-                        del self.torrent.peers[(ip, port)]
-                
-                for peer_info in pex_result['dropped6']:
-                    ip = peer_info['ip']
-                    port = peer_info['port']
-                    if (ip, port) in self.torrent.peers6:
-                        del self.torrent.peers6[(ip, port)]
+            # Peer tables lock internally, one pass per list
+            for key, table in (('added', self.torrent.peers), ('added6', self.torrent.peers6)):
+                if pex_result[key]:
+                    table.merge([(p['ip'], p['port']) for p in pex_result[key]],
+                                flags=[dict_to_flags(p) for p in pex_result[key]])
+            for key, table in (('dropped', self.torrent.peers), ('dropped6', self.torrent.peers6)):
+                if pex_result[key]:
+                    table.remove([(p['ip'], p['port']) for p in pex_result[key]])
+            self._emit('pex', pex_result)
         
         # Check if this is metadata
         elif extended_id == self.LOCAL_EXTENSIONS_IDS.get('ut_metadata'): 
@@ -458,7 +490,7 @@ class Peer():
         else:
             return # TODO unsupported extended message
     
-    def _handle_metadata_message(self, payload: bytes):
+    def _handle_metadata_message(self, payload: bytes|memoryview):
         """
         Handle ut_metadata message response and reassemble multiple pieces.
         
@@ -467,17 +499,11 @@ class Peer():
         - Followed by actual metadata bytes if msg_type=1
         """
         print("handle_metadata_message called")
-        # Find where bencoded dict ends
-        # The dict is terminated by 'e', and metadata follows
-        dict_end = payload.find(b'ee') + 2  # +2 to include the 'ee'
-        if dict_end < 2:
-            dict_end = payload.find(b'e') + 1
-            
-        bencoded_dict = payload[:dict_end]
-        metadata_bytes = payload[dict_end:]
-        
+        event: tuple = ()  # handlers run outside the try, so their errors aren't reported as parse errors
         try:
-            msg_dict: dict[bytes, Any] = bencodepy.decode(bencoded_dict)  # type: ignore
+            # The metadata follows right where the bencoded dict ends
+            msg_dict, dict_end = Bencode.decode_from(payload)
+            metadata_bytes = payload[dict_end:]
             msg_type = msg_dict.get(b'msg_type', -1)
             piece = msg_dict.get(b'piece', 0)
             
@@ -489,8 +515,9 @@ class Peer():
                 
                 # Store the piece
                 if metadata_bytes:
-                    self.metadata_pieces[piece] = metadata_bytes
+                    self.metadata_pieces[piece] = bytes(metadata_bytes)
                     print(f"Received metadata piece {piece}: {len(metadata_bytes)} bytes")
+                    event = ('metadata_piece', piece, self.metadata_pieces[piece])
                     
                     # Check if we have all pieces
                     if self._is_metadata_complete():
@@ -498,15 +525,14 @@ class Peer():
                     
             elif msg_type == 2:  # reject
                 # Peer rejected our metadata request
-                pass
+                event = ('metadata_reject', piece)
                 
             elif msg_type == 0:  # request
                 def reject():
                     nonlocal self
-                    response_payload = bencodepy.encode({b'msg_type': 2, b'piece': piece})
                     extended_id = self.peer_extension_ids.get('ut_metadata')
                     if extended_id is not None:
-                        self.send_extended_msg(response_payload, extended_id)
+                        self._send_extended({b'msg_type': 2, b'piece': piece}, extended_id)
                 if self.torrent.metadata is None:
                     reject()
                     return
@@ -522,33 +548,31 @@ class Peer():
                         b'piece': piece,
                         b'total_size': len(self.torrent.metadata),  # Include total size (BEP 9 recommended)
                     }
-                    response_payload = bencodepy.encode(response_dict) + piece_data
-                    
                     # Send response
                     extended_id = self.peer_extension_ids.get('ut_metadata')
                     if extended_id is not None:
-                        self.send_extended_msg(response_payload, extended_id)
+                        self._send_extended(response_dict, extended_id, trailer=piece_data)
                 else:
                     # Reject: piece out of range
                     reject()
                 
         except Exception as e:
             raise InvalidResponseException(self.peer, f"Failed to parse metadata message: {e}") from e
+        if event:
+            self._emit(*event)
     # endregion
 
     def _update_bitfield(self, bitfield: Optional[bytes] = None, have_index: Optional[int] = None):
-        """Update the peer's bitfield."""
+        """Update the peer's bitfield. HAVE messages set their bit in place."""
         if bitfield is not None:
-            self.bitfield = bitfield
+            self.bitfield = bytearray(bitfield)
             
         if have_index is not None and self.bitfield is not None:
             byte_index = have_index // 8
             bit_index = have_index % 8
             
             if byte_index < len(self.bitfield):
-                self.bitfield = (self.bitfield[:byte_index] +
-                                 bytes([self.bitfield[byte_index] | (1 << (7 - bit_index))]) +
-                                 self.bitfield[byte_index + 1:])
+                self.bitfield[byte_index] |= 1 << (7 - bit_index)
                 
     
     
@@ -595,7 +619,10 @@ class Peer():
     
 
     def read_all(self):
-        """Read all available data from the socket."""
+        """
+        Read all available data from the socket, until none arrives for 0.1
+        seconds. Use run_until() to wait for something specific instead.
+        """
         if not self._is_connected():
             raise SocketClosedException(self.peer)
         assert self.s is not None, "Socket is not connected"
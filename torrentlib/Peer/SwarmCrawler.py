@@ -0,0 +1,175 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Any, Callable, Iterable, Optional
+
+from ..Torrent import Torrent
+from .AsyncPeer import AsyncPeer
+
+
+class SwarmCrawler:
+    """
+    PEX-driven peer discovery over many concurrent connections.
+
+    Starting from seed peers (by default the torrent's tracker peers), up to
+    max_connections peers are visited at once on one event loop. Each visit
+    connects, waits for the peer's first PEX message and closes; the 'added'
+    peers it lists go into a priority frontier. Peers reported by more
+    visited peers, or flagged as reachable, are visited first. Discovered
+    peers end up in torrent.peers / torrent.peers6 as with any PEX message.
+    """
+    def __init__(self, torrent: Torrent, self_peer_id: str,
+                 max_connections: int = 200,
+                 connect_timeout: float = 5,
+                 visit_time: float = 15):
+        """
+        Args:
+            torrent: Torrent whose swarm is crawled.
+            self_peer_id: Our 20-character peer ID.
+            max_connections: Most peers connected (or connecting) at once.
+            connect_timeout: Seconds allowed for connecting and both handshakes.
+            visit_time: Seconds to wait for a peer's first PEX message.
+        """
+        assert max_connections >= 1, "max_connections must be at least 1"
+        self.torrent = torrent
+        self.self_peer_id = self_peer_id
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.visit_time = visit_time
+
+        self._frontier: list[tuple[int, int, tuple[str, int]]] = []  # (-score, seq, peer)
+        self._seq = itertools.count()
+        self._scores: dict[tuple[str, int], int] = {}  # every peer seen, with its score
+        self._visited: set[tuple[str, int]] = set()
+        self._stats = {"visited": 0, "connected": 0, "failed": 0, "pex_messages": 0}
+
+    def add(self, peers: Iterable[tuple[str, int]], score: int = 1):
+        """Queue peers to visit, e.g. from a tracker response."""
+        for peer in peers:
+            self._report(peer, score)
+
+    @property
+    def discovered(self) -> int:
+        """Number of distinct peers seen so far, seeds included."""
+        return len(self._scores)
+
+    @property
+    def frontier(self) -> int:
+        """Number of peers waiting to be visited."""
+        return sum(1 for peer in self._scores if peer not in self._visited)
+
+    def _report(self, peer: tuple[str, int], score: int):
+        """Raise peer's score and (re)queue it. Stale heap entries are skipped when popped."""
+        if peer[1] == 0:
+            return
+        self._scores[peer] = total = self._scores.get(peer, 0) + score
+        if peer not in self._visited:
+            heapq.heappush(self._frontier, (-total, next(self._seq), peer))
+
+    def _pop(self) -> Optional[tuple[str, int]]:
+        while self._frontier:
+            _, _, peer = heapq.heappop(self._frontier)
+            if peer not in self._visited:
+                self._visited.add(peer)
+                return peer
+        return None
+
+    # region - crawl
+    def crawl(self, max_peers: int|None = None, duration: float|None = None) -> dict:
+        """Blocking wrapper around crawl_async()."""
+        return asyncio.run(self.crawl_async(max_peers=max_peers, duration=duration))
+
+    async def crawl_async(self, max_peers: int|None = None, duration: float|None = None) -> dict:
+        """
+        Crawl until a stop condition is met.
+
+        Args:
+            max_peers: Stop once this many distinct peers have been discovered.
+            duration: Stop after this many seconds.
+
+        Returns:
+            Statistics: 'reason' ('max_peers', 'duration' or 'exhausted'),
+            'visited', 'connected', 'failed', 'pex_messages', 'discovered',
+            'frontier' and 'elapsed'.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.add(list(self.torrent.peers) + list(self.torrent.peers6))
+
+        done = asyncio.Event()
+        wakeup = asyncio.Event()
+        reason = ["exhausted"]
+        active = 0
+
+        def finish(why: str):
+            if not done.is_set():
+                reason[0] = why
+                done.set()
+                wakeup.set()
+
+        def on_pex(peer: AsyncPeer, pex: dict):
+            self._stats["pex_messages"] += 1
+            for p in pex['added'] + pex['added6']:
+                self._report((p['ip'], p['port']), 2 if p.get('outgoing') else 1)
+            wakeup.set()
+            if max_peers is not None and self.discovered >= max_peers:
+                finish("max_peers")
+
+        async def worker():
+            nonlocal active
+            while not done.is_set():
+                peer = self._pop()
+                if peer is None:
+                    if active == 0:
+                        finish("exhausted")  # nothing queued and nothing that could add more
+                        return
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                active += 1
+                try:
+                    await self._visit(peer, on_pex, done)
+                finally:
+                    active -= 1
+                    wakeup.set()
+
+        if max_peers is not None and self.discovered >= max_peers:
+            finish("max_peers")
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_connections)]
+        try:
+            await asyncio.wait_for(done.wait(), duration)
+        except asyncio.TimeoutError:
+            reason[0] = "duration"
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return {
+            "reason": reason[0],
+            **self._stats,
+            "discovered": self.discovered,
+            "frontier": self.frontier,
+            "elapsed": loop.time() - started,
+        }
+
+    async def _visit(self, addr: tuple[str, int], on_pex: Callable[[AsyncPeer, dict], Any], done: asyncio.Event):
+        """Connect to one peer and wait for its first PEX message."""
+        self._stats["visited"] += 1
+        peer = AsyncPeer(addr, self.torrent, self.self_peer_id)
+        peer.TIMEOUT = self.connect_timeout
+        received: list[dict] = []
+        peer.on_pex(on_pex)
+        peer.on_pex(lambda p, pex: received.append(pex))
+        try:
+            await peer.connect()
+            self._stats["connected"] += 1
+            if 'ut_pex' in peer.peer_extension_ids:
+                await peer.run_until(lambda: bool(received) or done.is_set(), self.visit_time)
+        except Exception as e:  # any misbehaving peer only ends its own visit
+            self._stats["failed"] += 1
+            logging.debug(f"❌ {addr[0]}:{addr[1]}: {e}")
+        finally:
+            peer.close()
+    # endregion
@@ -1,2 +1,5 @@
 from .Peer import Peer
+from .AsyncPeer import AsyncPeer
+from .SwarmCrawler import SwarmCrawler
+from .MetadataFetcher import MetadataFetcher
 from .PeerCommunicationException import *
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Array-backed peer store used for Torrent.peers and Torrent.peers6.
+
+Each peer costs a handful of bytes in parallel arrays (address, port, PEX
+flag bitmask, last-seen time) plus one integer entry in a hash index, instead
+of a tuple, a str and an empty dict per peer. The table still reads like the
+{(ip, port): {flags}} dict it replaces.
+"""
+import socket
+import threading
+import time
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Iterable, Iterator, Optional
+
+from .Compact import _UINT32
+
+# PEX 'added.f' bits (BEP 11), in bit order
+PEX_FLAGS = ('encrypted', 'seed', 'utp', 'holepunch', 'outgoing')
+
+
+def flags_to_dict(flags: int) -> dict[str, bool]:
+    """Expand a PEX flag byte into {'encrypted': bool, ...}; 0 gives an empty dict."""
+    if not flags:
+        return {}
+    return {name: bool(flags & (1 << bit)) for bit, name in enumerate(PEX_FLAGS)}
+
+
+def dict_to_flags(meta: dict[str, Any]) -> int:
+    """Pack a flags dict as returned by flags_to_dict() back into a byte."""
+    return sum(1 << bit for bit, name in enumerate(PEX_FLAGS) if meta.get(name))
+
+
+class PeerTable(MutableMapping):
+    """
+    Peers of one address family, stored as parallel arrays with a hash index.
+
+    Reads behave like dict[tuple[str, int], dict]: iterating yields (ip, port)
+    tuples and table[(ip, port)] is the peer's PEX flags as a dict. Writers
+    should prefer merge()/merge_packed(), which add many peers in one locked
+    pass. Every method takes the table's lock, so trackers and peer
+    connections can update it concurrently.
+    """
+    def __init__(self, ipv6: bool = False, lock: Optional[threading.RLock] = None):
+        """
+        Args:
+            ipv6: Store IPv6 peers instead of IPv4.
+            lock: Lock to guard the table with (e.g. Torrent._peers_lock). Must be reentrant.
+        """
+        self.ipv6 = ipv6
+        self._lock = lock if lock is not None else threading.RLock()
+
+        # IPv4 addresses are one 32-bit column, IPv6 addresses two 64-bit halves
+        self._ips: list[array] = [array('Q'), array('Q')] if ipv6 else [array(_UINT32)]
+        self._ports = array('H')
+        self._flags = array('B')
+        self._last_seen = array('d')
+        self._index: dict[int, int] = {}  # {address << 16 | port: slot}
+
+    # region - key encoding
+    def _address(self, ip: str) -> int:
+        try:
+            if self.ipv6:
+                return int.from_bytes(socket.inet_pton(socket.AF_INET6, ip), 'big')
+            return int.from_bytes(socket.inet_aton(ip), 'big')
+        except (OSError, TypeError) as e:
+            raise ValueError(f"Invalid {'IPv6' if self.ipv6 else 'IPv4'} address: {ip!r}") from e
+
+    def _key(self, peer: tuple[str, int]) -> int:
+        ip, port = peer
+        if not 0 <= port <= 0xFFFF:
+            raise ValueError(f"Invalid port: {port!r}")
+        return self._address(ip) << 16 | port
+
+    def _format(self, address: int) -> str:
+        if self.ipv6:
+            return socket.inet_ntop(socket.AF_INET6, address.to_bytes(16, 'big'))
+        return socket.inet_ntoa(address.to_bytes(4, 'big'))
+
+    def _address_at(self, slot: int) -> int:
+        if self.ipv6:
+            return self._ips[0][slot] << 64 | self._ips[1][slot]
+        return self._ips[0][slot]
+    # endregion
+
+    # region - storage, caller holds self._lock
+    def _put(self, key: int, flags: int|None, now: float) -> bool:
+        """Insert or refresh one peer. flags None keeps the current flags. Returns True if new."""
+        slot = self._index.get(key)
+        if slot is not None:
+            if flags is not None:
+                self._flags[slot] = flags
+            self._last_seen[slot] = now
+            return False
+
+        address = key >> 16
+        if self.ipv6:
+            self._ips[0].append(address >> 64)
+            self._ips[1].append(address & 0xFFFFFFFFFFFFFFFF)
+        else:
+            self._ips[0].append(address)
+        self._ports.append(key & 0xFFFF)
+        self._flags.append(flags or 0)
+        self._last_seen.append(now)
+        self._index[key] = len(self._ports) - 1
+        return True
+
+    def _drop(self, key: int):
+        """Remove one peer by moving the last slot into its place."""
+        slot = self._index.pop(key)
+        last = len(self._ports) - 1
+        if slot != last:
+            for column in (*self._ips, self._ports, self._flags, self._last_seen):
+                column[slot] = column[last]
+            self._index[self._address_at(slot) << 16 | self._ports[slot]] = slot
+        for column in (*self._ips, self._ports, self._flags, self._last_seen):
+            column.pop()
+    # endregion
+
+    # region - mapping interface
+    def __getitem__(self, peer: tuple[str, int]) -> dict[str, bool]:
+        with self._lock:
+            slot = self._index.get(self._key(peer))
+            if slot is None:
+                raise KeyError(peer)
+            return flags_to_dict(self._flags[slot])
+
+    def __setitem__(self, peer: tuple[str, int], meta: dict[str, Any]):
+        with self._lock:
+            self._put(self._key(peer), dict_to_flags(meta or {}), time.time())
+
+    def __delitem__(self, peer: tuple[str, int]):
+        with self._lock:
+            key = self._key(peer)
+            if key not in self._index:
+                raise KeyError(peer)
+            self._drop(key)
+
+    def __contains__(self, peer: object) -> bool:
+        try:
+            key = self._key(peer)  # type: ignore
+        except (ValueError, TypeError):
+            return False
+        return key in self._index
+
+    def __iter__(self) -> Iterator[tuple[str, int]]:
+        # Iterate over a snapshot so concurrent merges cannot break the loop
+        with self._lock:
+            addresses = [self._address_at(slot) for slot in range(len(self._ports))]
+            ports = self._ports[:]
+        for address, port in zip(addresses, ports):
+            yield self._format(address), port
+
+    def __len__(self) -> int:
+        return len(self._ports)
+
+    def __ior__(self, other) -> 'PeerTable':
+        self.update(other)
+        return self
+
+    def __repr__(self) -> str:
+        return f"PeerTable({'IPv6' if self.ipv6 else 'IPv4'}, peers={len(self)})"
+    # endregion
+
+    # region - bulk operations
+    def merge(self, peers: Iterable[tuple[str, int]], flags: Iterable[int]|None = None) -> int:
+        """
+        Add or refresh many peers in one locked pass.
+
+        Args:
+            peers: (ip, port) tuples.
+            flags: Optional PEX flag byte per peer. Without it, known peers keep their flags.
+
+        Returns:
+            Number of peers that were not in the table yet.
+        """
+        keys = [self._key(peer) for peer in peers]
+        flag_list = list(flags) if flags is not None else [None] * len(keys)
+        now = time.time()
+        with self._lock:
+            return sum(self._put(key, flag, now) for key, flag in zip(keys, flag_list))
+
+    def merge_packed(self, packed: tuple[array, ...], flags: Iterable[int]|None = None) -> int:
+        """
+        Add or refresh peers straight from torrentlib.Compact packed output:
+        (ips, ports) for IPv4 or (ips_high, ips_low, ports) for IPv6.
+
+        Returns:
+            Number of peers that were not in the table yet.
+        """
+        if self.ipv6:
+            high, low, ports = packed
+            keys = [(h << 64 | l) << 16 | p for h, l, p in zip(high, low, ports)]
+        else:
+            ips, ports = packed
+            keys = [ip << 16 | p for ip, p in zip(ips, ports)]
+        flag_list = list(flags) if flags is not None else [None] * len(keys)
+        now = time.time()
+        with self._lock:
+            return sum(self._put(key, flag, now) for key, flag in zip(keys, flag_list))
+
+    def remove(self, peers: Iterable[tuple[str, int]]) -> int:
+        """Remove the given peers if present. Returns the number removed."""
+        keys = [self._key(peer) for peer in peers]
+        with self._lock:
+            present = [key for key in keys if key in self._index]
+            for key in present:
+                self._drop(key)
+            return len(present)
+
+    def evict_older_than(self, max_age: float, now: float|None = None) -> int:
+        """Remove peers not seen for max_age seconds. Returns the number removed."""
+        cutoff = (time.time() if now is None else now) - max_age
+        with self._lock:
+            keep = [slot for slot, seen in enumerate(self._last_seen) if seen >= cutoff]
+            removed = len(self._ports) - len(keep)
+            if removed:
+                for column in (*self._ips, self._ports, self._flags, self._last_seen):
+                    column[:] = array(column.typecode, [column[slot] for slot in keep])
+                self._index = {self._address_at(slot) << 16 | self._ports[slot]: slot
+                               for slot in range(len(self._ports))}
+            return removed
+
+    def last_seen(self, peer: tuple[str, int]) -> float|None:
+        """Wall-clock time the peer was last added or refreshed, or None if unknown."""
+        with self._lock:
+            slot = self._index.get(self._key(peer))
+            return None if slot is None else self._last_seen[slot]
+
+    def packed(self) -> tuple[array, ...]:
+        """Copy of the address and port columns in the torrentlib.Compact packed layout."""
+        with self._lock:
+            return (*(column[:] for column in self._ips), self._ports[:])
+
+    def clear(self):
+        with self._lock:
+            for column in (*self._ips, self._ports, self._flags, self._last_seen):
+                del column[:]
+            self._index.clear()
+    # endregion
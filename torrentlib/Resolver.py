@@ -0,0 +1,161 @@
+"""
+Shared DNS cache for tracker and peer connections.
+
+getaddrinfo() blocks, and calling it once per announce or probe serializes
+large sweeps. The Resolver caches answers (and failures) for a while and runs
+lookups on a bounded thread pool. Concurrent lookups of one host share a
+single getaddrinfo() call.
+"""
+import asyncio
+import socket
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+
+def is_ip_address(host: str) -> bool:
+    """True for IPv4 and IPv6 literals, which need no lookup."""
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, host)
+            return True
+        except (OSError, ValueError):
+            continue
+    return False
+
+
+class Resolver:
+    """
+    Hostname to address cache with TTL, negative caching and a bounded lookup pool.
+    """
+    _shared: Optional['Resolver'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, ttl: float = 300, negative_ttl: float = 60,
+                 max_workers: int = 32, max_entries: int = 65536,
+                 family: int = socket.AF_INET):
+        """
+        Args:
+            ttl: Seconds a successful lookup is reused.
+            negative_ttl: Seconds a failed lookup is reported without retrying.
+            max_workers: Most getaddrinfo() calls running at once.
+            max_entries: Most hostnames cached; the oldest are dropped first.
+            family: Address family to resolve (AF_INET or AF_INET6).
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.family = family
+
+        self._cache: dict[str, tuple[str|None, tuple, float]] = {}  # {host: (address, error args, expires_at)}
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resolver")
+
+    @classmethod
+    def shared(cls) -> 'Resolver':
+        """Return the process-wide resolver, creating it on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    # region - lookups
+    def submit(self, host: str) -> Future:
+        """
+        Start resolving host without waiting.
+
+        Returns:
+            Future of the address string; it raises socket.gaierror if the
+            host does not resolve.
+        """
+        future: Future = Future()
+        if is_ip_address(host):
+            future.set_result(host)
+            return future
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(host)
+            if cached is not None and cached[2] > now:
+                address, error, _ = cached
+                if address is not None:
+                    future.set_result(address)
+                else:
+                    future.set_exception(socket.gaierror(*error))
+                return future
+
+            pending = self._pending.get(host)
+            if pending is not None:
+                return pending
+            self._pending[host] = future
+
+        self._executor.submit(self._lookup, host, future)
+        return future
+
+    def resolve(self, host: str, timeout: float|None = None) -> str:
+        """
+        Resolve host to an address, from the cache when possible.
+
+        Raises:
+            socket.gaierror: The host does not resolve (possibly cached).
+            concurrent.futures.TimeoutError: No answer within timeout.
+        """
+        return self.submit(host).result(timeout)
+
+    async def resolve_async(self, host: str) -> str:
+        """Asyncio counterpart of resolve(); the lookup runs on the resolver's pool."""
+        # Shielded: a caller timing out must not cancel a lookup other callers share
+        return await asyncio.shield(asyncio.wrap_future(self.submit(host)))
+
+    def resolve_many(self, hosts: Iterable[str], timeout: float|None = None) -> dict[str, str|None]:
+        """
+        Resolve many hosts in parallel.
+
+        Returns:
+            {host: address}, with None for hosts that failed or timed out.
+        """
+        futures = {host: self.submit(host) for host in set(hosts)}
+        deadline = None if timeout is None else time.monotonic() + timeout
+        result = {}
+        for host, future in futures.items():
+            try:
+                wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+                result[host] = future.result(wait)
+            except Exception:
+                result[host] = None
+        return result
+
+    def clear(self):
+        """Forget every cached answer."""
+        with self._lock:
+            self._cache.clear()
+
+    def _lookup(self, host: str, future: Future):
+        address, error, ttl = None, (f"Lookup of {host!r} failed",), self.negative_ttl
+        try:
+            addr_info = socket.getaddrinfo(host, None, family=self.family, type=socket.SOCK_STREAM)
+            address, error, ttl = addr_info[0][4][0], (), self.ttl
+        except OSError as e:
+            error = e.args
+        except Exception as e:  # e.g. UnicodeError for a label over 63 characters
+            error = (f"Invalid host {host!r}: {e}",)
+        finally:
+            # Always settle the future and clear _pending, or every later caller would wait forever
+            with self._lock:
+                self._cache.pop(host, None)  # re-insert so the oldest lookup is dropped first
+                self._cache[host] = (address, error, time.monotonic() + ttl)
+                if len(self._cache) > self.max_entries:
+                    del self._cache[next(iter(self._cache))]
+                self._pending.pop(host, None)
+
+            if not future.done():
+                if address is not None:
+                    future.set_result(address)
+                else:
+                    future.set_exception(socket.gaierror(*error))
+    # endregion
@@ -3,6 +3,7 @@ import threading
 import humanize
 from typing import Any, Optional
 from enum import Enum
+from .PeerTable import PeerTable
 
 
 def _parse_torrent_file(filename: str) -> Optional[dict[str, Any]]:
@@ -49,6 +50,7 @@ def _parse_torrent_file(filename: str) -> Optional[dict[str, Any]]:
 
 
 class TorrentStatus(Enum):
+    NONE = 0        # regular re-announce, no event
     COMPLETED = 1
     STARTED = 2
     STOPPED = 3
@@ -101,7 +103,7 @@ class Torrent:
         
         # Thread safety locks
         self._lock = threading.RLock()  # For metadata and file cache
-        self._peers_lock = threading.Lock()  # For peer dictionaries
+        self._peers_lock = threading.RLock()  # For peer tables
         
         # Torrent status
         self.uploaded = uploaded
@@ -110,8 +112,8 @@ class Torrent:
         self.left = cal_left if left is None else left
         self.event = event   # Default tracker event
         
-        self.peers: dict[tuple[str, int], dict] = {}  # List of (ip, port) tuples
-        self.peers6: dict[tuple[str, int], dict] = {} # List of (ip, port) tuples for IPv6
+        self.peers = PeerTable(lock=self._peers_lock)               # {(ip, port): flags} for IPv4
+        self.peers6 = PeerTable(ipv6=True, lock=self._peers_lock)   # {(ip, port): flags} for IPv6
     
     def __str__(self) -> str:
         """"Human-readable string representation of the torrent."""
@@ -0,0 +1,134 @@
+import asyncio
+import ssl
+from urllib.parse import urlparse, urlencode, urljoin
+
+from ..Resolver import Resolver
+
+MAX_REDIRECTS = 5
+MAX_BODY_SIZE = 16 * 1024 * 1024  # trackers never need more than this
+CLOSE_TIMEOUT = 1  # seconds to wait for a connection (and its TLS session) to shut down
+
+_ssl_context: ssl.SSLContext|None = None
+
+
+class HTTPResponse:
+    """Status code and body of a completed HTTP request."""
+    def __init__(self, status_code: int, headers: dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+async def get(url: str, params: dict|None = None, headers: dict|None = None,
+              allow_redirects: bool = True) -> HTTPResponse:
+    """
+    Minimal asyncio HTTP/1.1 GET, enough for tracker announces and scrapes.
+
+    Params are url-encoded the same way requests does (bytes are percent-encoded).
+    Wrap the call in asyncio.wait_for() to apply a timeout.
+
+    Raises:
+        OSError: Connection or TLS failure, or the connection closed mid-response
+            (ConnectionError).
+        ValueError: Unsupported scheme or malformed response.
+    """
+    if params:
+        url += ("&" if urlparse(url).query else "?") + urlencode(params)
+
+    for _ in range(MAX_REDIRECTS + 1):
+        response = await _get_once(url, headers or {})
+        location = response.headers.get("location")
+        if not allow_redirects or response.status_code // 100 != 3 or not location:
+            return response
+        url = urljoin(url, location)
+
+    raise ValueError(f"Too many redirects for '{url}'")
+
+
+def _default_ssl_context() -> ssl.SSLContext:
+    """One shared client context, so certificates are loaded once, not per request."""
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+async def _get_once(url: str, headers: dict) -> HTTPResponse:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Unsupported URL '{url}'")
+
+    is_https = parsed.scheme == "https"
+    port = parsed.port or (443 if is_https else 80)
+    ssl_context = _default_ssl_context() if is_https else None
+
+    address = await Resolver.shared().resolve_async(parsed.hostname)
+    reader, writer = await asyncio.open_connection(address, port, ssl=ssl_context,
+                                                   server_hostname=parsed.hostname if is_https else None)
+    try:
+        target = parsed.path or "/"
+        if parsed.query:
+            target += "?" + parsed.query
+        host = parsed.hostname if parsed.port is None else f"{parsed.hostname}:{parsed.port}"
+
+        request_headers = {"Host": host, "Accept": "*/*", "Connection": "close"}
+        request_headers.update(headers)
+        request = f"GET {target} HTTP/1.1\r\n"
+        request += "".join(f"{k}: {v}\r\n" for k, v in request_headers.items())
+        writer.write(request.encode("latin-1") + b"\r\n")
+        await writer.drain()
+
+        try:
+            return await _read_response(reader)
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionError(f"Connection closed after {len(e.partial)} of "
+                                  f"{e.expected} response bytes") from e
+    finally:
+        writer.close()
+        try:
+            await asyncio.wait_for(writer.wait_closed(), CLOSE_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            pass  # the reply is already read; a failed shutdown doesn't change it
+
+
+async def _read_response(reader: asyncio.StreamReader) -> HTTPResponse:
+    status_line = await reader.readline()
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(b"HTTP/"):
+        raise ValueError(f"Malformed status line: {status_line!r}")
+    status_code = int(parts[1])
+
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                break
+            if len(body) + size > MAX_BODY_SIZE:
+                raise ValueError("Response body too large")
+            body += await reader.readexactly(size)
+            await reader.readline()  # CRLF after each chunk
+        content = bytes(body)
+    elif "content-length" in headers:
+        length = int(headers["content-length"])
+        if length > MAX_BODY_SIZE:
+            raise ValueError("Response body too large")
+        content = await reader.readexactly(length)
+    else:
+        # No framing: body runs until the server closes the connection
+        body = bytearray()
+        while chunk := await reader.read(65536):
+            body += chunk
+            if len(body) > MAX_BODY_SIZE:
+                raise ValueError("Response body too large")
+        content = bytes(body)
+
+    return HTTPResponse(status_code, headers, content)
@@ -1,44 +1,108 @@
+import asyncio
 import requests
-import struct
-import random
-import socket
+import time
+import heapq
 import logging
+import threading
+from collections import deque
 from bencodepy import decode as bdecode, exceptions as bexceptions
 from urllib.parse import urlparse
 from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from .TrackerQueryException import TrackerQueryException, TimeoutError
+from ..Resolver import Resolver
+from .UDPClient import UDPTrackerClient, PROTOCOL_ID, ACTION_CONNECT, _check_action
+from .HTTPPool import HTTPSessionPool, get as resolving_get
+from .Health import TrackerHealth
+from .Concurrency import AdaptiveLimiter
+from .HealthStore import TrackerHealthStore
+from .Metrics import Metrics, metered
+from . import AsyncHTTP
+
+
+_CHECK_HEADERS = {
+    "User-Agent": "qBittorrent/4.5.2",  # Mimic a known client
+    "Accept": "*/*",
+    "Connection": "close"
+}
+
+_CHECK_PARAMS = {
+    'info_hash': bytes.fromhex('8a19577fb5f690970ca43a57ff1011ae202244b8'),
+    'peer_id': '-robots-testing12345',
+    'left': '0',
+    'port': '6881',
+    'downloaded': '0',
+    'uploaded': '0',
+    'event': 'stopped',
+}
+
+
+def _check_http_response(url: str, sc: int, content: bytes) -> bool:
+    """
+    Decide whether an HTTP tracker reply means the tracker is alive.
+    """
+    if sc == 200:
+        logging.debug(f"✅ {url}: Active")
+        try: 
+            bdecode(content)
+            return True
+        except bexceptions.DecodingError as e:
+            logging.debug(f"❌ {url}: Invalid response format - {e}")
+            return False
+    elif sc == 400: 
+        logging.debug(f"⚠️ {url}: Active, (400) Bad Request")
+        return False
+    else:
+        logging.debug(f"⚠️ Responded but not valid: {url} ({sc})")
+        return False
+
+
+def _submit_connect(client: UDPTrackerClient, addr: tuple[str, int], retries: int = 5) -> tuple[int, Future]:
+    """
+    Send a connect request, backing off briefly while the socket's send buffer is full.
+    """
+    for attempt in range(retries):
+        try:
+            return client.submit(addr, PROTOCOL_ID, ACTION_CONNECT)
+        except (BlockingIOError, InterruptedError):
+            time.sleep(0.001 * 2 ** attempt)
+    return client.submit(addr, PROTOCOL_ID, ACTION_CONNECT)
+
+
+def _split_udp_url(url: str) -> tuple[str, int]|None:
+    parsed = urlparse(url)
+    try:
+        HOSTNAME = parsed.hostname
+        PORT = parsed.port
+    except ValueError:
+        return None
+    if HOSTNAME is None or PORT is None:
+        return None
+    return HOSTNAME, PORT
 
 
 class Check:
     @staticmethod
-    def http(url: str, timeout: int = 5) -> bool:
+    @metered("tracker_check")
+    def http(url: str, timeout: int = 5, session_pool: HTTPSessionPool|None = None) -> bool:
         """
         Check if a given HTTP tracker URL is reachable and returns a status code.
+        With a session_pool, the check reuses that pool's keep-alive connections.
         """
-        info_hash_hex = '8a19577fb5f690970ca43a57ff1011ae202244b8'
-        info_hash_bytes = bytes.fromhex(info_hash_hex)
-
-        headers = {
-            "User-Agent": "qBittorrent/4.5.2",  # Mimic a known client
-            "Accept": "*/*",
-            "Connection": "close"
-        }
-
-        params = {
-            'info_hash': info_hash_bytes,
-            'peer_id': '-robots-testing12345',
-            'left': '0',
-            'port': '6881',
-            'downloaded': '0',
-            'uploaded': '0',
-            'event': 'stopped',
-        }
+        if session_pool is not None:
+            http_get = session_pool.get
+            headers = _CHECK_HEADERS | {"Connection": "keep-alive"}
+        else:
+            http_get = resolving_get
+            headers = _CHECK_HEADERS
 
         try:
-            response = requests.get(url,
-                                    headers=headers,
-                                    params=params,
-                                    allow_redirects=True,
-                                    timeout=timeout)
+            response = http_get(url,
+                                headers=headers,
+                                params=_CHECK_PARAMS,
+                                allow_redirects=True,
+                                timeout=timeout)
         except requests.exceptions.Timeout as e:
             logging.debug(f"❌ {url}: Timeout - {e}")
             return False
@@ -46,69 +110,80 @@ class Check:
             logging.debug(f"❌ {url}: Unexpected error - {e}")
             return False
         
-        sc = response.status_code
-        if sc == 200:
-            logging.debug(f"✅ {url}: Active")
-            try: 
-                bdecode(response.content)
-                return True
-            except bexceptions.DecodingError as e:
-                logging.debug(f"❌ {url}: Invalid response format - {e}")
-                return False
-        elif sc == 400: 
-            logging.debug(f"⚠️ {url}: Active, (400) Bad Request")
+        return _check_http_response(url, response.status_code, response.content)
+
+    @staticmethod
+    @metered("tracker_check")
+    async def http_async(url: str, timeout: int = 5) -> bool:
+        """
+        Asyncio counterpart of http().
+        """
+        try:
+            response = await asyncio.wait_for(
+                AsyncHTTP.get(url, params=_CHECK_PARAMS, headers=_CHECK_HEADERS),
+                timeout)
+        except asyncio.TimeoutError as e:
+            logging.debug(f"❌ {url}: Timeout - {e}")
             return False
-        else:
-            logging.debug(f"⚠️ Responded but not valid: {url} ({response.status_code})")
+        except (OSError, ValueError) as e:
+            logging.debug(f"❌ {url}: Unexpected error - {e}")
             return False
 
+        return _check_http_response(url, response.status_code, response.content)
+
     @staticmethod
+    @metered("tracker_check")
     def udp(url: str, timeout: int = 5) -> bool:
         """
         Check if a given UDP tracker URL is reachable and responds correctly.
         """
-        def response_validator(response, id)-> bool:
-            action, transaction_id, connection_id = struct.unpack("!iiq", response[:16])
-            if action == ACTION and transaction_id == id:
-                logging.debug(f"✅ {url}: Active")
-                return True
-            else:
-                logging.debug(f"❌ {url}: Invalid response")
-                return False
-            
-        parsed = urlparse(url)
-        HOSTNAME = parsed.hostname
-        PORT = parsed.port
+        addr = _split_udp_url(url)
+        if addr is None:
+            logging.debug(f"❌ {url}: Missing host or port")
+            return False
 
-        # Constants
-        PROTOCOL_ID = 0x41727101980    # 8-byte magic number
-        ACTION = 0                     # Connect = 0
-        id = random.randint(0, 0xFFFF)  # Random 4-byte integer
+        try:
+            UDPTrackerClient.shared().connection_id(*addr, timeout=timeout, url=url)
+        except TimeoutError:
+            logging.debug(f"❌ {url}: Request timed out")
+            return False
+        except TrackerQueryException as e:
+            logging.debug(f"❌ {url}: Invalid response - {e}")
+            return False
 
-        # Create packet: ! means network byte order (big-endian)
-        packet = struct.pack("!qii", PROTOCOL_ID, ACTION, id)
+        logging.debug(f"✅ {url}: Active")
+        return True
 
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(timeout)  # Optional: wait up to 5 seconds
+    @staticmethod
+    @metered("tracker_check")
+    async def udp_async(url: str, timeout: int = 5) -> bool:
+        """
+        Asyncio counterpart of udp().
+        """
+        addr = _split_udp_url(url)
+        if addr is None:
+            logging.debug(f"❌ {url}: Missing host or port")
+            return False
 
         try:
-            s.sendto(packet, (HOSTNAME, PORT))
-            response, addr = s.recvfrom(1024)  # buffer size can be adjusted
-            # You can unpack the response here depending on expected format
-            return response_validator(response, id)
-        except socket.timeout:
-            print(f"❌ {url}: Request timed out")
+            await UDPTrackerClient.shared().connection_id_async(*addr, timeout=timeout, url=url)
+        except TimeoutError:
+            logging.debug(f"❌ {url}: Request timed out")
+            return False
+        except TrackerQueryException as e:
+            logging.debug(f"❌ {url}: Invalid response - {e}")
             return False
-        finally:
-            s.close()
+
+        logging.debug(f"✅ {url}: Active")
+        return True
 
     @staticmethod
-    def auto(url: str, timeout: int = 5) -> bool:
+    def auto(url: str, timeout: int = 5, session_pool: HTTPSessionPool|None = None) -> bool:
         """
         Check tracker URL based on its scheme (http or udp).
         """
         if url.startswith("http"):
-            return Check.http(url, timeout=timeout)
+            return Check.http(url, timeout=timeout, session_pool=session_pool)
         elif url.startswith("udp"):
             return Check.udp(url, timeout=timeout)
         else:
@@ -116,33 +191,265 @@ class Check:
             return False
         
     @staticmethod
-    def multiple(urls: Iterable, max_threads=50, timeout: int = 5):
+    async def auto_async(url: str, timeout: int = 5) -> bool:
+        """
+        Asyncio counterpart of auto().
         """
-        Check multiple tracker status concurrently
+        if url.startswith("http"):
+            return await Check.http_async(url, timeout=timeout)
+        elif url.startswith("udp"):
+            return await Check.udp_async(url, timeout=timeout)
+        else:
+            logging.debug(f"❌ Unsupported scheme: {url}")
+            return False
+        
+    @staticmethod
+    def multiple(urls: Iterable, max_threads=50, timeout: int = 5,
+                 session_pool: HTTPSessionPool|None = None,
+                 health: TrackerHealth|None = None,
+                 store: TrackerHealthStore|None = None,
+                 limiter: AdaptiveLimiter|None = None) -> dict[str, bool]:
         """
-        import threading
-        semaphore = threading.Semaphore(max_threads)
-        def threaded_check(url):
-            with semaphore:
-                result = Check.auto(url, timeout=timeout)
-                results[url] = result
+        Check multiple tracker status concurrently.
 
-        results = {}
-        threads = []
+        UDP trackers get one connect request per resolved (address, port),
+        shared by every URL pointing there, all sent through the shared
+        UDPTrackerClient socket and matched back by transaction ID, so a sweep
+        takes about one timeout window however many trackers there are.
+        Hostnames are looked up through the shared Resolver cache; trackers
+        whose lookup has not finished within timeout are reported down. HTTP
+        probes run on a pool of max_threads workers.
+        A UDP tracker whose connection ID is still cached counts as active
+        without a probe; a fresh connection ID is cached for later announces.
 
-        for url in urls:
-            t = threading.Thread(target=threaded_check, args=(url,))
-            t.start()
-            threads.append(t)
+        With a health registry, failing trackers inside their cooldown are
+        reported down without a probe and the others get adaptive timeouts.
+        With a store, trackers checked within its ttl keep their stored status
+        without a probe, and every new outcome is written back to it.
+        With a limiter (AdaptiveLimiter), probes in flight are capped by its
+        adaptive limit instead of all going out at once.
+
+        Returns:
+            {url: bool} in the order the URLs were checked.
+        """
+        urls = list(dict.fromkeys(urls))
+        if health is not None:
+            urls = health.order(urls)
+        elif store is not None:
+            urls = store.order(urls)
+        known = store.fresh(urls) if store is not None else {}
+
+        client = UDPTrackerClient.shared()
+        metrics = Metrics.shared()
+        results: dict[str, bool] = {}
+        latencies: dict[str, float] = {}
+        skipped: set[str] = set()
+
+        # UDP probe state, guarded by cond; the receiver and resolver threads only append
+        cond = threading.Condition()
+        ready: deque[tuple[str, tuple[str, int], float]] = deque()  # resolved, waiting for a slot
+        answered: deque[tuple[tuple[str, int], int]] = deque()      # (addr, transaction_id) of replies
+        deadlines: list[tuple[float, tuple[str, int]]] = []         # heap of (timeout_at, addr)
+        probes: dict[tuple[str, int], tuple[int, Future, float, float, list[str]]] = {}  # {addr: (transaction_id, future, sent_at, timeout, urls)}
+        replied_at: dict[int, float] = {}                           # {transaction_id: reply time}
+        lookups: dict[Future, list[tuple[str, int, float]]] = {}    # hostname lookups still running
+        resolve_deadline = time.monotonic() + timeout               # lookups must finish within the sweep
+
+        def on_resolved(future: Future):
+            with cond:
+                entries = lookups.pop(future, None)
+                if entries is None:
+                    return  # gave up on it at resolve_deadline
+                for url, port, url_timeout in entries:
+                    try:
+                        ready.append((url, (future.result(), port), url_timeout))
+                    except OSError as e:
+                        logging.debug(f"❌ {url}: Name resolution failed - {e}")
+                        results[url] = False
+                        metrics.record("tracker_check", url, "down")
+                cond.notify()
+
+        def on_reply(addr: tuple[str, int], transaction_id: int):
+            with cond:
+                replied_at.setdefault(transaction_id, time.monotonic())
+                answered.append((addr, transaction_id))
+                cond.notify()
+
+        def give_up_lookups():
+            for entries in lookups.values():
+                for url, _, _ in entries:
+                    logging.debug(f"❌ {url}: Name resolution timed out")
+                    results[url] = False
+                    metrics.record("tracker_check", url, "down")
+            lookups.clear()
+
+        def send_probe(url: str, addr: tuple[str, int], url_timeout: float) -> bool:
+            """Probe one tracker. Returns False if the limiter has no free slot."""
+            if client._cached_connection_id(addr) is not None:
+                results[url] = True
+                metrics.record("tracker_check", url, "up")
+                return True
+            if addr in probes:  # another URL of this endpoint is already being probed
+                transaction_id, future, sent_at, probe_timeout, probe_urls = probes[addr]
+                probe_urls.append(url)
+                if url_timeout > probe_timeout:
+                    probes[addr] = (transaction_id, future, sent_at, url_timeout, probe_urls)
+                    heapq.heappush(deadlines, (sent_at + url_timeout, addr))
+                return True
+            if limiter is not None and not limiter.try_acquire():
+                return False
+            try:
+                transaction_id, future = _submit_connect(client, addr)
+            except OSError as e:
+                logging.debug(f"❌ {url}: Unexpected error - {e}")
+                results[url] = False
+                metrics.record("tracker_check", url, "down")
+                if limiter is not None:
+                    limiter.release(False)
+                return True
+            sent_at = time.monotonic()
+            probes[addr] = (transaction_id, future, sent_at, url_timeout, [url])
+            heapq.heappush(deadlines, (sent_at + url_timeout, addr))
+            future.add_done_callback(lambda _, addr=addr, tid=transaction_id: on_reply(addr, tid))
+            return True
+
+        def finish_probe(addr: tuple[str, int]):
+            transaction_id, future, sent_at, probe_timeout, probe_urls = probes.pop(addr)
+            client._discard(transaction_id)
+            reply_time = replied_at.pop(transaction_id, None)
+            url = probe_urls[0]
+            status, latency = False, None
+            outcome = None  # reported to the limiter
+            if future.done() and reply_time is not None and reply_time - sent_at <= probe_timeout:
+                try:
+                    client._store_connection_id(addr, _check_action(future.result(), ACTION_CONNECT, url), url)
+                    status, latency = True, reply_time - sent_at
+                    outcome = True
+                    logging.debug(f"✅ {url}: Active")
+                except (TrackerQueryException, OSError) as e:
+                    logging.debug(f"❌ {url}: Invalid response - {e}")
+            else:
+                logging.debug(f"❌ {url}: Request timed out")
+                outcome = False
+            for url in probe_urls:
+                results[url] = status
+                if latency is not None:
+                    latencies[url] = latency
+                metrics.record("tracker_check", url, "up" if status else "down", latency)
+            if limiter is not None:
+                limiter.release(outcome, latency)
+
+        def timed_http(url: str, url_timeout: float) -> tuple[bool, float]:
+            if limiter is not None:
+                limiter.acquire()
+            start = time.monotonic()
+            status = False
+            try:
+                status = Check.http(url, timeout=url_timeout, session_pool=session_pool)
+            finally:
+                elapsed = time.monotonic() - start
+                if limiter is not None:
+                    # A failure that used up the timeout counts as a timeout
+                    limiter.release(True if status else (False if elapsed >= url_timeout * 0.9 else None),
+                                    elapsed)
+            return status, elapsed
+
+        with ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="check") as executor:
+            resolver = Resolver.shared()
+            http_checks: dict[Future, str] = {}
+
+            for url in urls:
+                if url in known:
+                    results[url] = known[url]
+                    skipped.add(url)
+                    continue
+                if health is not None and health.should_skip(url):
+                    results[url] = False
+                    skipped.add(url)
+                    continue
+                url_timeout = timeout if health is None else health.timeout_for(url, timeout)
+
+                if url.startswith("http"):
+                    http_checks[executor.submit(timed_http, url, url_timeout)] = url
+                elif url.startswith("udp"):
+                    addr = _split_udp_url(url)
+                    if addr is None:
+                        logging.debug(f"❌ {url}: Missing host or port")
+                        results[url] = False
+                    else:
+                        lookups.setdefault(resolver.submit(addr[0]), []).append((url, addr[1], url_timeout))
+                else:
+                    logging.debug(f"❌ Unsupported scheme: {url}")
+                    results[url] = False
+
+            # Probes go out as soon as their hostname resolves (and the limiter has room)
+            for future in list(lookups):
+                future.add_done_callback(on_resolved)
 
-        for t in threads:
-            t.join()
+            with cond:
+                while True:
+                    while answered:
+                        addr, transaction_id = answered.popleft()
+                        if addr in probes and probes[addr][0] == transaction_id:
+                            finish_probe(addr)
+                        else:
+                            replied_at.pop(transaction_id, None)  # reply to a probe already finished
+                    now = time.monotonic()
+                    if lookups and now >= resolve_deadline:
+                        give_up_lookups()
+                    while deadlines and deadlines[0][0] <= now:
+                        timeout_at, addr = heapq.heappop(deadlines)
+                        if addr in probes and timeout_at >= probes[addr][2] + probes[addr][3]:
+                            finish_probe(addr)
+                    while ready and send_probe(*ready[0]):
+                        ready.popleft()
 
+                    if not (lookups or ready or probes):
+                        break
+                    wait = deadlines[0][0] - now if deadlines else None
+                    if lookups:
+                        wait = resolve_deadline - now if wait is None else min(wait, resolve_deadline - now)
+                    if ready:  # waiting on the limiter, which other sweeps may release
+                        wait = 0.05 if wait is None else min(wait, 0.05)
+                    cond.wait(wait)
+
+            for future in as_completed(http_checks):
+                url = http_checks[future]
+                results[url], latencies[url] = future.result()
+
+        if health is not None:
+            for url, status in results.items():
+                if status and url in latencies:
+                    health.record_success(url, latencies[url])
+                elif not status and url not in skipped:
+                    health.record_failure(url)
+        if store is not None:
+            store.record_many((url, status, latencies.get(url)) for url, status in results.items()
+                              if url not in skipped)
 
         # Final list of active trackers
         logging.info("\n\n\n🧲 Active Trackers List:")
-        for url, status in results.items():
-            if status:
+        for url in urls:
+            if results[url]:
                 logging.info(url)
         
-        return results
\ No newline at end of file
+        return {url: results[url] for url in urls}
+
+    @staticmethod
+    async def multiple_async(urls: Iterable, max_concurrency: int = 500, timeout: int = 5) -> dict[str, bool]:
+        """
+        Check multiple tracker status concurrently on the running event loop.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results = {}
+
+        async def check(url):
+            async with semaphore:
+                try:
+                    results[url] = await Check.auto_async(url, timeout=timeout)
+                except Exception as e:  # one broken tracker must not abort the sweep
+                    logging.debug(f"❌ {url}: Unexpected error - {e}")
+                    results[url] = False
+
+        await asyncio.gather(*(check(url) for url in urls))
+        return results
@@ -0,0 +1,161 @@
+import threading
+import time
+from typing import Optional
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for tracker sweeps.
+
+    Callers take a slot with acquire() and hand it back with release(),
+    reporting whether the request succeeded. While the recent latency stays
+    close to the long-run latency, the limit grows: by one per success until
+    the first back-off (slow start), then by about one per limit-many
+    successes. When timeouts and socket errors spike
+    above their usual rate, as when a NAT's connection table overflows, the
+    limit is cut multiplicatively, at most once per limit-many completions.
+    Dead trackers time out at a steady rate and do not count as a spike.
+
+    Latency is judged by its gradient (recent EWMA against long-run EWMA),
+    not against the fastest reply ever seen: a sweep mixes trackers whose
+    latencies differ by 10x or more, but queueing from too much concurrency
+    raises all of them at once.
+    """
+    def __init__(self, initial: int = 16, min_limit: int = 1, max_limit: int = 1000,
+                 backoff: float = 0.5, latency_tolerance: float = 2.0,
+                 spike_threshold: float = 0.2,
+                 fast_alpha: float = 0.2, slow_alpha: float = 0.01):
+        """
+        Args:
+            initial: Starting limit.
+            min_limit: Lowest limit a back-off may reach.
+            max_limit: Highest limit growth may reach.
+            backoff: Factor the limit is multiplied by on a failure spike.
+            latency_tolerance: Growth pauses while the recent latency EWMA
+                exceeds this multiple of the long-run latency EWMA.
+            spike_threshold: A spike is a recent failure rate this much above the long-run rate.
+            fast_alpha: EWMA factor of the recent failure rate and latency.
+            slow_alpha: EWMA factor of the long-run failure rate and latency.
+        """
+        assert 1 <= min_limit <= initial <= max_limit, "need 1 <= min_limit <= initial <= max_limit"
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.spike_threshold = spike_threshold
+        self.fast_alpha = fast_alpha
+        self.slow_alpha = slow_alpha
+
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._slow_start = True
+        self._since_backoff = 0
+        self._completed = 0
+        self._successes = 0
+        self._failures = 0
+        self._failure_rate = 0.0        # recent, fast EWMA
+        self._baseline_failure_rate = 0.0  # long-run, slow EWMA
+        self._latency: Optional[float] = None            # recent, fast EWMA
+        self._baseline_latency: Optional[float] = None   # long-run, slow EWMA
+        self._latency_samples = 0
+        self._started = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of slots."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # region - slots
+    def acquire(self, timeout: float|None = None) -> bool:
+        """Wait for a free slot. Returns False if none freed up within timeout."""
+        with self._cond:
+            free = self._cond.wait_for(lambda: self._in_flight < int(self._limit), timeout)
+            return free and self._take()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free, without waiting."""
+        with self._cond:
+            return self._in_flight < int(self._limit) and self._take()
+
+    def _take(self) -> bool:
+        self._in_flight += 1
+        return True
+
+    def release(self, success: bool|None, latency: float|None = None):
+        """
+        Return a slot and report how the request went.
+
+        Args:
+            success: True for a reply, False for a timeout or socket error,
+                None for outcomes that say nothing about congestion (e.g. a
+                tracker's error reply or an unsupported URL).
+            latency: Seconds the successful request took.
+        """
+        with self._cond:
+            self._in_flight = max(self._in_flight - 1, 0)
+            if success is not None:
+                self._record(success, latency)
+            self._cond.notify_all()
+    # endregion
+
+    # region - AIMD
+    def _record(self, success: bool, latency: float|None):
+        """Caller holds self._cond."""
+        self._completed += 1
+        self._since_backoff += 1
+        failed = 0.0 if success else 1.0
+        # Plain averages until an EWMA has seen enough samples, so the long-run
+        # rate does not start out at zero and mistake dead trackers for a spike
+        fast = max(self.fast_alpha, 1 / self._completed)
+        slow = max(self.slow_alpha, 1 / self._completed)
+        self._failure_rate += fast * (failed - self._failure_rate)
+        self._baseline_failure_rate += slow * (failed - self._baseline_failure_rate)
+
+        if success:
+            self._successes += 1
+            if latency is not None:
+                self._latency_samples += 1
+                if self._latency is None or self._baseline_latency is None:
+                    self._latency = self._baseline_latency = latency
+                else:
+                    self._latency += self.fast_alpha * (latency - self._latency)
+                    alpha = max(self.slow_alpha, 1 / self._latency_samples)
+                    self._baseline_latency += alpha * (latency - self._baseline_latency)
+            recent, baseline = self._latency, self._baseline_latency
+            if recent is None or baseline is None or recent <= baseline * self.latency_tolerance:
+                step = 1.0 if self._slow_start else 1.0 / self._limit
+                self._limit = min(self._limit + step, float(self.max_limit))
+            else:
+                self._slow_start = False  # latency is rising: hold the limit
+            return
+
+        self._failures += 1
+        spiking = self._failure_rate > self._baseline_failure_rate + self.spike_threshold
+        if spiking and self._since_backoff >= int(self._limit):
+            self._limit = max(self._limit * self.backoff, float(self.min_limit))
+            self._slow_start = False
+            self._since_backoff = 0
+
+    def stats(self) -> dict:
+        """Snapshot of the limit and the rates it is steered by."""
+        with self._cond:
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "successes": self._successes,
+                "failures": self._failures,
+                "throughput": self._completed / elapsed,  # completions per second
+                "failure_rate": self._failure_rate,
+                "baseline_failure_rate": self._baseline_failure_rate,
+                "latency": self._latency,
+                "baseline_latency": self._baseline_latency,
+                "slow_start": self._slow_start,
+            }
+    # endregion
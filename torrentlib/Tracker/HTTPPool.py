@@ -0,0 +1,150 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional
+from urllib.parse import urlparse
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from ..Resolver import Resolver
+
+
+# region - resolver-backed connections
+class _ResolvingConnectionMixin:
+    """
+    Connect to the address from the shared Resolver cache instead of calling
+    getaddrinfo() per connection. The hostname is restored before TLS, so SNI
+    and certificate checks still use it.
+    """
+    def _new_conn(self):
+        dns_host = self._dns_host  # type: ignore
+        try:
+            self._dns_host = Resolver.shared().resolve(dns_host)
+        except OSError:
+            pass  # let urllib3 resolve and report the error itself
+        try:
+            return super()._new_conn()  # type: ignore
+        finally:
+            self._dns_host = dns_host
+
+
+class _ResolvingHTTPConnection(_ResolvingConnectionMixin, HTTPConnection):
+    pass
+
+
+class _ResolvingHTTPSConnection(_ResolvingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _ResolvingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _ResolvingHTTPConnection
+
+
+class _ResolvingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _ResolvingHTTPSConnection
+
+
+class ResolvingHTTPAdapter(HTTPAdapter):
+    """requests adapter whose connections resolve hosts through Resolver.shared()."""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _ResolvingHTTPConnectionPool,
+            "https": _ResolvingHTTPSConnectionPool,
+        }
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """
+    Drop-in replacement for requests.get() that resolves the host through the
+    shared Resolver cache. Like requests.get(), it uses a throwaway session.
+    """
+    with requests.Session() as session:
+        adapter = ResolvingHTTPAdapter()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session.get(url, **kwargs)
+# endregion
+
+
+class HTTPSessionPool:
+    """
+    Per-host persistent HTTP sessions for tracker requests.
+
+    Each (scheme, host, port) gets its own requests.Session whose adapter keeps
+    up to pool_size keep-alive connections open, so repeated announces to the
+    same HTTPS tracker reuse the TCP connection and skip the TLS handshake.
+    Sessions unused for idle_timeout seconds are closed.
+    """
+    _shared: Optional['HTTPSessionPool'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pool_size: int = 10, idle_timeout: float = 60, max_hosts: int = 1024):
+        """
+        Args:
+            pool_size: Keep-alive connections kept per host.
+            idle_timeout: Seconds after which an unused host session is closed.
+            max_hosts: Most host sessions kept; least recently used are closed first.
+        """
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_hosts = max_hosts
+
+        self._sessions: dict[tuple[str, str, int], tuple[requests.Session, float]] = {}  # {host key: (session, last_used)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'HTTPSessionPool':
+        """Return the process-wide pool, creating it on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def session(self, url: str) -> requests.Session:
+        """Return the persistent session for the URL's host, creating it if needed."""
+        parsed = urlparse(url)
+        key = (parsed.scheme, parsed.hostname or "", parsed.port or (443 if parsed.scheme == "https" else 80))
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict(now)
+            entry = self._sessions.get(key)
+            if entry is None:
+                session = requests.Session()
+                adapter = ResolvingHTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["Connection"] = "keep-alive"
+            else:
+                session = entry[0]
+            self._sessions[key] = (session, now)
+            return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Drop-in replacement for requests.get() using the host's pooled session."""
+        return self.session(url).get(url, **kwargs)
+
+    def close(self):
+        """Close every pooled session."""
+        with self._lock:
+            sessions = [session for session, _ in self._sessions.values()]
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _evict(self, now: float):
+        """Close idle sessions and keep at most max_hosts. Caller holds self._lock."""
+        expired = [key for key, (_, last_used) in self._sessions.items()
+                   if now - last_used > self.idle_timeout]
+        if len(self._sessions) - len(expired) >= self.max_hosts:
+            by_age = sorted((last_used, key) for key, (_, last_used) in self._sessions.items()
+                            if key not in expired)
+            expired += [key for _, key in by_age[:len(by_age) - self.max_hosts + 1]]
+        for key in expired:
+            session, _ = self._sessions.pop(key)
+            session.close()
@@ -0,0 +1,160 @@
+import math
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class _TrackerStats:
+    __slots__ = ("ewma", "samples", "failure_streak", "last_success", "last_failure")
+
+    def __init__(self, window: int):
+        self.ewma: float|None = None
+        self.samples: deque[float] = deque(maxlen=window)
+        self.failure_streak = 0
+        self.last_success: float|None = None  # wall-clock timestamps
+        self.last_failure: float|None = None
+
+
+class TrackerHealth:
+    """
+    Per-tracker latency and failure registry.
+
+    Records an EWMA and a sliding window of response latencies, the current
+    failure streak and the last success/failure time of every tracker URL.
+    Sweeps use it to give each tracker an adaptive timeout (p95 of recent
+    latencies plus a margin) and to skip trackers that keep failing until
+    their cooldown has passed.
+    """
+    _shared: Optional['TrackerHealth'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, alpha: float = 0.2, window: int = 32,
+                 margin: float = 0.5, min_timeout: float = 0.5,
+                 skip_after: int = 3, cooldown: float = 300, max_cooldown: float = 3600):
+        """
+        Args:
+            alpha: EWMA smoothing factor for latency.
+            window: Recent latencies kept for the percentile estimate.
+            margin: Seconds added to the p95 latency to form the timeout.
+            min_timeout: Lower bound of any adaptive timeout.
+            skip_after: Consecutive failures after which a tracker is skipped.
+            cooldown: Seconds a failing tracker is skipped before it is tried again.
+                Doubles with every further failure, up to max_cooldown.
+        """
+        self.alpha = alpha
+        self.window = window
+        self.margin = margin
+        self.min_timeout = min_timeout
+        self.skip_after = skip_after
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self._stats: dict[str, _TrackerStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'TrackerHealth':
+        """Return the process-wide registry, creating it on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._stats
+
+    # region - recording
+    def record_success(self, url: str, latency: float):
+        """Record a response (any reply from the tracker counts) after latency seconds."""
+        with self._lock:
+            stats = self._get(url)
+            stats.ewma = latency if stats.ewma is None else self.alpha * latency + (1 - self.alpha) * stats.ewma
+            stats.samples.append(latency)
+            stats.failure_streak = 0
+            stats.last_success = time.time()
+
+    def record_failure(self, url: str):
+        """Record a timeout or connection failure."""
+        with self._lock:
+            stats = self._get(url)
+            stats.failure_streak += 1
+            stats.last_failure = time.time()
+
+    def restore(self, url: str, latency: float|None = None, failure_streak: int = 0,
+                last_success: float|None = None, last_failure: float|None = None):
+        """
+        Seed a tracker's state, e.g. from a TrackerHealthStore after a restart.
+        The latency becomes the EWMA and a single percentile sample.
+        """
+        with self._lock:
+            stats = self._get(url)
+            stats.ewma = latency
+            stats.samples.clear()
+            if latency is not None:
+                stats.samples.append(latency)
+            stats.failure_streak = failure_streak
+            stats.last_success = last_success
+            stats.last_failure = last_failure
+
+    def _get(self, url: str) -> _TrackerStats:
+        """Caller holds self._lock."""
+        stats = self._stats.get(url)
+        if stats is None:
+            stats = self._stats[url] = _TrackerStats(self.window)
+        return stats
+    # endregion
+
+    # region - decisions
+    def timeout_for(self, url: str, default: float) -> float:
+        """
+        Adaptive timeout: p95 of recent latencies plus margin, within [min_timeout, default].
+        Trackers without samples, or that just failed, get the default.
+        """
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is None or not stats.samples or stats.failure_streak:
+                return default
+            ordered = sorted(stats.samples)
+        p95 = ordered[max(math.ceil(len(ordered) * 0.95) - 1, 0)]  # nearest-rank percentile
+        return min(max(p95 + self.margin, self.min_timeout), default)
+
+    def should_skip(self, url: str) -> bool:
+        """True while a chronically failing tracker is inside its cooldown."""
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is None or stats.failure_streak < self.skip_after or stats.last_failure is None:
+                return False
+            cooldown = min(self.cooldown * 2 ** (stats.failure_streak - self.skip_after), self.max_cooldown)
+            return time.time() - stats.last_failure < cooldown
+
+    def order(self, urls: list[str]) -> list[str]:
+        """
+        Sort URLs best first: responsive trackers by latency, then unknown ones,
+        then failing ones by failure streak.
+        """
+        def rank(url: str):
+            stats = self._stats.get(url)
+            if stats is None or (stats.ewma is None and not stats.failure_streak):
+                return (1, 0.0)
+            if stats.failure_streak:
+                return (2, float(stats.failure_streak))
+            return (0, stats.ewma)
+
+        with self._lock:
+            return sorted(urls, key=rank)
+
+    def stats(self, url: str) -> dict|None:
+        """Snapshot of a tracker's health, or None if it was never recorded."""
+        with self._lock:
+            stats = self._stats.get(url)
+            if stats is None:
+                return None
+            return {
+                "latency": stats.ewma,
+                "failure_streak": stats.failure_streak,
+                "last_success": stats.last_success,
+                "last_failure": stats.last_failure,
+                "samples": len(stats.samples),
+            }
+    # endregion
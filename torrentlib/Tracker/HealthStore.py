@@ -0,0 +1,164 @@
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from .Health import TrackerHealth
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trackers (
+    url TEXT PRIMARY KEY,
+    alive INTEGER NOT NULL,
+    latency REAL,
+    failure_streak INTEGER NOT NULL DEFAULT 0,
+    checked_at REAL NOT NULL,
+    last_success REAL,
+    last_failure REAL
+)
+"""
+
+_UPSERT = """
+INSERT INTO trackers (url, alive, latency, failure_streak, checked_at, last_success, last_failure)
+VALUES (:url, :alive, :latency, :failure_streak, :now, :last_success, :last_failure)
+ON CONFLICT(url) DO UPDATE SET
+    alive = excluded.alive,
+    latency = COALESCE(excluded.latency, trackers.latency),
+    failure_streak = CASE WHEN excluded.alive THEN 0 ELSE trackers.failure_streak + 1 END,
+    checked_at = excluded.checked_at,
+    last_success = COALESCE(excluded.last_success, trackers.last_success),
+    last_failure = COALESCE(excluded.last_failure, trackers.last_failure)
+"""
+
+_SELECT_BATCH = 500  # URLs per IN (...) lookup, well under sqlite's bound-parameter limit
+
+
+class TrackerHealthStore:
+    """
+    On-disk record of tracker checks, kept in a sqlite database.
+
+    Stores the last status, latency, failure streak and check time of every
+    tracker URL. Check.multiple() reuses results younger than ttl instead of
+    re-probing, Query.multi() skips trackers recently found dead, and both
+    order their work by the stored latencies, so a restarted process does not
+    need a full re-validation sweep.
+    """
+    def __init__(self, path: str, ttl: float = 600):
+        """
+        Args:
+            path: sqlite database file (created if missing), or ":memory:".
+            ttl: Seconds a stored result counts as fresh.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        with self._db:
+            self._db.execute(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM trackers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # region - recording
+    def record(self, url: str, alive: bool, latency: float|None = None):
+        """Store the outcome of one check or announce."""
+        self.record_many([(url, alive, latency)])
+
+    def record_many(self, outcomes: Iterable[tuple[str, bool, Optional[float]]]):
+        """Store many (url, alive, latency) outcomes in one transaction."""
+        now = time.time()
+        rows = [{"url": url, "alive": int(alive), "latency": latency if alive else None,
+                 "failure_streak": 0 if alive else 1, "now": now,
+                 "last_success": now if alive else None, "last_failure": None if alive else now}
+                for url, alive, latency in outcomes]
+        with self._lock:
+            with self._db:
+                self._db.executemany(_UPSERT, rows)
+    # endregion
+
+    # region - lookups
+    def _select(self, columns: str, urls: list[str], where: str = "", params: tuple = ()) -> dict[str, tuple]:
+        """
+        {url: (columns...)} of the given URLs that have a row, looked up with
+        one WHERE url IN (...) query per batch. Caller holds self._lock.
+        """
+        rows = {}
+        for i in range(0, len(urls), _SELECT_BATCH):
+            batch = urls[i:i + _SELECT_BATCH]
+            query = (f"SELECT url, {columns} FROM trackers "
+                     f"WHERE url IN ({','.join('?' * len(batch))}){where}")
+            for row in self._db.execute(query, (*batch, *params)):
+                rows[row[0]] = row[1:]
+        return rows
+
+    def get(self, url: str) -> dict|None:
+        """Stored record of a tracker, or None if it was never recorded."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT alive, latency, failure_streak, checked_at, last_success, last_failure "
+                "FROM trackers WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "alive": bool(row[0]),
+            "latency": row[1],
+            "failure_streak": row[2],
+            "checked_at": row[3],
+            "last_success": row[4],
+            "last_failure": row[5],
+        }
+
+    def fresh(self, urls: Iterable[str], now: float|None = None) -> dict[str, bool]:
+        """Last status of every URL checked within ttl, as {url: alive}."""
+        cutoff = (time.time() if now is None else now) - self.ttl
+        urls = list(urls)
+        with self._lock:
+            rows = self._select("alive", urls, " AND checked_at >= ?", (cutoff,))
+        return {url: bool(rows[url][0]) for url in urls if url in rows}
+
+    def order(self, urls: list[str]) -> list[str]:
+        """
+        Sort URLs best first: alive trackers by latency, then unknown ones,
+        then dead ones by failure streak.
+        """
+        with self._lock:
+            records = self._select("alive, latency, failure_streak", list(urls))
+
+        def rank(url: str):
+            record = records.get(url)
+            if record is None:
+                return (1, 0.0)
+            alive, latency, failure_streak = record
+            if alive:
+                return (0, latency or 0.0)
+            return (2, float(failure_streak))
+
+        return sorted(urls, key=rank)
+
+    def load_into(self, health: TrackerHealth) -> int:
+        """
+        Warm-start a TrackerHealth registry from the stored records.
+
+        Returns:
+            Number of trackers loaded.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url, latency, failure_streak, last_success, last_failure FROM trackers").fetchall()
+        for url, latency, failure_streak, last_success, last_failure in rows:
+            health.restore(url, latency, failure_streak, last_success, last_failure)
+        return len(rows)
+    # endregion
@@ -0,0 +1,230 @@
+"""
+Counters and latency histograms for tracker queries and checks.
+
+Query.http/udp and Check.http/udp (and the probes of Check.multiple) report
+to Metrics.shared(). It starts disabled, and while disabled every report
+returns after a single attribute check. Enable it to count announces and
+checks by scheme and outcome (the TrackerQueryException subclass for a
+failed announce), total bytes received, and per-tracker latency histograms.
+"""
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Optional
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size  # per bucket, the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """
+    Registry of labelled counters and fixed-bucket histograms.
+
+    Every series is named by a metric name plus label pairs, e.g.
+    tracker_announces_total{scheme="udp",result="TimeoutError"}.
+    """
+    _shared: Optional['Metrics'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, enabled: bool = False, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Args:
+            enabled: Record from the start.
+            buckets: Upper bounds (seconds) of the histogram buckets, ascending.
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._counters: dict[tuple[str, tuple], float] = {}
+        self._histograms: dict[tuple[str, tuple], _Histogram] = {}
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'Metrics':
+        """Return the process-wide registry (disabled until enable() is called)."""
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop every series and restart the uptime clock."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started = time.monotonic()
+
+    # region - recording
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """Add value to a counter."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str):
+        """Add a sample to a histogram."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(len(self.buckets) + 1)
+            histogram.counts[bisect_left(self.buckets, value)] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    def record(self, op: str, url: str, result: str, latency: float|None = None):
+        """
+        Count one tracker operation and its latency.
+
+        Args:
+            op: Operation prefix, e.g. 'tracker_announce' or 'tracker_check'.
+            url: Tracker URL; its scheme labels the counter and the URL itself
+                labels the latency histogram.
+            result: 'ok', 'up', 'down' or the name of the exception raised.
+            latency: Seconds the operation took, if it got a reply.
+        """
+        if not self.enabled:
+            return
+        self.inc(f"{op}s_total", scheme=url.split(":", 1)[0], result=result)
+        if latency is not None:
+            self.observe(f"{op}_duration_seconds", latency, tracker=url)
+    # endregion
+
+    # region - export
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Copy of every series.
+
+        Returns:
+            {'uptime': seconds since creation or reset(),
+             'counters': {name: [{'labels': {...}, 'value': v}]},
+             'histograms': {name: [{'labels': {...}, 'buckets': {le: cumulative count},
+                                    'sum': s, 'count': n}]}}
+        """
+        with self._lock:
+            counters = list(self._counters.items())
+            histograms = [(key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()]
+            uptime = time.monotonic() - self._started
+
+        snapshot: dict[str, Any] = {"uptime": uptime, "counters": {}, "histograms": {}}
+        for (name, labels), value in sorted(counters):
+            snapshot["counters"].setdefault(name, []).append({"labels": dict(labels), "value": value})
+        for (name, labels), counts, total, count in sorted(histograms, key=lambda h: h[0]):
+            cumulative, buckets = 0, {}
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                buckets[bound] = cumulative
+            snapshot["histograms"].setdefault(name, []).append(
+                {"labels": dict(labels), "buckets": buckets, "sum": total, "count": count})
+        return snapshot
+
+    def prometheus(self) -> str:
+        """Every series in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, series in snapshot["counters"].items():
+            lines.append(f"# TYPE {name} counter")
+            for s in series:
+                lines.append(f"{name}{_format_labels(s['labels'])} {_format_value(s['value'])}")
+        for name, series in snapshot["histograms"].items():
+            lines.append(f"# TYPE {name} histogram")
+            for s in series:
+                for bound, count in s["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(s['labels'] | {'le': le})} {count}")
+                lines.append(f"{name}_sum{_format_labels(s['labels'])} {_format_value(s['sum'])}")
+                lines.append(f"{name}_count{_format_labels(s['labels'])} {s['count']}")
+        return "\n".join(lines) + "\n"
+    # endregion
+
+
+def metered(op: str, url_index: int = 0) -> Callable:
+    """
+    Decorate a tracker operation so each call is reported to Metrics.shared().
+
+    A call that returns a bool counts as 'up' or 'down', any other return
+    value as 'ok', and a raised exception by its class name. Latency is only
+    recorded for calls that got a reply ('ok' or 'up').
+
+    Args:
+        op: Operation prefix passed to Metrics.record().
+        url_index: Position of the url argument when it is passed positionally.
+    """
+    def result_of(value: Any) -> str:
+        if value is True:
+            return "up"
+        if value is False:
+            return "down"
+        return "ok"
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                metrics = Metrics.shared()
+                if not metrics.enabled:
+                    return await fn(*args, **kwargs)
+                url = kwargs["url"] if "url" in kwargs else args[url_index]
+                start = time.monotonic()
+                try:
+                    value = await fn(*args, **kwargs)
+                except BaseException as e:
+                    metrics.record(op, url, type(e).__name__)
+                    raise
+                result = result_of(value)
+                metrics.record(op, url, result, time.monotonic() - start if result != "down" else None)
+                return value
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            metrics = Metrics.shared()
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            url = kwargs["url"] if "url" in kwargs else args[url_index]
+            start = time.monotonic()
+            try:
+                value = fn(*args, **kwargs)
+            except BaseException as e:
+                metrics.record(op, url, type(e).__name__)
+                raise
+            result = result_of(value)
+            metrics.record(op, url, result, time.monotonic() - start if result != "down" else None)
+            return value
+        return wrapper
+    return decorator
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
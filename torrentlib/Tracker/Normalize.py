@@ -0,0 +1,73 @@
+"""
+Tracker URL normalization and de-duplication.
+
+Public tracker lists often name one tracker several ways: with and without
+a trailing slash, upper-case hosts, explicit default ports, or both http://
+and https://. These helpers collapse such spellings so each tracker is
+contacted once.
+"""
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+_FAMILIES = {"http": "http", "https": "http", "udp": "udp"}
+
+
+def normalize_url(url: str) -> str|None:
+    """
+    Canonical spelling of a tracker URL: lower-case scheme and host, no
+    default port, no trailing slash and no fragment.
+
+    Returns:
+        The normalized URL, or None if it has no host or an invalid port.
+    """
+    try:
+        parts = urlsplit(url.strip())
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return None
+    if not host:
+        return None
+
+    scheme = parts.scheme.lower()
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), parts.query, ""))
+
+
+def url_key(url: str) -> tuple|None:
+    """
+    Identity of the tracker behind a URL. http and https URLs of the same host
+    and path share a key unless one of them names a non-default port.
+
+    Returns:
+        (family, host, port, path, query) with port None for a default port,
+        or None for an invalid URL.
+    """
+    normalized = normalize_url(url)
+    if normalized is None:
+        return None
+    parts = urlsplit(normalized)
+    family = _FAMILIES.get(parts.scheme, parts.scheme)
+    return family, parts.hostname, parts.port, parts.path, parts.query
+
+
+def group_urls(urls: list[str]) -> dict[str, list[str]]:
+    """
+    Collapse equivalent tracker URLs.
+
+    Returns:
+        {representative: [original urls]} in input order. The representative
+        is the first spelling seen; invalid URLs stand alone.
+    """
+    groups: dict[str, list[str]] = {}
+    representatives: dict[tuple, str] = {}
+    for url in urls:
+        key = url_key(url)
+        if key is None:
+            groups.setdefault(url, []).append(url)
+            continue
+        representative = representatives.setdefault(key, url)
+        groups.setdefault(representative, []).append(url)
+    return groups
@@ -1,13 +1,21 @@
+import asyncio
 import requests
 import struct
-import random
 import socket
+import time
 import bencodepy as bec
 import builtins
-from typing import Dict, Any
-from urllib.parse import urlparse
+from typing import Dict, Any, Callable, Iterator
+from urllib.parse import urlparse, urlencode
 
 from ..Torrent import Torrent, TorrentStatus
+from ..PeerTable import PeerTable
+from ..Compact import (
+    decode_peers,
+    decode_peers6,
+    decode_peers_packed,
+    decode_peers6_packed
+)
 from .TrackerQueryException import (
     TrackerQueryException,
     TimeoutError,
@@ -15,52 +23,90 @@ from .TrackerQueryException import (
     InvalidResponseError,
     UnexpectedError
 )
+from .UDPClient import UDPTrackerClient
+from .HTTPPool import HTTPSessionPool, get as resolving_get
+from .Health import TrackerHealth
+from .Concurrency import AdaptiveLimiter
+from .RateLimit import RateLimiter
+from .Metrics import Metrics, metered
+from .Normalize import url_key, group_urls
+from .SingleFlight import SingleFlight
+from .Response import decode_announce
+from .HealthStore import TrackerHealthStore
+from . import AsyncHTTP
+
+DEFAULT_TIMEOUT = 5  # seconds, matches the http()/udp() defaults
+MAX_SCRAPE_URL_LENGTH = 2048  # conservative limit most HTTP servers accept
+MAX_SCRAPE_RETRIES = 4  # times a scrape shrinks its chunk size for a tracker that caps hashes
+STORE_BATCH = 100  # announce outcomes multi_iter writes to a TrackerHealthStore per transaction
+
+_announces = SingleFlight()  # HTTP announces in flight, by (tracker, params)
+_unlimited = RateLimiter()  # for announces whose token was already taken
 
 # example_hash = '8a19577fb5f690970ca43a57ff1011ae202244b8'
 # example_peer_id = '-robots-testing12345'
 
 
-def _get_peer_from_bytes(response: bytes) -> list[tuple]:
+def _get_peer_from_bytes(response: bytes, compact: bool = False) -> list[tuple]|tuple:
     """
-    Extracts peer information from the UDP response.
+    Extracts peer information from a compact IPv4 peer list.
+    With compact, returns (ips, ports) integer arrays instead of (ip, port) tuples.
     """
-    result = []
-    offset = 0
-    
-    while offset + 6 <= len(response):
-        peer_bytes = response[offset:offset + 6]
-        ip_packed, port = struct.unpack("!4sH", peer_bytes)
-        ip = socket.inet_ntoa(ip_packed)
-        result.append((ip, port))
-        offset += 6
-    
-    return result
+    return decode_peers_packed(response) if compact else decode_peers(response)
 
-def _get_peer6_from_bytes(response: bytes) -> list[tuple]:
+def _get_peer6_from_bytes(response: bytes, compact: bool = False) -> list[tuple]|tuple:
     """
-    Extracts peer information from the UDP response for IPv6.
+    Extracts peer information from a compact IPv6 peer list.
+    With compact, returns (ips_high, ips_low, ports) integer arrays.
     """
-    result = []
-    offset = 0
-    
-    while offset + 18 <= len(response):
-        peer_bytes = response[offset:offset + 18]
-        ip_packed, port = struct.unpack("!16sH", peer_bytes)
-        ip = socket.inet_ntop(socket.AF_INET6, ip_packed)
-        result.append((ip, port))
-        offset += 18
-    
-    return result
+    return decode_peers6_packed(response) if compact else decode_peers6(response)
+
+
+def _compact_dict_peers(peers: list) -> tuple[bytes, bytes]:
+    """
+    Re-encode a non-compact (dictionary model) peer list as compact IPv4 and
+    IPv6 peer strings. Entries without a numeric address and a valid port,
+    such as DNS names, are dropped.
+    """
+    peers4, peers6 = bytearray(), bytearray()
+    for peer in peers:
+        if not isinstance(peer, dict):
+            continue
+        ip, port = peer.get(b"ip"), peer.get(b"port")
+        if not isinstance(ip, bytes) or not isinstance(port, int) or not 0 <= port <= 0xFFFF:
+            continue
+        try:
+            host = ip.decode()
+        except UnicodeDecodeError:
+            continue
+        for family, out in ((socket.AF_INET, peers4), (socket.AF_INET6, peers6)):
+            try:
+                out += socket.inet_pton(family, host) + port.to_bytes(2, "big")
+                break
+            except OSError:
+                pass
+    return bytes(peers4), bytes(peers6)
 
 
-def _parse_http_tracker_response(response_bdecode: dict[bytes, Any]) -> Dict[str, Any]:
+def _parse_http_tracker_response(response_bdecode: dict[bytes, Any], compact: bool = False,
+                                 url: str|None = None) -> Dict[str, Any]:
     """
     Parse bencode response and decode all byte strings.
+    Non-compact peer lists are decoded like compact ones, IPv6 entries
+    going to peers6.
     """
     response = response_bdecode.copy()  # Don't mutate input
-    response[b"peers"] = _get_peer_from_bytes(response[b"peers"])
+    if isinstance(response.get(b"peers"), list):
+        response[b"peers"], peers6 = _compact_dict_peers(response[b"peers"])
+        if peers6 and isinstance(response.get(b"peers6", b""), bytes):
+            response[b"peers6"] = response.get(b"peers6", b"") + peers6
+    for key in (b"peers", b"peers6"):
+        if key in response and not isinstance(response[key], bytes):
+            raise InvalidResponseError(url=url, message=f"Invalid {key.decode()} in announce response")
+    if b"peers" in response:
+        response[b"peers"] = _get_peer_from_bytes(response[b"peers"], compact)
     if b"peers6" in response:
-        response[b"peers6"] = _get_peer6_from_bytes(response[b"peers6"])
+        response[b"peers6"] = _get_peer6_from_bytes(response[b"peers6"], compact)
 
     response_decoded = {}
     for k, v in response.items():
@@ -78,41 +124,111 @@ def _parse_http_tracker_response(response_bdecode: dict[bytes, Any]) -> Dict[str
     return response_decoded
 
 
-def _validate_udp_connect_response(response: bytes, transaction_id: int, url: str) -> int:
-    """
-    Validate UDP connect response and return connection ID.
-    """
-    action, resp_transaction_id, connection_id = struct.unpack("!iiq", response[:16])
-    if action != 0 or resp_transaction_id != transaction_id:
-        raise InvalidResponseError(url=url)
-    return connection_id
-
-
-def _parse_udp_announce_response(response: bytes, expected_transaction_id: int) -> Dict[str, Any]:
+def _parse_udp_announce_response(response: bytes, url: str|None = None, compact: bool = False) -> Dict[str, Any]:
     """
-    Parse UDP announce response.
+    Parse UDP announce response. Action and transaction ID are already
+    checked by the UDPTrackerClient that received it.
     """
+    if len(response) < 20:
+        raise InvalidResponseError(url=url, message="Announce response too short")
     header = response[:20]
     peer_bytes = response[20:]
     
-    action, transaction_id, interval, leechers, seeders = struct.unpack("!iiiii", header)
-    if action != 1:
-        raise InvalidResponseError(
-            message=f"Invalid action: expected 1 (announce), got {action}"
-        )
-    if transaction_id != expected_transaction_id:
-        raise InvalidResponseError(
-            message=f"Transaction ID mismatch: expected {expected_transaction_id}, got {transaction_id}"
-        )
+    interval, leechers, seeders = struct.unpack("!iii", header[8:])
     
     return {
         "interval": interval,
         "leechers": leechers,
         "seeders": seeders,
-        "peers": _get_peer_from_bytes(peer_bytes)  # no ipv6 peer in udp
+        "peers": _get_peer_from_bytes(peer_bytes, compact)  # no ipv6 peer in udp
     }
 
 
+def _parse_udp_scrape_response(responses: list[bytes], info_hashes: list[str], url: str|None = None) -> Dict[str, Dict[str, int]]:
+    """
+    Parse UDP scrape replies into {info_hash: {seeders, completed, leechers}}.
+    Each reply holds 12 bytes per info hash, in the order they were sent.
+    """
+    result = {}
+    hashes = iter(info_hashes)
+    for response in responses:
+        body = response[8:]
+        for offset in range(0, len(body) - 11, 12):
+            info_hash = next(hashes, None)
+            if info_hash is None:
+                raise InvalidResponseError(url=url, message="Scrape response has too many entries")
+            seeders, completed, leechers = struct.unpack_from("!iii", body, offset)
+            result[info_hash] = {
+                "seeders": seeders,
+                "completed": completed,
+                "leechers": leechers,
+            }
+
+    if len(result) != len(info_hashes):
+        raise InvalidResponseError(url=url, message="Scrape response is missing entries")
+    return result
+
+
+def _announce_to_scrape_url(url: str) -> str|None:
+    """
+    Derive a tracker's scrape URL from its announce URL (BEP 48).
+
+    Returns None when the last path component does not start with 'announce',
+    which by convention means the tracker does not support scrape.
+    """
+    parsed = urlparse(url)
+    head, _, last = parsed.path.rpartition("/")
+    if not last.startswith("announce"):
+        return None
+    return parsed._replace(path=f"{head}/scrape{last[len('announce'):]}").geturl()
+
+
+def _parse_http_scrape_response(response_bdecode: dict[bytes, Any], url: str|None = None) -> Dict[str, Dict[str, int]]:
+    """
+    Parse a bencoded HTTP scrape reply into {info_hash: {seeders, completed, leechers}}.
+    """
+    if b"failure reason" in response_bdecode:
+        reason = response_bdecode[b"failure reason"]
+        reason = reason.decode(errors="replace") if isinstance(reason, bytes) else str(reason)
+        raise InvalidResponseError(url=url, message=f"Tracker failure: {reason}")
+
+    files = response_bdecode.get(b"files")
+    if not isinstance(files, dict):
+        raise InvalidResponseError(url=url, message="Scrape response has no 'files' dict")
+
+    result = {}
+    for info_hash, stats in files.items():
+        if len(info_hash) != 20 or not isinstance(stats, dict):
+            continue
+        result[info_hash.hex()] = {
+            "seeders": stats.get(b"complete", 0),
+            "completed": stats.get(b"downloaded", 0),
+            "leechers": stats.get(b"incomplete", 0),
+        }
+    return result
+
+
+def _chunk_scrape_hashes(scrape_url: str, hash_bytes: list[bytes], max_hashes: int) -> list[list[bytes]]:
+    """
+    Split info hashes so each scrape GET stays within MAX_SCRAPE_URL_LENGTH
+    and holds at most max_hashes.
+    """
+    chunks: list[list[bytes]] = []
+    current: list[bytes] = []
+    length = len(scrape_url) + 1  # '?' or '&'
+    for h in hash_bytes:
+        param_length = len(urlencode({"info_hash": h})) + 1
+        if current and (length + param_length > MAX_SCRAPE_URL_LENGTH or len(current) >= max_hashes):
+            chunks.append(current)
+            current = []
+            length = len(scrape_url) + 1
+        current.append(h)
+        length += param_length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 def _format_result(result: Dict[str, Any]) -> Dict[str, Any]:
     """
     Standardize tracker response format.
@@ -138,155 +254,241 @@ def _format_result(result: Dict[str, Any]) -> Dict[str, Any]:
     return formatted
 
 
+def _default_headers(keep_alive: bool = False) -> dict:
+    return {
+        "User-Agent": "qBittorrent/4.5.2",
+        "Accept": "*/*",
+        "Connection": "keep-alive" if keep_alive else "close"
+    }
+
+
+def _build_http_request(torrent: Torrent, peer_id: str,
+                        ip_addr: str|None, num_want: int|None, key: int,
+                        port: int, headers: dict|None, keep_alive: bool = False,
+                        event: TorrentStatus|None = None) -> tuple[dict, dict]:
+    """
+    Build (params, headers) of an HTTP announce. event overrides torrent.event.
+    """
+    event = event or torrent.event
+    info_hash_bytes = bytes.fromhex(torrent.info_hash)
+
+    headers = headers or _default_headers(keep_alive)
+
+    params = {
+        'info_hash': info_hash_bytes,
+        'peer_id': peer_id,
+        'port': str(port),
+        'left': str(torrent.left),
+        'downloaded': str(torrent.downloaded),
+        'uploaded': str(torrent.uploaded),
+    }
+    if event != TorrentStatus.NONE:
+        params['event'] = event.name.lower()  # Convert TorrentStatus to string
+
+    if ip_addr: params['ip'] = ip_addr
+    if num_want: params['numwant'] = str(num_want)
+    if key: params['key'] = str(key)
+
+    return params, headers
+
+
+def _merge_peers(table: PeerTable, peers, compact: bool):
+    """
+    Add decoded tracker peers to a torrent's peer table, tuples or packed arrays.
+    """
+    if compact:
+        table.merge_packed(peers)
+    else:
+        table.merge(peers)
+
+def _handle_http_response(torrent: Torrent, url: str, status_code: int, content: bytes,
+                          compact: bool = False) -> Dict[str, Any]:
+    """
+    Turn an HTTP announce reply into a formatted result and update torrent peers.
+    Flat replies take the single-pass decoder, anything else bencodepy.
+    """
+    status_code = status_code // 100 * 100  # Get the first digit of the status code
+    if status_code == 200:
+        response_decode = decode_announce(content, compact)
+        if response_decode is None:
+            response_decode = _parse_http_tracker_response(dict(bec.decode(content)), compact, url)
+        
+        # Update torrent with peers
+        if "peers" in response_decode:
+            _merge_peers(torrent.peers, response_decode["peers"], compact)
+        if "peers6" in response_decode:
+            _merge_peers(torrent.peers6, response_decode["peers6"], compact)
+            
+        return _format_result(response_decode)
+    elif status_code == 300:
+        raise UnexpectedError(url=url, message="Redirection not supported")
+    elif status_code == 400:
+        raise BadRequestError(url=url)
+    else:
+        raise InvalidResponseError(url=url)
+
+
+def _build_udp_request(torrent: Torrent, url: str, peer_id: str,
+                       ip_addr: str, num_want: int, key: int, port: int,
+                       event: TorrentStatus|None = None) -> tuple[str, int, bytes]:
+    """
+    Build (hostname, port, body) of a UDP announce. The body starts after the
+    connection ID, action and transaction ID, which UDPTrackerClient fills in.
+    event overrides torrent.event.
+    """
+    event = event or torrent.event
+    parsed = urlparse(url)
+    HOSTNAME = parsed.hostname
+    PORT = parsed.port
+    if HOSTNAME is None or PORT is None:
+        raise BadRequestError(url=url, message="Missing host or port")
+
+    ip_bytes = socket.inet_aton(ip_addr)
+
+    body = struct.pack(
+        "!20s20sqqqi4siiH",
+        bytes.fromhex(torrent.info_hash),
+        peer_id.encode("utf-8")[:20].ljust(20, b"-"),
+        torrent.downloaded,
+        torrent.left,
+        torrent.uploaded,
+        event.value, 
+        ip_bytes,
+        key,
+        num_want,
+        port or 6881
+    )
+    return HOSTNAME, PORT, body
+
+
+def _handle_udp_response(torrent: Torrent, url: str, response: bytes, compact: bool = False) -> Dict[str, Any]:
+    """
+    Turn a UDP announce reply into a formatted result and update torrent peers.
+    """
+    parsed_response = _parse_udp_announce_response(response, url, compact)
+    
+    if "peers" in parsed_response:
+        _merge_peers(torrent.peers, parsed_response["peers"], compact)
+        
+    return _format_result(parsed_response)
+
+
 class Query:
     @staticmethod
+    @metered("tracker_announce", url_index=1)
     def http(torrent: Torrent,
             url: str,
             peer_id: str,
             ip_addr: str|None = None,
             num_want: int|None = None, key: int = 0,
             port: int = 6881, headers: dict|None = None,
-            timeout: int = 5) -> Dict[str, Any]:
+            timeout: int = 5,
+            session_pool: HTTPSessionPool|None = None,
+            event: TorrentStatus|None = None,
+            compact: bool = False) -> Dict[str, Any]:
         """
         Query HTTP/HTTPS tracker.
-        """
-        # Build request parameters
-        info_hash_bytes = bytes.fromhex(torrent.info_hash)
-
-        headers = headers or {
-            "User-Agent": "qBittorrent/4.5.2",
-            "Accept": "*/*",
-            "Connection": "close"
-        }
 
-        params = {
-            'info_hash': info_hash_bytes,
-            'peer_id': peer_id,
-            'port': str(port),
-            'left': str(torrent.left),
-            'downloaded': str(torrent.downloaded),
-            'uploaded': str(torrent.uploaded),
-            'event': torrent.event.name.lower(),  # Convert TorrentStatus to string
-        }
+        Pass a session_pool (e.g. HTTPSessionPool.shared()) to reuse keep-alive
+        connections across announces instead of opening one per request.
+        With compact, 'peers' is an (ips, ports) pair of integer arrays and
+        'peers6' an (ips_high, ips_low, ports) triple, see torrentlib.Compact.
+        Identical announces to the same tracker already in flight are shared.
+        """
+        params, headers = _build_http_request(torrent, peer_id, ip_addr, num_want, key, port, headers,
+                                              keep_alive=session_pool is not None, event=event)
+        http_get = session_pool.get if session_pool is not None else resolving_get
 
-        if ip_addr: params['ip'] = ip_addr
-        if num_want: params['numwant'] = str(num_want)
-        if key: params['key'] = str(key)
+        def fetch() -> tuple[int, bytes]:
+            response = http_get(url,
+                                headers=headers,
+                                params=params,
+                                allow_redirects=True,
+                                timeout=timeout)
+            return response.status_code, response.content
 
         # Make request
         try:
-            response = requests.get(url,
-                                    headers=headers,
-                                    params=params,
-                                    allow_redirects=True,
-                                    timeout=timeout)
-            
-            status_code = response.status_code // 100 * 100  # Get the first digit of the status code
-            if status_code == 200:
-                response_bdecode = dict(bec.decode(response.content))
-                response_decode = _parse_http_tracker_response(response_bdecode)
-                
-                # Update torrent with peers
-                if "peers" in response_decode:
-                    torrent.peers |= {i: {} for i in response_decode["peers"]}
-                if "peers6" in response_decode:
-                    torrent.peers6 |= {i: {} for i in response_decode["peers6"]}
-                    
-                return _format_result(response_decode)
-            elif status_code == 300:
-                raise UnexpectedError(url=url, message="Redirection not supported")
-            elif status_code == 400:
-                raise BadRequestError(url=url)
-            else:
-                raise InvalidResponseError(url=url)
+            status_code, content = _announces.do((url_key(url) or url, tuple(params.items())), fetch)
+            Metrics.shared().inc("tracker_received_bytes_total", len(content), scheme=url.split(":", 1)[0])
+            return _handle_http_response(torrent, url, status_code, content, compact)
         except (requests.exceptions.Timeout, builtins.TimeoutError) as e:
             # Catch both requests timeout and built-in socket timeout
             raise TimeoutError(url=url) from e
         except requests.exceptions.RequestException as e:
             raise UnexpectedError(url=url, e=e)
 
+    @staticmethod
+    @metered("tracker_announce", url_index=1)
+    async def http_async(torrent: Torrent,
+            url: str,
+            peer_id: str,
+            ip_addr: str|None = None,
+            num_want: int|None = None, key: int = 0,
+            port: int = 6881, headers: dict|None = None,
+            timeout: int = 5,
+            event: TorrentStatus|None = None,
+            compact: bool = False) -> Dict[str, Any]:
+        """
+        Query HTTP/HTTPS tracker on the running event loop.
+        """
+        params, headers = _build_http_request(torrent, peer_id, ip_addr, num_want, key, port, headers,
+                                              event=event)
+
+        try:
+            response = await asyncio.wait_for(
+                AsyncHTTP.get(url, params=params, headers=headers, allow_redirects=True),
+                timeout)
+        except asyncio.TimeoutError as e:
+            raise TimeoutError(url=url) from e
+        except (OSError, ValueError) as e:
+            raise UnexpectedError(url=url, e=e)
+        Metrics.shared().inc("tracker_received_bytes_total", len(response.content), scheme=url.split(":", 1)[0])
+        return _handle_http_response(torrent, url, response.status_code, response.content, compact)
 
     @staticmethod
+    @metered("tracker_announce", url_index=1)
     def udp(torrent: Torrent,
             url: str,
             peer_id: str,
             ip_addr: str = "0.0.0.0",
             num_want: int = 50, key: int = 0,
             port: int = 6881,
-            timeout: int = 5) -> Dict[str, Any]:
+            timeout: int = 5,
+            event: TorrentStatus|None = None,
+            compact: bool = False) -> Dict[str, Any]:
         """
         Query UDP tracker.
         """
-        # region - define constants and params
-        parsed = urlparse(url)
-        HOSTNAME = parsed.hostname
-        PORT = parsed.port
-
-        PROTOCOL_ID = 0x41727101980    # 8-byte magic number
-        TRANSACTION_ID = random.randint(0, 0xFFFF)  # Random 4-byte integer
-        
-        
-        ip_bytes = socket.inet_aton(ip_addr)
-        # endregion
-
-        # Create packet: ! means network byte order (big-endian)
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.settimeout(timeout)
-
-        try:
-            # region - initialize connection
-            packet = struct.pack("!qii", PROTOCOL_ID, 0, TRANSACTION_ID)  # ACTION: connect
-            s.sendto(packet, (HOSTNAME, PORT))
-            response, addr = s.recvfrom(1024)
-            CONNECTION_ID = _validate_udp_connect_response(response, TRANSACTION_ID, url)
-            # endregion
-
-            # region - announce query
-            packet = struct.pack(
-                "!qii20s20sqqqi4siiH",
-                CONNECTION_ID,
-                1,  # ACTION: announce
-                TRANSACTION_ID,
-                bytes.fromhex(torrent.info_hash),
-                peer_id.encode("utf-8")[:20].ljust(20, b"-"),
-                torrent.downloaded,
-                torrent.left,
-                torrent.uploaded,
-                torrent.event.value, 
-                ip_bytes,
-                key,
-                num_want,
-                port or 6881
-            )
-            s.sendto(packet, (HOSTNAME, PORT))
-            response, addr = s.recvfrom(1024)
-            # endregion
-            
-        except socket.timeout:
-            raise TimeoutError(url=url)
-        except socket.error as e:
-            raise UnexpectedError(url=url, e=e)
-        finally:
-            s.close()
-        
-        # Parse response and update torrent
-        parsed_response = _parse_udp_announce_response(response, TRANSACTION_ID)
-        
-        if "peers" in parsed_response:
-            torrent.peers |= {i: {} for i in parsed_response["peers"]}
-            
-        return _format_result(parsed_response)
+        HOSTNAME, PORT, body = _build_udp_request(torrent, url, peer_id, ip_addr, num_want, key, port, event)
+        response = UDPTrackerClient.shared().announce(HOSTNAME, PORT, body, timeout=timeout, url=url)
+        Metrics.shared().inc("tracker_received_bytes_total", len(response), scheme="udp")
+        return _handle_udp_response(torrent, url, response, compact)
 
     @staticmethod
-    def single(torrent: Torrent,
-                url: str,
-                peer_id: str,  
-                ip_addr: str|None = None,
-                num_want = None, key = None,
-                port: int|None = None, headers = None,
-                timeout: int|None = None) -> Dict[str, Any]:
+    @metered("tracker_announce", url_index=1)
+    async def udp_async(torrent: Torrent,
+            url: str,
+            peer_id: str,
+            ip_addr: str = "0.0.0.0",
+            num_want: int = 50, key: int = 0,
+            port: int = 6881,
+            timeout: int = 5,
+            event: TorrentStatus|None = None,
+            compact: bool = False) -> Dict[str, Any]:
+        """
+        Query UDP tracker on the running event loop.
+        """
+        HOSTNAME, PORT, body = _build_udp_request(torrent, url, peer_id, ip_addr, num_want, key, port, event)
+        response = await UDPTrackerClient.shared().announce_async(HOSTNAME, PORT, body, timeout=timeout, url=url)
+        Metrics.shared().inc("tracker_received_bytes_total", len(response), scheme="udp")
+        return _handle_udp_response(torrent, url, response, compact)
 
-        # region - arguement preparing
+    @staticmethod
+    def _single_args(torrent: Torrent, url: str, peer_id: str,
+                     ip_addr, num_want, key, port, headers, timeout,
+                     session_pool=None, event=None, compact=False) -> Dict[str, Any]:
+        """Collect the arguments given to single(), leaving defaults to http()/udp()."""
         args: Dict[str, Any] = {
             "torrent": torrent,
             "url": url,
@@ -298,15 +500,72 @@ class Query:
         if key is not None: args["key"] = key
         if port is not None: args["port"] = port
         if timeout is not None: args["timeout"] = timeout
-        # endregion
+        if event is not None: args["event"] = event
+        if compact: args["compact"] = True
+        if headers is not None and url.startswith("http"): args["headers"] = headers
+        if session_pool is not None and url.startswith("http"): args["session_pool"] = session_pool
+        return args
+
+    @staticmethod
+    def single(torrent: Torrent,
+                url: str,
+                peer_id: str,  
+                ip_addr: str|None = None,
+                num_want = None, key = None,
+                port: int|None = None, headers = None,
+                timeout: int|None = None,
+                session_pool: HTTPSessionPool|None = None,
+                event: TorrentStatus|None = None,
+                compact: bool = False,
+                rate_limiter: RateLimiter|None = None) -> Dict[str, Any]:
+        """
+        Query a tracker, choosing the protocol from the URL scheme.
+        event overrides torrent.event for this announce only; compact returns
+        peers as integer arrays (see http()).
+
+        The announce waits for a token from rate_limiter, by default
+        RateLimiter.shared() (unlimited until a rate is set), so bursts to
+        one tracker host are spread out across threads and torrents.
+        """
+        args = Query._single_args(torrent, url, peer_id, ip_addr, num_want, key, port, headers, timeout,
+                                  session_pool, event, compact)
+        rate_limiter = rate_limiter or RateLimiter.shared()
             
         if url.startswith("http"):
-            if headers is not None: args["headers"] = headers
+            rate_limiter.acquire(url)
             return Query.http(**args)
         elif url.startswith("udp"):
+            rate_limiter.acquire(url)
             return Query.udp(**args)
         else:
             raise TrackerQueryException(message="Unsupported URL scheme", url=url)
+
+    @staticmethod
+    async def single_async(torrent: Torrent,
+                url: str,
+                peer_id: str,  
+                ip_addr: str|None = None,
+                num_want = None, key = None,
+                port: int|None = None, headers = None,
+                timeout: int|None = None,
+                event: TorrentStatus|None = None,
+                compact: bool = False,
+                rate_limiter: RateLimiter|None = None) -> Dict[str, Any]:
+        """
+        Asyncio counterpart of single(), returning the same result dict.
+        """
+        args = Query._single_args(torrent, url, peer_id, ip_addr, num_want, key, port, headers, timeout,
+                                  event=event, compact=compact)
+        rate_limiter = rate_limiter or RateLimiter.shared()
+
+        if url.startswith("http"):
+            await rate_limiter.acquire_async(url)
+            return await Query.http_async(**args)
+        elif url.startswith("udp"):
+            await rate_limiter.acquire_async(url)
+            return await Query.udp_async(**args)
+        else:
+            raise TrackerQueryException(message="Unsupported URL scheme", url=url)
     
     @staticmethod
     def multi(torrent: Torrent,
@@ -315,32 +574,367 @@ class Query:
                 ip_addr: str|None = None,
                 num_want = None, key = None,
                 port: int|None = None, headers = None,
-                timeout: int|None = None, max_threads: int = 50) -> Dict[str, Dict[str, Any]]:
+                timeout: int|None = None, max_threads: int = 50,
+                session_pool: HTTPSessionPool|None = None,
+                health: TrackerHealth|None = None,
+                store: TrackerHealthStore|None = None,
+                dedupe: bool = True,
+                limiter: AdaptiveLimiter|None = None,
+                rate_limiter: RateLimiter|None = None,
+                on_result: Callable[[str, Dict[str, Any]], None]|None = None,
+                stop_when: Callable[[str, Dict[str, Any]], bool]|None = None,
+                first_k: int|None = None,
+                deadline: float|None = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Query many trackers concurrently and return {url: result}.
+
+        on_result(url, result) is called as each tracker answers. stop_when,
+        first_k and deadline end the call early, as in multi_iter(); trackers
+        that had not answered by then are left out of the returned dict.
+        """
+        result = {}
+        for url, response in Query.multi_iter(torrent, urls, peer_id,
+                                              ip_addr=ip_addr, num_want=num_want, key=key, port=port,
+                                              headers=headers, timeout=timeout, max_threads=max_threads,
+                                              session_pool=session_pool, health=health, store=store,
+                                              dedupe=dedupe, limiter=limiter, rate_limiter=rate_limiter,
+                                              stop_when=stop_when, first_k=first_k, deadline=deadline):
+            result[url] = response
+            if on_result is not None:
+                on_result(url, response)
+        return result
+
+    @staticmethod
+    def multi_iter(torrent: Torrent,
+                urls: list[str],
+                peer_id: str,  
+                ip_addr: str|None = None,
+                num_want = None, key = None,
+                port: int|None = None, headers = None,
+                timeout: int|None = None, max_threads: int = 50,
+                session_pool: HTTPSessionPool|None = None,
+                health: TrackerHealth|None = None,
+                store: TrackerHealthStore|None = None,
+                dedupe: bool = True,
+                limiter: AdaptiveLimiter|None = None,
+                rate_limiter: RateLimiter|None = None,
+                stop_when: Callable[[str, Dict[str, Any]], bool]|None = None,
+                first_k: int|None = None,
+                deadline: float|None = None) -> Iterator[tuple[str, Dict[str, Any]]]:
+        """
+        Query many trackers concurrently, yielding (url, result) as each answers.
+
+        Failed trackers yield {"error": str}. Iteration ends when every tracker
+        answered, or earlier when:
+            - stop_when(url, result) returns True (e.g. lambda *_: len(torrent.peers) >= 200),
+            - first_k successful results were yielded,
+            - deadline seconds have passed since the call.
+        Trackers still waiting for a thread slot are then dropped; queries
+        already in flight finish in the background and still add their peers
+        to the torrent.
+
+        With a health registry, trackers are started best first, each gets an
+        adaptive timeout, chronically failing ones are skipped, and every
+        outcome is recorded back into the registry. With a store, trackers it
+        found dead within its ttl are skipped, the others are started in its
+        order (when there is no health registry), and outcomes are written to
+        it in batches with record_many().
+
+        With dedupe, equivalent URLs (see Normalize.group_urls: case, default
+        ports, trailing slashes, http vs https) are announced to once and the
+        result is yielded for each spelling.
+
+        A limiter (AdaptiveLimiter) replaces the fixed max_threads cap with a
+        limit that adapts to timeouts and latency; share one across sweeps so
+        it keeps what it learned.
+
+        Each announce takes its rate_limiter token (see single()) before its
+        slot, so time spent waiting for a token neither holds a slot nor
+        counts towards the latency the limiter and health registry see.
+        """
         import threading
+        import queue
         semaphore = threading.Semaphore(max_threads)
-        result = {}
-        result_lock = threading.Lock()  # Thread-safe writes
-        threads = []  # Keep track of threads
+        results: queue.Queue = queue.Queue()
+        stopped = threading.Event()
+        aliases = group_urls(urls) if dedupe else {url: [url] for url in urls}
+        urls = list(aliases)
+        if health is not None:
+            urls = health.order(urls)
+        elif store is not None:
+            urls = store.order(urls)
+        known = store.fresh(urls) if store is not None else {}
+        deadline_at = None if deadline is None else time.monotonic() + deadline
+        rate_limiter = rate_limiter or RateLimiter.shared()
+        outcomes: list[tuple[str, bool, float|None]] = []  # not yet written to the store
+        outcomes_lock = threading.Lock()
+
+        def store_outcome(url: str, alive: bool, latency: float|None = None):
+            with outcomes_lock:
+                outcomes.append((url, alive, latency))
+                if not stopped.is_set():
+                    return
+            flush_outcomes()  # the iteration is over: nobody else will
+
+        def flush_outcomes():
+            with outcomes_lock:
+                batch = outcomes[:]
+                outcomes.clear()
+            if batch:
+                store.record_many(batch)  # type: ignore[union-attr]
         
         def threaded_check(url):
-            with semaphore:
+            if stopped.is_set():
+                return
+            if (health is not None and health.should_skip(url)) or known.get(url) is False:
+                results.put((url, {"error": f"Skipped failing tracker '{url}'"}))
+                return
+            rate_limiter.acquire(url)
+            if limiter is not None:
+                limiter.acquire()
+            else:
+                semaphore.acquire()
+            outcome, latency = None, None  # reported to the limiter
+            try:
+                if stopped.is_set():
+                    return
+                url_timeout = timeout if health is None else health.timeout_for(url, timeout or DEFAULT_TIMEOUT)
+                start = time.monotonic()
                 try:
                     response = Query.single(torrent, url, peer_id,
+                                       ip_addr=ip_addr,
+                                       num_want=num_want, key=key, port=port, headers=headers, timeout=url_timeout,
+                                       session_pool=session_pool, rate_limiter=_unlimited)
+                    latency = time.monotonic() - start
+                    outcome = True
+                    if health is not None:
+                        health.record_success(url, latency)
+                    if store is not None:
+                        store_outcome(url, True, latency)
+                    results.put((url, response))
+                except Exception as e:
+                    # Only timeouts and socket errors hint at congestion
+                    outcome = False if isinstance(e, (TimeoutError, UnexpectedError)) else None
+                    if health is not None:
+                        health.record_failure(url)
+                    if store is not None:
+                        store_outcome(url, False)
+                    results.put((url, {"error": str(e)}))  # Store error in result instead of printing
+            finally:
+                if limiter is not None:
+                    limiter.release(outcome, latency)
+                else:
+                    semaphore.release()
+
+        for url in urls:
+            threading.Thread(target=threaded_check, args=(url,), daemon=True).start()
+
+        successes = 0
+        try:
+            for _ in range(len(urls)):
+                wait = None if deadline_at is None else deadline_at - time.monotonic()
+                if wait is not None and wait <= 0:
+                    return
+                try:
+                    url, response = results.get(timeout=wait)
+                except queue.Empty:
+                    return
+
+                for alias in aliases[url]:
+                    yield alias, response
+
+                if "error" not in response and "failure reason" not in response:
+                    successes += 1
+                if first_k is not None and successes >= first_k:
+                    return
+                if stop_when is not None and stop_when(url, response):
+                    return
+                if len(outcomes) >= STORE_BATCH:
+                    flush_outcomes()
+        finally:
+            with outcomes_lock:
+                stopped.set()
+            if store is not None:
+                flush_outcomes()
+
+    @staticmethod
+    async def multi_async(torrent: Torrent,
+                urls: list[str],
+                peer_id: str,  
+                ip_addr: str|None = None,
+                num_want = None, key = None,
+                port: int|None = None, headers = None,
+                timeout: int|None = None, max_concurrency: int = 500) -> Dict[str, Dict[str, Any]]:
+        """
+        Asyncio counterpart of multi(): every tracker is queried on the running
+        event loop, at most max_concurrency at a time, without a thread per URL.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        result = {}
+
+        async def query(url):
+            async with semaphore:
+                try:
+                    result[url] = await Query.single_async(torrent, url, peer_id,
                                        ip_addr=ip_addr,
                                        num_want=num_want, key=key, port=port, headers=headers, timeout=timeout)
+                except Exception as e:
+                    result[url] = {"error": str(e)}
+
+        await asyncio.gather(*(query(url) for url in urls))
+        return result
+
+    # region - scrape
+    @staticmethod
+    def scrape_udp(url: str, info_hashes: list[str], timeout: int = 5) -> Dict[str, Dict[str, int]]:
+        """
+        Scrape a UDP tracker for many torrents at once (BEP 15 action 2).
+
+        Up to 74 info hashes are packed per packet and all packets reuse the
+        tracker's cached connection ID. Unlike an announce, a scrape does not
+        add our peer ID to the swarm.
+
+        Args:
+            url: UDP tracker URL
+            info_hashes: 40-character hex info hashes
+
+        Returns:
+            {info_hash: {"seeders": int, "completed": int, "leechers": int}}
+        """
+        parsed = urlparse(url)
+        HOSTNAME = parsed.hostname
+        PORT = parsed.port
+        if HOSTNAME is None or PORT is None:
+            raise BadRequestError(url=url, message="Missing host or port")
+
+        info_hashes = list(dict.fromkeys(info_hashes))  # drop duplicates, keep order
+        if not info_hashes:
+            return {}
+        hash_bytes = [bytes.fromhex(h) for h in info_hashes]
+
+        responses = UDPTrackerClient.shared().scrape(HOSTNAME, PORT, hash_bytes, timeout=timeout, url=url)
+        return _parse_udp_scrape_response(responses, info_hashes, url)
+
+    @staticmethod
+    def scrape_http(url: str, info_hashes: list[str], timeout: int = 5,
+                    headers: dict|None = None,
+                    session_pool: HTTPSessionPool|None = None) -> Dict[str, Dict[str, int]]:
+        """
+        Scrape an HTTP/HTTPS tracker for many torrents at once.
+
+        The announce URL is rewritten to the scrape URL (BEP 48) and as many
+        info_hash parameters as fit in MAX_SCRAPE_URL_LENGTH are sent per GET.
+        A short reply may just mean some torrents are unknown to the tracker,
+        so the chunk size is halved on a short reply and only set to the
+        answered count once two chunks in a row come back with that count.
+        The missing torrents are re-requested at the new size, at most
+        MAX_SCRAPE_RETRIES times.
+
+        Args:
+            url: HTTP tracker announce (or scrape) URL
+            info_hashes: 40-character hex info hashes
+            session_pool: Send requests over this pool's keep-alive sessions
+
+        Returns:
+            {info_hash: {"seeders": int, "completed": int, "leechers": int}}.
+            Torrents unknown to the tracker are left out.
+        """
+        scrape_url = url if urlparse(url).path.rpartition("/")[2].startswith("scrape") else _announce_to_scrape_url(url)
+        if scrape_url is None:
+            raise BadRequestError(url=url, message="Tracker does not support scrape")
+
+        headers = headers or _default_headers(keep_alive=session_pool is not None)
+        http_get = session_pool.get if session_pool is not None else resolving_get
+
+        hash_bytes = [bytes.fromhex(h) for h in dict.fromkeys(info_hashes)]
+        result: Dict[str, Dict[str, int]] = {}
+        max_hashes = len(hash_bytes)
+        retries = 0
+        last_short: int|None = None  # answered count of the previous chunk, if it was short
+
+        pending = _chunk_scrape_hashes(scrape_url, hash_bytes, max_hashes)
+        while pending:
+            chunk = pending.pop(0)
+            try:
+                response = http_get(scrape_url,
+                                    headers=headers,
+                                    params={"info_hash": chunk},
+                                    allow_redirects=True,
+                                    timeout=timeout)
+            except (requests.exceptions.Timeout, builtins.TimeoutError) as e:
+                raise TimeoutError(url=url) from e
+            except requests.exceptions.RequestException as e:
+                raise UnexpectedError(url=url, e=e)
+
+            if response.status_code // 100 != 2:
+                raise InvalidResponseError(url=url, message=f"Scrape failed with status {response.status_code}")
+            try:
+                files = _parse_http_scrape_response(dict(bec.decode(response.content)), url)
+            except bec.exceptions.DecodingError as e:
+                raise InvalidResponseError(url=url, message=f"Invalid scrape response: {e}") from e
+            result |= files
+
+            if not 0 < len(files) < len(chunk):
+                last_short = None
+                continue
+            # Same count twice in a row looks like a cap; once could be unknown torrents
+            size = len(files) if len(files) == last_short else max(len(chunk) // 2, len(files))
+            last_short = len(files)
+            missing = [h for h in chunk if h.hex() not in files]
+            if size < max_hashes and retries < MAX_SCRAPE_RETRIES:
+                max_hashes = size
+                retries += 1
+                remaining = missing + [h for c in pending for h in c]
+                pending = _chunk_scrape_hashes(scrape_url, remaining, max_hashes)
+
+        return result
+
+    @staticmethod
+    def scrape(url: str, info_hashes: list[str], timeout: int = 5,
+               session_pool: HTTPSessionPool|None = None) -> Dict[str, Dict[str, int]]:
+        """
+        Scrape a tracker, choosing the protocol from the URL scheme.
+        """
+        if url.startswith("http"):
+            return Query.scrape_http(url, info_hashes, timeout=timeout, session_pool=session_pool)
+        elif url.startswith("udp"):
+            return Query.scrape_udp(url, info_hashes, timeout=timeout)
+        else:
+            raise TrackerQueryException(message="Unsupported URL scheme", url=url)
+
+    @staticmethod
+    def scrape_multi(urls: list[str], info_hashes: list[str],
+                     timeout: int = 5, max_threads: int = 50,
+                     session_pool: HTTPSessionPool|None = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Scrape many trackers concurrently for the same set of torrents.
+
+        Returns:
+            {url: {info_hash: stats}}, or {url: {"error": str}} for trackers that failed.
+        """
+        import threading
+        semaphore = threading.Semaphore(max_threads)
+        result = {}
+        result_lock = threading.Lock()
+        threads = []
+
+        def threaded_scrape(url):
+            with semaphore:
+                try:
+                    response = Query.scrape(url, info_hashes, timeout=timeout, session_pool=session_pool)
                     with result_lock:
                         result[url] = response
                 except Exception as e:
                     with result_lock:
-                        result[url] = {"error": str(e)}  # Store error in result instead of printing
+                        result[url] = {"error": str(e)}
 
         for url in urls:
-            threaded = threading.Thread(target=threaded_check, args=(url,))
+            threaded = threading.Thread(target=threaded_scrape, args=(url,))
             threaded.start()
-            threads.append(threaded)  # Keep track of the thread
-        
-        # Wait for all threads to complete
+            threads.append(threaded)
+
         for thread in threads:
             thread.join()
-            
-        return result
\ No newline at end of file
+
+        return result
+    # endregion
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+
+class _Bucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+
+class RateLimiter:
+    """
+    Process-wide token buckets, one per tracker host.
+
+    Each host earns rate tokens per second, up to burst. A request that
+    finds the bucket empty reserves the next token and sleeps until it is
+    due, so queued requests go out evenly spaced, first come first served,
+    instead of in bursts. Hosts without a configured rate are not limited,
+    and neither is anything until a rate is set.
+    """
+    _shared: Optional['RateLimiter'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, default_rate: float|None = None, default_burst: int = 1):
+        """
+        Args:
+            default_rate: Requests per second allowed to every host, or None for no limit.
+            default_burst: Requests a host may receive back to back.
+
+        Raises:
+            ValueError: default_rate is not positive or default_burst is below 1.
+        """
+        _check_rate(default_rate, default_burst)
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._rates: dict[str, tuple[float|None, int]] = {}  # {host: (rate, burst)}
+        self._buckets: dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> 'RateLimiter':
+        """Return the process-wide limiter, creating it (unlimited) on first use."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    # region - configuration
+    def set_rate(self, host: str, rate: float|None, burst: int = 1):
+        """
+        Limit one tracker host (or lift its limit with rate None).
+
+        Raises:
+            ValueError: rate is not positive or burst is below 1.
+        """
+        _check_rate(rate, burst)
+        host = _host_of(host)
+        with self._lock:
+            self._rates[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def set_default(self, rate: float|None, burst: int = 1):
+        """
+        Limit every host without a rate of its own.
+
+        Raises:
+            ValueError: rate is not positive or burst is below 1.
+        """
+        _check_rate(rate, burst)
+        with self._lock:
+            self.default_rate = rate
+            self.default_burst = burst
+            self._buckets = {host: bucket for host, bucket in self._buckets.items() if host in self._rates}
+    # endregion
+
+    # region - acquiring
+    def reserve(self, url: str) -> float:
+        """
+        Take the next token for a tracker URL or host.
+
+        Returns:
+            Seconds to wait before sending (0 if a token was available).
+        """
+        host = _host_of(url)
+        rate, burst = self._rates.get(host, (self.default_rate, self.default_burst))
+        if rate is None:
+            return 0.0
+
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = _Bucket(rate, burst, now)
+            bucket.tokens = min(bucket.tokens + (now - bucket.updated) * bucket.rate, bucket.burst)
+            bucket.updated = now
+            bucket.tokens -= 1  # may go negative: later callers queue behind this one
+            return 0.0 if bucket.tokens >= 0 else -bucket.tokens / bucket.rate
+
+    def acquire(self, url: str) -> float:
+        """Wait until a request to the tracker may be sent. Returns the seconds waited."""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """Asyncio counterpart of acquire()."""
+        wait = self.reserve(url)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+    # endregion
+
+
+def _check_rate(rate: float|None, burst: int):
+    if rate is not None and not rate > 0:
+        raise ValueError(f"rate must be positive or None, got {rate!r}")
+    if burst < 1:
+        raise ValueError(f"burst must be at least 1, got {burst!r}")
+
+
+def _host_of(url: str) -> str:
+    """Lower-case host of a URL, or the string itself if it is already a host."""
+    if "://" in url:
+        return (urlparse(url).hostname or "").lower()
+    return url.lower()
@@ -0,0 +1,96 @@
+"""
+Single-pass decoder for HTTP announce replies.
+
+A tracker reply is a flat bencoded dictionary of integers and strings with
+one large string, the compact peer list. Decoding it with bencodepy copies
+every string and then the reply is walked again to decode it. This module
+scans the body once and hands the peer lists to the compact decoders as
+memoryview slices of the body, without copying them. Replies it does not
+cover, such as non-compact peer lists, nested values or malformed input,
+are left to the generic path, which decodes non-compact peers into the
+same shape as compact ones.
+"""
+import socket
+from typing import Any
+
+from ..Compact import decode_peers, decode_peers6, decode_peers_packed, decode_peers6_packed
+
+_INT = ord("i")
+_END = ord("e")
+_DICT = ord("d")
+
+
+def decode_announce(content: bytes, compact: bool = False) -> dict[str, Any]|None:
+    """
+    Decode a bencoded announce reply the way the generic path would.
+
+    Keys are decoded to str, and so are string values that are valid UTF-8.
+    4- and 16-byte values of keys containing 'ip' become address strings.
+    peers and peers6 become lists of (ip, port) tuples, or packed arrays
+    with compact.
+
+    Returns:
+        The decoded reply, or None if the reply needs the generic decoder.
+    """
+    data = bytes(content)
+    view = memoryview(data)
+    size = len(data)
+    if size < 2 or data[0] != _DICT or data[-1] != _END:
+        return None
+
+    result: dict[str, Any] = {}
+    pos = 1
+    try:
+        while data[pos] != _END:
+            # Key: a byte string
+            colon = data.index(b":", pos)
+            length = data[pos:colon]
+            if not length.isdigit():
+                return None
+            start = colon + 1
+            pos = start + int(length)
+            key = data[start:pos].decode()
+
+            # Value: an integer or a byte string
+            if data[pos] == _INT:
+                if key in ("peers", "peers6"):
+                    return None  # not a peer list: the generic path rejects it
+                end = data.index(b"e", pos)
+                digits = data[pos + 1:end]
+                if not digits.lstrip(b"-").isdigit():
+                    return None
+                result[key] = int(digits)
+                pos = end + 1
+                continue
+
+            colon = data.index(b":", pos)
+            length = data[pos:colon]
+            if not length.isdigit():
+                return None  # a list or dictionary
+            start = colon + 1
+            pos = start + int(length)
+            if pos >= size:
+                return None
+
+            if key == "peers":
+                result[key] = decode_peers_packed(view[start:pos]) if compact else decode_peers(view[start:pos])
+            elif key == "peers6":
+                result[key] = decode_peers6_packed(view[start:pos]) if compact else decode_peers6(view[start:pos])
+            else:
+                result[key] = _decode_string(key, data[start:pos])
+    except (IndexError, ValueError):
+        return None  # truncated or malformed: let the generic decoder report it
+
+    return result if pos == size - 1 else None
+
+
+def _decode_string(key: str, value: bytes) -> str|bytes:
+    if "ip" in key:
+        if len(value) == 4:
+            return socket.inet_ntoa(value)
+        if len(value) == 16:
+            return socket.inet_ntop(socket.AF_INET6, value)
+    try:
+        return value.decode()
+    except UnicodeDecodeError:
+        return value
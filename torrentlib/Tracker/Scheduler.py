@@ -0,0 +1,282 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from ..Torrent import Torrent, TorrentStatus
+from .Query import Query
+from .HTTPPool import HTTPSessionPool
+from .Health import TrackerHealth
+
+
+class _Entry:
+    """Announce state of one (torrent, tracker) pair."""
+    __slots__ = ("torrent", "url", "due", "generation", "started", "completed_sent",
+                 "stopping", "in_flight", "requested", "failures", "last_announce", "min_interval")
+
+    def __init__(self, torrent: Torrent, url: str):
+        self.torrent = torrent
+        self.url = url
+        self.due = 0.0
+        self.generation = 0          # bumped on reschedule; stale heap items are skipped
+        self.started = False
+        # A torrent added as already complete never sends 'completed' (BEP 3)
+        self.completed_sent = torrent.event == TorrentStatus.COMPLETED or (torrent.total_size > 0 and torrent.left == 0)
+        self.stopping = False
+        self.in_flight = False
+        self.requested = False       # announce_now() while in flight: announce again when it finishes
+        self.failures = 0
+        self.last_announce = 0.0
+        self.min_interval = 0
+
+
+class AnnounceScheduler:
+    """
+    Long-running re-announce loop for many torrents across many trackers.
+
+    Next-due times of every (torrent, tracker) pair live in one heap. A single
+    timer thread pops due pairs and hands them to a bounded worker pool, so
+    each tracker is announced to once per its 'interval' (never more often
+    than its 'min interval'), with 'started', 'completed' and 'stopped' events
+    sent when the torrent's state calls for them. Failed announces are retried
+    with exponential backoff.
+    """
+    def __init__(self, peer_id: str,
+                 port: int = 6881,
+                 num_want: int|None = None,
+                 timeout: int = 5,
+                 max_workers: int = 32,
+                 default_interval: int = 1800,
+                 retry_interval: int = 60,
+                 session_pool: HTTPSessionPool|None = None,
+                 health: TrackerHealth|None = None,
+                 on_result: Optional[Callable[[Torrent, str, Any], None]] = None):
+        """
+        Args:
+            peer_id: Our 20-character peer ID.
+            port: Our listening port.
+            num_want: Peers requested per announce (tracker default if None).
+            timeout: Per-announce timeout in seconds.
+            max_workers: Most announces in flight at once.
+            default_interval: Seconds between announces when a tracker sends no interval.
+            retry_interval: First retry delay after a failure, doubled per consecutive failure.
+            session_pool: Optional keep-alive pool for HTTP trackers.
+            health: Optional health registry for adaptive timeouts; every announce is recorded in it.
+            on_result: Called as on_result(torrent, url, result) after every announce;
+                result is the response dict or the raised exception.
+        """
+        self.peer_id = peer_id
+        self.port = port
+        self.num_want = num_want
+        self.timeout = timeout
+        self.default_interval = default_interval
+        self.retry_interval = retry_interval
+        self.session_pool = session_pool
+        self.health = health
+        self.on_result = on_result
+        self.max_workers = max_workers
+
+        self._entries: dict[tuple[str, str], _Entry] = {}  # {(info_hash, url): entry}
+        self._heap: list[tuple[float, int, tuple[str, str], int]] = []  # (due, seq, key, generation)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        self._executor: Optional[ThreadPoolExecutor] = None  # created by start(), shut down by stop()
+        self._timer: Optional[threading.Thread] = None
+        self._running = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # region - lifecycle
+    def start(self):
+        """Start the timer thread. A stopped scheduler can be started again."""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="announce")
+        self._timer = threading.Thread(target=self._run, name="AnnounceScheduler", daemon=True)
+        self._timer.start()
+
+    def stop(self, send_stopped: bool = True, timeout: float|None = None):
+        """
+        Stop scheduling. With send_stopped, every started torrent first sends
+        'stopped' to its trackers, waiting up to timeout seconds for them.
+        """
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            entries = [e for e in self._entries.values() if e.started and not e.stopping]
+            for entry in entries:
+                entry.stopping = True
+        if self._timer is not None:
+            self._timer.join()
+
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return  # never started
+        if send_stopped:
+            futures = [executor.submit(self._announce, entry) for entry in entries]
+            wait(futures, timeout=timeout)
+        executor.shutdown(wait=False)
+    # endregion
+
+    # region - torrents
+    def add(self, torrent: Torrent, urls: list[str]):
+        """Start announcing a torrent to the given trackers, first with 'started'."""
+        now = time.monotonic()
+        with self._cond:
+            for url in urls:
+                key = (torrent.info_hash, url)
+                if key in self._entries:
+                    continue
+                entry = _Entry(torrent, url)
+                self._entries[key] = entry
+                self._schedule(key, entry, now)
+            self._cond.notify()
+
+    def remove(self, torrent: Torrent, send_stopped: bool = True):
+        """Stop announcing a torrent, sending 'stopped' to trackers it was started on."""
+        now = time.monotonic()
+        with self._cond:
+            for key, entry in list(self._entries.items()):
+                if entry.torrent is not torrent:
+                    continue
+                if send_stopped and entry.started:
+                    entry.stopping = True
+                    self._schedule(key, entry, now)
+                else:
+                    del self._entries[key]
+            self._cond.notify()
+
+    def announce_now(self, torrent: Torrent):
+        """
+        Announce a torrent as soon as possible, e.g. right after torrent.event
+        became COMPLETED. Regular announces still respect 'min interval'.
+        A tracker with an announce in flight is announced to again once it finishes.
+        """
+        now = time.monotonic()
+        with self._cond:
+            for key, entry in self._entries.items():
+                if entry.torrent is not torrent:
+                    continue
+                if entry.in_flight:
+                    entry.requested = True
+                    continue
+                self._schedule(key, entry, self._earliest_due(entry, now))
+            self._cond.notify()
+
+    def next_due(self, torrent: Torrent, url: str) -> float|None:
+        """Seconds until the next announce of torrent to url, or None if not scheduled."""
+        entry = self._entries.get((torrent.info_hash, url))
+        if entry is None:
+            return None
+        return max(entry.due - time.monotonic(), 0)
+    # endregion
+
+    # region - scheduling
+    def _schedule(self, key: tuple[str, str], entry: _Entry, due: float):
+        """Move an entry's next announce to due. Caller holds self._cond."""
+        entry.due = due
+        entry.generation += 1
+        heapq.heappush(self._heap, (due, next(self._seq), key, entry.generation))
+
+    def _earliest_due(self, entry: _Entry, now: float) -> float:
+        """Soonest an extra announce may go out: now, unless only a regular one is due."""
+        if entry.started and self._next_event(entry) == TorrentStatus.NONE:
+            return max(now, entry.last_announce + entry.min_interval)
+        return now
+
+    def _run(self):
+        with self._cond:
+            while self._running:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, key, generation = heapq.heappop(self._heap)
+                    entry = self._entries.get(key)
+                    if entry is None or entry.generation != generation or entry.in_flight:
+                        continue
+                    entry.in_flight = True
+                    self._executor.submit(self._announce, entry)  # type: ignore[union-attr]
+
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._cond.wait(timeout)
+
+    @staticmethod
+    def _next_event(entry: _Entry) -> TorrentStatus:
+        if entry.stopping:
+            return TorrentStatus.STOPPED
+        if not entry.started:
+            return TorrentStatus.STARTED
+        if entry.torrent.event == TorrentStatus.COMPLETED and not entry.completed_sent:
+            return TorrentStatus.COMPLETED
+        return TorrentStatus.NONE
+
+    def _announce(self, entry: _Entry):
+        """Worker: announce once and schedule the next announce from the reply."""
+        event = self._next_event(entry)
+        timeout = self.timeout if self.health is None else self.health.timeout_for(entry.url, self.timeout)
+        result: Any
+        start = time.monotonic()
+        try:
+            result = Query.single(entry.torrent, entry.url, self.peer_id,
+                                  num_want=self.num_want, port=self.port, timeout=timeout,
+                                  session_pool=self.session_pool, event=event)
+            success = "failure reason" not in result
+            if self.health is not None:
+                self.health.record_success(entry.url, time.monotonic() - start)
+        except Exception as e:
+            logging.debug(f"❌ {entry.url}: Announce failed - {e}")
+            result = e
+            success = False
+            if self.health is not None:
+                self.health.record_failure(entry.url)
+
+        now = time.monotonic()
+        with self._cond:
+            entry.in_flight = False
+            key = (entry.torrent.info_hash, entry.url)
+
+            if event == TorrentStatus.STOPPED:
+                self._entries.pop(key, None)
+            elif key in self._entries:
+                if success:
+                    entry.started = True
+                    entry.completed_sent |= event == TorrentStatus.COMPLETED
+                    entry.failures = 0
+                    entry.last_announce = now
+                    interval = result.get("interval") or self.default_interval
+                    entry.min_interval = result.get("min interval") or 0
+                    if self._next_event(entry) != TorrentStatus.NONE:
+                        # remove() or completion happened while this announce was in flight
+                        self._schedule(key, entry, now)
+                    else:
+                        self._schedule(key, entry, now + max(interval, entry.min_interval))
+                else:
+                    entry.failures += 1
+                    backoff = self.retry_interval * 2 ** (entry.failures - 1)
+                    self._schedule(key, entry, now + min(backoff, self.default_interval))
+                if entry.requested:
+                    entry.requested = False
+                    self._schedule(key, entry, min(entry.due, self._earliest_due(entry, now)))
+                self._cond.notify()
+
+        if self.on_result is not None:
+            try:
+                self.on_result(entry.torrent, entry.url, result)
+            except Exception as e:
+                logging.debug(f"on_result callback failed: {e}")
+    # endregion
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that would do the same work.
+
+    The first caller for a key runs the function; callers arriving with the
+    same key while it runs wait for and share its result or exception.
+    Nothing is cached once the call finishes.
+    """
+    def __init__(self):
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless a call for key is already in flight, then share its outcome."""
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+        return self.run(key, future, fn, *args, **kwargs)
+
+    def join(self, key: Hashable) -> tuple[Future, bool]:
+        """
+        Low-level half of do(): return (future, leader). The leader must call
+        run() or finish(); others wait on the future (e.g. via asyncio.wrap_future).
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = self._calls[key] = Future()
+            return future, True
+
+    def run(self, key: Hashable, future: Future, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run the leader's call and publish its outcome."""
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, future, exception=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    def finish(self, key: Hashable, future: Future, result: Any = None, exception: BaseException|None = None):
+        """Publish the leader's outcome and let the next call for key start afresh."""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
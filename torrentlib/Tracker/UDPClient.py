@@ -0,0 +1,410 @@
+import asyncio
+import socket
+import struct
+import random
+import selectors
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+from ..Resolver import Resolver
+from .SingleFlight import SingleFlight
+from .TrackerQueryException import (
+    TimeoutError,
+    InvalidResponseError,
+    UnexpectedError
+)
+
+PROTOCOL_ID = 0x41727101980    # 8-byte magic number
+CONNECTION_ID_TTL = 60         # seconds a connection ID may be reused (BEP 15)
+
+ACTION_CONNECT = 0
+ACTION_ANNOUNCE = 1
+ACTION_SCRAPE = 2
+ACTION_ERROR = 3
+
+MAX_SCRAPE_HASHES = 74         # info hashes per scrape packet (BEP 15)
+RECEIVE_BUFFER_SIZE = 4 << 20  # bytes requested for SO_RCVBUF
+
+
+class UDPTrackerClient:
+    """
+    Process-wide UDP tracker client (BEP 15).
+
+    All requests go through a small set of shared sockets. Replies are
+    demultiplexed by their 32-bit transaction ID on a single receiver thread,
+    and connection IDs are cached per tracker for CONNECTION_ID_TTL seconds so
+    repeated announces to the same tracker only need one round-trip.
+    Trackers are keyed by resolved address, and concurrent identical connects
+    or announces to one endpoint share a single request.
+    """
+    _shared: Optional['UDPTrackerClient'] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, num_sockets: int = 1, connection_ttl: float = CONNECTION_ID_TTL):
+        """
+        Args:
+            num_sockets: Number of UDP sockets requests are spread over.
+            connection_ttl: Seconds a tracker's connection ID is reused.
+        """
+        assert num_sockets >= 1, "num_sockets must be at least 1"
+        self.connection_ttl = connection_ttl
+
+        self._sockets: list[socket.socket] = []
+        self._next_socket = 0
+        self._selector = selectors.DefaultSelector()
+        for _ in range(num_sockets):
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.setblocking(False)
+            # Room for a burst of replies to many trackers (capped by the OS limit)
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER_SIZE)
+            self._selector.register(s, selectors.EVENT_READ)
+            self._sockets.append(s)
+
+        self._pending: dict[int, Future] = {}  # {transaction_id: future of the raw reply}
+        self._connections: dict[tuple[str, int], tuple[int, float]] = {}  # {(ip, port): (connection_id, expires_at)}
+        self._connecting = SingleFlight()  # connect requests in flight, by (ip, port)
+        self._announcing = SingleFlight()  # announces in flight, by ((ip, port), body)
+        self._lock = threading.Lock()
+
+        self._receiver: Optional[threading.Thread] = None
+        self._closed = False
+
+    @classmethod
+    def shared(cls) -> 'UDPTrackerClient':
+        """Return the process-wide client, creating it on first use."""
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared._closed:
+                cls._shared = cls()
+            return cls._shared
+
+    def close(self):
+        """Stop the receiver thread, close sockets and fail pending requests."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        if self._receiver is not None:
+            self._receiver.join()
+        for s in self._sockets:
+            self._selector.unregister(s)
+            s.close()
+        self._selector.close()
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(OSError("UDP tracker client closed"))
+
+    # region - connection ID cache
+    def connection_id(self, host: str, port: int, timeout: float = 5, url: str|None = None) -> int:
+        """
+        Return a valid connection ID for the tracker, connecting if the cached one expired.
+        """
+        return self._connect(self._resolve(host, port, url, timeout), timeout, url)
+
+    async def connection_id_async(self, host: str, port: int, timeout: float = 5, url: str|None = None) -> int:
+        """Asyncio counterpart of connection_id()."""
+        return await self._connect_async(await self._resolve_async(host, port, url, timeout), timeout, url)
+
+    def _connect(self, addr: tuple[str, int], timeout: float, url: str|None) -> int:
+        """
+        Connection ID for a resolved endpoint. Concurrent callers share a
+        single connect request instead of each sending their own.
+        """
+        cached = self._cached_connection_id(addr)
+        if cached is not None:
+            return cached
+
+        future, leader = self._connecting.join(addr)
+        if not leader:
+            try:
+                return future.result(timeout)
+            except FutureTimeoutError:
+                raise TimeoutError(url=url)
+
+        def connect() -> int:
+            response = self.transact(addr, PROTOCOL_ID, ACTION_CONNECT, timeout=timeout, url=url)
+            return self._store_connection_id(addr, response, url)
+        return self._connecting.run(addr, future, connect)
+
+    async def _connect_async(self, addr: tuple[str, int], timeout: float, url: str|None) -> int:
+        """Asyncio counterpart of _connect()."""
+        cached = self._cached_connection_id(addr)
+        if cached is not None:
+            return cached
+
+        future, leader = self._connecting.join(addr)
+        if not leader:
+            try:
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(url=url)
+
+        try:
+            response = await self.transact_async(addr, PROTOCOL_ID, ACTION_CONNECT, timeout=timeout, url=url)
+            connection_id = self._store_connection_id(addr, response, url)
+        except BaseException as e:
+            self._connecting.finish(addr, future, exception=e)
+            raise
+        self._connecting.finish(addr, future, connection_id)
+        return connection_id
+
+    @staticmethod
+    def _resolve(host: str, port: int, url: str|None = None, timeout: float = 5) -> tuple[str, int]:
+        """
+        Resolve a tracker host once (through the shared Resolver cache), so
+        connection IDs are cached per endpoint and hostnames sharing an
+        address share one connection.
+        """
+        try:
+            return Resolver.shared().resolve(host, timeout=timeout), port
+        except FutureTimeoutError:
+            raise TimeoutError(url=url, message="DNS lookup timed out")
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+
+    @staticmethod
+    async def _resolve_async(host: str, port: int, url: str|None = None, timeout: float = 5) -> tuple[str, int]:
+        """Asyncio counterpart of _resolve()."""
+        try:
+            return await asyncio.wait_for(Resolver.shared().resolve_async(host), timeout), port
+        except asyncio.TimeoutError:
+            raise TimeoutError(url=url, message="DNS lookup timed out")
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+
+    def invalidate(self, host: str, port: int):
+        """Forget the cached connection ID of a tracker, given by its resolved address."""
+        with self._lock:
+            self._connections.pop((host, port), None)
+
+    def _cached_connection_id(self, key: tuple[str, int]) -> int|None:
+        with self._lock:
+            cached = self._connections.get(key)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def _store_connection_id(self, key: tuple[str, int], response: bytes, url: str|None) -> int:
+        if len(response) < 16:
+            raise InvalidResponseError(url=url, message="Connect response too short")
+        connection_id, = struct.unpack("!q", response[8:16])
+
+        with self._lock:
+            self._connections[key] = (connection_id, time.monotonic() + self.connection_ttl)
+        return connection_id
+    # endregion
+
+    # region - requests
+    def submit(self, addr: tuple[str, int], connection_id: int, action: int, body: bytes = b"") -> tuple[int, Future]:
+        """
+        Send one request without waiting for the reply.
+
+        Returns:
+            (transaction_id, future) - the future resolves to the raw reply bytes.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise OSError("UDP tracker client closed")
+            transaction_id = random.getrandbits(32)
+            while transaction_id in self._pending:
+                transaction_id = random.getrandbits(32)
+            self._pending[transaction_id] = future
+            s = self._sockets[self._next_socket]
+            self._next_socket = (self._next_socket + 1) % len(self._sockets)
+            self._ensure_receiver()
+
+        packet = struct.pack("!qiI", connection_id, action, transaction_id) + body
+        try:
+            s.sendto(packet, addr)
+        except OSError:
+            self._discard(transaction_id)
+            raise
+        return transaction_id, future
+
+    def transact(self, addr: tuple[str, int], connection_id: int, action: int,
+                 body: bytes = b"", timeout: float = 5, url: str|None = None) -> bytes:
+        """
+        Send one request and wait for the matching reply.
+
+        Returns:
+            The raw reply, already checked for its action.
+
+        Raises:
+            TimeoutError: No reply within timeout.
+            InvalidResponseError: Tracker returned an error or an unexpected action.
+            UnexpectedError: Socket error (including failed name resolution).
+        """
+        try:
+            transaction_id, future = self.submit(addr, connection_id, action, body)
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+
+        try:
+            response = future.result(timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(url=url)
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+        finally:
+            self._discard(transaction_id)
+
+        return _check_action(response, action, url)
+
+    async def transact_async(self, addr: tuple[str, int], connection_id: int, action: int,
+                             body: bytes = b"", timeout: float = 5, url: str|None = None) -> bytes:
+        """Asyncio counterpart of transact(); waits on the event loop instead of blocking."""
+        try:
+            transaction_id, future = self.submit(addr, connection_id, action, body)
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+
+        try:
+            response = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(url=url)
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+        finally:
+            self._discard(transaction_id)
+
+        return _check_action(response, action, url)
+
+    def announce(self, host: str, port: int, body: bytes, timeout: float = 5, url: str|None = None) -> bytes:
+        """
+        Announce to a tracker using its cached connection ID. Identical
+        announces to the same endpoint already in flight are shared.
+
+        Args:
+            body: Announce packet after the action and transaction ID (from info_hash on).
+        """
+        addr = self._resolve(host, port, url, timeout)
+        return self._announcing.do((addr, body), self._announce, addr, body, timeout, url)
+
+    async def announce_async(self, host: str, port: int, body: bytes, timeout: float = 5, url: str|None = None) -> bytes:
+        """Asyncio counterpart of announce()."""
+        addr = await self._resolve_async(host, port, url, timeout)
+        future, leader = self._announcing.join((addr, body))
+        if not leader:
+            try:
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(url=url)
+
+        try:
+            connection_id = await self._connect_async(addr, timeout, url)
+            try:
+                response = await self.transact_async(addr, connection_id, ACTION_ANNOUNCE, body, timeout, url)
+            except InvalidResponseError:
+                self.invalidate(*addr)
+                raise
+        except BaseException as e:
+            self._announcing.finish((addr, body), future, exception=e)
+            raise
+        self._announcing.finish((addr, body), future, response)
+        return response
+
+    def _announce(self, addr: tuple[str, int], body: bytes, timeout: float, url: str|None) -> bytes:
+        connection_id = self._connect(addr, timeout, url)
+        try:
+            return self.transact(addr, connection_id, ACTION_ANNOUNCE, body, timeout, url)
+        except InvalidResponseError:
+            # Tracker may have dropped our connection ID; reconnect next time
+            self.invalidate(*addr)
+            raise
+
+    def scrape(self, host: str, port: int, info_hashes: list[bytes], timeout: float = 5, url: str|None = None) -> list[bytes]:
+        """
+        Scrape a tracker for many info hashes, MAX_SCRAPE_HASHES per packet.
+
+        All packets share one connection ID and are in flight together, so the
+        whole scrape costs a single round-trip once the connection ID is cached.
+
+        Returns:
+            The raw reply of each packet, in the order of info_hashes.
+        """
+        addr = self._resolve(host, port, url, timeout)
+        connection_id = self._connect(addr, timeout, url)
+        deadline = time.monotonic() + timeout
+
+        submitted = []
+        try:
+            for i in range(0, len(info_hashes), MAX_SCRAPE_HASHES):
+                body = b"".join(info_hashes[i:i + MAX_SCRAPE_HASHES])
+                submitted.append(self.submit(addr, connection_id, ACTION_SCRAPE, body))
+
+            responses = []
+            for _, future in submitted:
+                responses.append(future.result(max(deadline - time.monotonic(), 0)))
+        except FutureTimeoutError:
+            raise TimeoutError(url=url)
+        except OSError as e:
+            raise UnexpectedError(url=url, e=e)
+        finally:
+            for transaction_id, _ in submitted:
+                self._discard(transaction_id)
+
+        try:
+            return [_check_action(response, ACTION_SCRAPE, url) for response in responses]
+        except InvalidResponseError:
+            self.invalidate(*addr)
+            raise
+
+    def _discard(self, transaction_id: int):
+        with self._lock:
+            self._pending.pop(transaction_id, None)
+    # endregion
+
+    # region - receiver
+    def _ensure_receiver(self):
+        """Start the receiver thread if needed. Caller holds self._lock."""
+        if self._receiver is None or not self._receiver.is_alive():
+            self._receiver = threading.Thread(target=self._receive_loop,
+                                              name="UDPTrackerClient", daemon=True)
+            self._receiver.start()
+
+    def _receive_loop(self):
+        while not self._closed:
+            for key, _ in self._selector.select(timeout=0.5):
+                self._drain(key.fileobj)  # type: ignore
+
+    def _drain(self, s: socket.socket):
+        """Read every queued datagram from a socket and resolve the matching futures."""
+        while True:
+            try:
+                response, _ = s.recvfrom(65536)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # e.g. ICMP port unreachable surfaced on the socket; the request will time out
+                continue
+
+            if len(response) < 8:
+                continue
+            transaction_id, = struct.unpack("!I", response[4:8])
+            with self._lock:
+                future = self._pending.pop(transaction_id, None)
+            if future is not None and not future.done():
+                future.set_result(response)
+    # endregion
+
+
+def _check_action(response: bytes, expected_action: int, url: str|None) -> bytes:
+    """
+    Validate the action of a reply, turning tracker error replies into exceptions.
+    """
+    action, = struct.unpack("!i", response[:4])
+    if action == ACTION_ERROR:
+        message = response[8:].decode("utf-8", errors="replace")
+        raise InvalidResponseError(url=url, message=f"Tracker error: {message}")
+    if action != expected_action:
+        raise InvalidResponseError(
+            url=url,
+            message=f"Invalid action: expected {expected_action}, got {action}"
+        )
+    return response
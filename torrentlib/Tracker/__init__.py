@@ -6,6 +6,14 @@ A Python library for checking tracker availability and querying tracker informat
 
 from .Check import Check
 from .Query import Query
+from .UDPClient import UDPTrackerClient
+from .HTTPPool import HTTPSessionPool
+from .Scheduler import AnnounceScheduler
+from .Health import TrackerHealth
+from .HealthStore import TrackerHealthStore
+from .Concurrency import AdaptiveLimiter
+from .RateLimit import RateLimiter
+from .Metrics import Metrics
 from ..Torrent import TorrentStatus
 
 __version__ = "1.0.0"
@@ -18,4 +26,12 @@ __all__ = [
     "TorrentStatus",
     "Query",
     "Check",
+    "UDPTrackerClient",
+    "HTTPSessionPool",
+    "AnnounceScheduler",
+    "TrackerHealth",
+    "TrackerHealthStore",
+    "AdaptiveLimiter",
+    "RateLimiter",
+    "Metrics",
 ]
\ No newline at end of file
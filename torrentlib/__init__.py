@@ -1,5 +1,7 @@
 from . import Tracker
-from .Peer import Peer
+from .Peer import Peer, AsyncPeer, SwarmCrawler, MetadataFetcher
 from .Torrent import Torrent, TorrentStatus
+from .PeerTable import PeerTable
+from .Resolver import Resolver
 
-__all__ = ['Tracker', 'Peer', 'Torrent', 'TorrentStatus']
\ No newline at end of file
+__all__ = ['Tracker', 'Peer', 'AsyncPeer', 'SwarmCrawler', 'MetadataFetcher', 'Torrent', 'TorrentStatus', 'PeerTable', 'Resolver']
\ No newline at end of file